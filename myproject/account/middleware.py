@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+
+def user_cache_key(user_id):
+    return "account:user:{}".format(user_id)
+
+
+def user_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def forget_user(user_id):
+    user_cache().delete(user_cache_key(user_id))
+
+
+def get_user(request):
+    """
+    The user logged in to ``request``'s session, from the shared cache when
+    the cached copy has the session's auth hash.
+    """
+    session = request.session
+    try:
+        user_id = session[auth.SESSION_KEY]
+        session_hash = session[auth.HASH_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    key = user_cache_key(user_id)
+    user = user_cache().get(key)
+    if (
+        user is not None
+        and session.get(auth.BACKEND_SESSION_KEY)
+        in settings.AUTHENTICATION_BACKENDS
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    ):
+        return user
+    # A copy cached before a password change doesn't log the session out:
+    # only the database's copy is checked against the session.
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        user_cache().set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    # Django's AuthenticationMiddleware reads the user from the database on
+    # every request; this one keeps it in a cache shared by every process.
+    # Saving or deleting the user, and logging out, drop the cached copy
+    # (see signals).
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
@@ -1,3 +1,12 @@
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class UserProfile(models.Model):
+    user = models.OneToOneField(
+        User, related_name="profile", on_delete=models.CASCADE
+    )
+    post_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.user.username
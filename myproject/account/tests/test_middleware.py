@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..middleware import user_cache_key
+
+
+class CachedAuthenticationMiddlewareTests(TestCase):
+    def setUp(self):
+        self.cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        self.cache.clear()
+        self.user = User.objects.create_user(username="john", password="x")
+        self.assertTrue(self.client.login(username="john", password="x"))
+
+    def is_authenticated(self, client=None):
+        response = (client or self.client).get(reverse("index"))
+        return response.wsgi_request.user.is_authenticated
+
+    def cached(self):
+        return self.cache.get(user_cache_key(self.user.pk))
+
+    def test_user_is_cached(self):
+        self.assertTrue(self.is_authenticated())
+        self.assertEqual(self.cached(), self.user)
+        with self.assertNumQueries(0):
+            # The session comes from the shared cache too.
+            self.assertTrue(self.is_authenticated())
+
+    def test_anonymous_user_is_not_cached(self):
+        self.client.logout()
+        self.assertFalse(self.is_authenticated())
+        self.assertIsNone(self.cached())
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.is_authenticated()
+        self.user.set_password("y")
+        self.user.save()
+        self.assertIsNone(self.cached())
+
+    def test_password_change_ends_other_sessions(self):
+        self.is_authenticated()
+        self.user.set_password("y")
+        self.user.save()
+        self.assertFalse(self.is_authenticated())
+
+    def test_password_change_keeps_the_session_that_made_it(self):
+        # Another process cached the user just before the password changed,
+        # and stored it after the save dropped the cached copy.
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.set_password("y")
+        self.user.save()
+        session = self.client.session
+        session[HASH_SESSION_KEY] = self.user.get_session_auth_hash()
+        session.save()
+        self.cache.set(user_cache_key(self.user.pk), stale)
+        self.assertTrue(self.is_authenticated())
+        self.assertEqual(
+            self.cached().get_session_auth_hash(),
+            self.user.get_session_auth_hash(),
+        )
+
+    def test_logout_ends_the_session_everywhere(self):
+        other = Client()
+        name = settings.SESSION_COOKIE_NAME
+        other.cookies[name] = self.client.cookies[name].value
+        self.assertTrue(self.is_authenticated(other))
+        self.client.get(reverse("account:logout"))
+        self.assertIsNone(self.cached())
+        self.assertFalse(self.is_authenticated(other))
@@ -1,10 +1,26 @@
-from django.urls import path, include
+from django.contrib.auth import views as auth_views
+from django.urls import path, include, reverse_lazy
 
 from . import views
 
 app_name = "account"
 
 urlpatterns = [
+    # The stock views redirect to un-namespaced URL names.
+    path(
+        "password_reset/",
+        auth_views.PasswordResetView.as_view(
+            success_url=reverse_lazy("account:password_reset_done")
+        ),
+        name="password_reset",
+    ),
+    path(
+        "reset/<uidb64>/<token>/",
+        auth_views.PasswordResetConfirmView.as_view(
+            success_url=reverse_lazy("account:password_reset_complete")
+        ),
+        name="password_reset_confirm",
+    ),
     path("", include("django.contrib.auth.urls")),
     path("signup/", views.signup, name="signup"),
 ]
@@ -1,7 +1,30 @@
 from django.contrib import admin
 from .models import Board
+from .purge import queue_purge
 
 
 @admin.register(Board)
 class BoardAdmin(admin.ModelAdmin):
     list_display = ["name", "description"]
+    actions = ["purge"]
+
+    def has_delete_permission(self, request, obj=None):
+        # Deleting through the collector loads the whole board into memory;
+        # boards are purged in the background instead.
+        return False
+
+    def has_purge_permission(self, request):
+        return request.user.has_perm("boards.delete_board")
+
+    @admin.action(
+        description="Purge selected boards in the background",
+        permissions=["purge"],
+    )
+    def purge(self, request, queryset):
+        board_ids = list(queryset.values_list("pk", flat=True))
+        queue_purge(board_ids)
+        self.message_user(
+            request,
+            "Queued {} board(s) for purging; they disappear once every "
+            "topic and post is deleted.".format(len(board_ids)),
+        )
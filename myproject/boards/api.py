@@ -0,0 +1,95 @@
+"""Read-only NDJSON feeds of boards, topics and posts."""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_safe
+
+from .models import Board, Post, Topic
+
+CHUNK_SIZE = 500
+
+
+def parse_params(request):
+    """Return the ``after`` id and ``since`` datetime of a feed request."""
+    try:
+        after = int(request.GET.get("after", 0))
+    except ValueError:
+        raise ValueError("after must be an integer id.")
+    since = request.GET.get("since")
+    if since is not None:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValueError("since must be an ISO 8601 timestamp.")
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, timezone.utc)
+    return after, since
+
+
+def stream(queryset, chunk_size=CHUNK_SIZE):
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def feed(request, queryset, changed_since):
+    try:
+        after, since = parse_params(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    queryset = queryset.filter(pk__gt=after).order_by("pk")
+    if since is not None:
+        queryset = queryset.filter(changed_since(since))
+    return StreamingHttpResponse(
+        stream(queryset), content_type="application/x-ndjson"
+    )
+
+
+@require_safe
+def boards(request):
+    queryset = Board.objects.values(
+        "id", "name", "description", "topic_count", "post_count"
+    )
+    # Boards carry no timestamps; report every board for any since.
+    return feed(request, queryset, lambda since: Q())
+
+
+@require_safe
+def board_topics(request, pk):
+    board = get_object_or_404(Board, pk=pk)
+    queryset = board.topics.values(
+        "id",
+        "board_id",
+        "subject",
+        "created_at",
+        "last_updated",
+        "reply_count",
+        "views",
+        started_by=F("starter__username"),
+    )
+    return feed(request, queryset, lambda since: Q(last_updated__gte=since))
+
+
+@require_safe
+def topic_posts(request, pk, topic_pk):
+    topic = get_object_or_404(Topic, board__pk=pk, pk=topic_pk)
+    queryset = Post.objects.filter(topic=topic).values(
+        "id",
+        "topic_id",
+        "message",
+        "created_at",
+        "updated_at",
+        author=F("created_by__username"),
+    )
+    return feed(
+        request,
+        queryset,
+        lambda since: Q(created_at__gte=since) | Q(updated_at__gte=since),
+    )
@@ -0,0 +1,90 @@
+"""Moving old topics out of the live tables."""
+
+import calendar
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import caching, counters, search
+from .models import (
+    ArchivedPost,
+    ArchivedTopic,
+    Post,
+    Topic,
+    TopicReadMarker,
+    TopicSubscription,
+)
+from .purge import raw_delete
+
+
+def months_ago(months, now=None):
+    now = now or timezone.now()
+    month = now.month - 1 - months
+    year = now.year + month // 12
+    month = month % 12 + 1
+    day = min(now.day, calendar.monthrange(year, month)[1])
+    return now.replace(year=year, month=month, day=day)
+
+
+def _copy(source, target, column, pks, **values):
+    # Every column of the archive table comes from the same column of the
+    # live one, except the constants in ``values``.
+    quote = connection.ops.quote_name
+    columns = [
+        field.column
+        for field in target._meta.concrete_fields
+        if field.column not in values
+    ]
+    sql = "INSERT INTO {} ({}) SELECT {} FROM {} WHERE {} IN ({})".format(
+        quote(target._meta.db_table),
+        ", ".join(quote(name) for name in columns + list(values)),
+        ", ".join([quote(name) for name in columns] + ["%s"] * len(values)),
+        quote(source._meta.db_table),
+        quote(column),
+        ", ".join(["%s"] * len(pks)),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(values.values()) + list(pks))
+
+
+def archive(pks):
+    """Move the topics ``pks`` and their posts to the archive tables."""
+    boards = set(
+        Topic.objects.filter(pk__in=pks).values_list("board", flat=True)
+    )
+    posts = Post.objects.filter(topic__in=pks)
+    counters.topics_archived(pks)
+    _copy(Topic, ArchivedTopic, "id", pks, archived_at=timezone.now())
+    _copy(Post, ArchivedPost, "topic_id", pks)
+    search.remove_posts(list(posts.values_list("pk", flat=True)))
+    raw_delete(TopicReadMarker.objects.filter(topic__in=pks))
+    raw_delete(TopicSubscription.objects.filter(topic__in=pks))
+    raw_delete(posts)
+    raw_delete(Topic.objects.filter(pk__in=pks))
+    scopes = ["index"]
+    scopes += ["board:{}".format(pk) for pk in boards]
+    scopes += ["topic:{}".format(pk) for pk in pks]
+    transaction.on_commit(lambda: caching.bump(*scopes))
+
+
+def archive_topics(before, board_id=None, chunk_size=500):
+    """Archive topics last updated before ``before``, a chunk at a time."""
+    topics = Topic.objects.filter(last_updated__lt=before)
+    if board_id is not None:
+        topics = topics.filter(board=board_id)
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            # Locked and re-checked, so a topic replied to meanwhile stays.
+            pks = list(
+                topics.filter(pk__gt=last_pk)
+                .select_for_update()
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if pks:
+                archive(pks)
+        if not pks:
+            return
+        last_pk = pks[-1]
+        yield len(pks)
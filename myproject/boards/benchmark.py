@@ -0,0 +1,240 @@
+import itertools
+import json
+import platform
+import time
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client
+
+from myproject.middleware import QueryMetrics
+
+from . import compression
+
+
+class Scenario:
+    def __init__(self, name, method, url, data=None, expect=200):
+        self.name = name
+        self.method = method
+        self.url = url
+        # ``data`` may be a callable so every request can post unique data.
+        self.data = data
+        self.expect = expect
+
+    def request(self, client):
+        data = self.data() if callable(self.data) else self.data
+        response = getattr(client, self.method)(self.url, data or {})
+        if response.streaming:
+            # Streaming views do their work as the body is read.
+            b"".join(response.streaming_content)
+        return response
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * percent / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def make_client():
+    host = next(
+        (h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"),
+        "localhost",
+    )
+    return Client(HTTP_HOST=host)
+
+
+def run_scenario(client, scenario, requests, warmup=5, cold=False):
+    for _ in range(warmup):
+        scenario.request(client)
+    timings = []
+    queries = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        if cold:
+            cache.clear()
+        metrics = QueryMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            request_started = time.perf_counter()
+            response = scenario.request(client)
+            timings.append(time.perf_counter() - request_started)
+        if response.status_code != scenario.expect:
+            raise RuntimeError(
+                "{} returned {} instead of {}".format(
+                    scenario.name, response.status_code, scenario.expect
+                )
+            )
+        queries.append(metrics.count)
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "queries_per_request": sum(queries) / len(queries),
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+    }
+
+
+def run(scenarios, requests, warmup=5, cold=False, login=None):
+    client = make_client()
+    if login is not None:
+        client.force_login(login)
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(
+            client, scenario, requests, warmup=warmup, cold=cold
+        )
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "requests": requests,
+            "cold": cold,
+            "logged_in": login is not None,
+        },
+        "results": results,
+    }
+
+
+def message_storage(model, sample=1000):
+    """
+    Space taken by the messages of ``model`` and the time to read one back,
+    plain and compressed, in microseconds.
+    """
+    report = compression.storage(model)
+    report["saved_ratio"] = (
+        1 - report["stored_bytes"] / report["text_bytes"]
+        if report["text_bytes"]
+        else 0.0
+    )
+    # Stored forms of up to ``sample`` messages of each kind.
+    samples = {"plain": [], "compressed": []}
+    for message in model.objects.values_list("message", flat=True).iterator():
+        if isinstance(message, compression.CompressedText):
+            kind, data = "compressed", message.data
+        else:
+            kind, data = "plain", message.encode()
+        if len(samples[kind]) < sample:
+            samples[kind].append(data)
+    for kind, values in samples.items():
+        started = time.perf_counter()
+        for value in values:
+            compression.decompress(value)
+        elapsed = time.perf_counter() - started
+        report[kind + "_read_us"] = (
+            elapsed / len(values) * 1e6 if values else 0.0
+        )
+    return report
+
+
+def unique_values(prefix):
+    counter = itertools.count()
+    stamp = int(time.time() * 1000)
+    return lambda: "{}{}-{}".format(prefix, stamp, next(counter))
+
+
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "queries_per_request")
+
+
+def compare(report, baseline):
+    # Relative change per metric; positive numbers are regressions.
+    changes = {}
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        changes[name] = {
+            metric: (
+                (result[metric] - previous[metric]) / previous[metric]
+                if previous[metric]
+                else 0.0
+            )
+            for metric in COMPARED
+        }
+    return changes
+
+
+def save(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# The stock configuration the concurrency benchmark compares against.
+STOCK_DATABASE = {
+    "ENGINE": "django.db.backends.sqlite3",
+    "CONN_MAX_AGE": 0,
+    "OPTIONS": {},
+}
+
+
+def reply_worker(profile, url, user_id, requests, start_at):
+    # Runs in a spawned process, so Django has to be set up here; the stock
+    # profile swaps the engine before the first connection is made.
+    django.setup()
+    if profile == "stock":
+        settings.DATABASES["default"].update(STOCK_DATABASE)
+
+    from django.contrib.auth.models import User
+
+    client = make_client()
+    client.force_login(User.objects.get(pk=user_id))
+    connections.close_all()
+    time.sleep(max(0.0, start_at - time.time()))
+    started = time.perf_counter()
+    timings = []
+    errors = 0
+    for i in range(requests):
+        request_started = time.perf_counter()
+        try:
+            response = client.post(url, {"message": "Concurrent reply"})
+            ok = response.status_code == 302
+        except Exception:
+            ok = False
+        if ok:
+            timings.append(time.perf_counter() - request_started)
+        else:
+            errors += 1
+        if settings.DATABASES["default"].get("CONN_MAX_AGE") == 0:
+            # Mimic the request_finished handling of a real server.
+            connections.close_all()
+    return timings, errors, time.perf_counter() - started
+
+
+def run_concurrent_replies(profile, url, user_ids, requests):
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 3
+    with context.Pool(len(user_ids)) as pool:
+        results = pool.starmap(
+            reply_worker,
+            [(profile, url, pk, requests, start_at) for pk in user_ids],
+        )
+    timings = [t for worker_timings, _, _ in results for t in worker_timings]
+    elapsed = max(worker_elapsed for _, _, worker_elapsed in results)
+    return {
+        "processes": len(user_ids),
+        "requests": requests * len(user_ids),
+        "succeeded": len(timings),
+        "errors": sum(errors for _, errors, _ in results),
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "throughput_rps": len(timings) / elapsed if elapsed else 0.0,
+    }
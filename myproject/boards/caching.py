@@ -0,0 +1,156 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+from myproject.routers import reading_from_replica
+
+# Every cached page and fragment is keyed on the versions of the scopes it
+# depends on ("index", "board:<pk>", "topic:<pk>"). Writes bump a scope's
+# version instead of deleting keys, so stale entries just age out.
+VERSION_KEY = "forum:version:{}"
+PAGE_KEY = "forum:page:{}:{}"
+FRAGMENT_KEY = "forum:fragment:{}:{}:{}"
+STATS_KEY = "forum:stats:{}:{}"
+
+
+def timeout():
+    return getattr(settings, "FORUM_CACHE_TIMEOUT", 300)
+
+
+def _new_version():
+    return str(time.time_ns())
+
+
+def get_versions(scopes):
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A missing version must never match an entry cached under an
+            # evicted one, so start from a fresh value.
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return ".".join(str(versions[key]) for key in keys)
+
+
+def bump(*scopes):
+    version = _new_version()
+    cache.set_many(
+        {VERSION_KEY.format(scope): version for scope in scopes}, None
+    )
+
+
+def _newest(versions):
+    return max(map(int, filter(None, versions.split("."))), default=0)
+
+
+def changed_at(versions):
+    """When the newest of ``versions`` (from get_versions) was bumped."""
+    return datetime.fromtimestamp(_newest(versions) / 10**9, timezone.utc)
+
+
+def _settled(versions):
+    # A replica may not have caught up yet with the write that bumped a
+    # version; what was read from it must not be cached under that version.
+    if not reading_from_replica():
+        return True
+    lag = getattr(settings, "PRIMARY_PIN_SECONDS", 10) * 10**9
+    return time.time_ns() - _newest(versions) >= lag
+
+
+def _digest(*parts):
+    return hashlib.md5(
+        "\x00".join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def _count(kind, hit):
+    key = STATS_KEY.format(kind, "hits" if hit else "misses")
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    counts = cache.get_many(
+        [
+            STATS_KEY.format(kind, outcome)
+            for kind in ("page", "fragment")
+            for outcome in ("hits", "misses")
+        ]
+    )
+    return {
+        kind: {
+            outcome: counts.get(STATS_KEY.format(kind, outcome), 0)
+            for outcome in ("hits", "misses")
+        }
+        for kind in ("page", "fragment")
+    }
+
+
+def reset_stats():
+    cache.delete_many(
+        [
+            STATS_KEY.format(kind, outcome)
+            for kind in ("page", "fragment")
+            for outcome in ("hits", "misses")
+        ]
+    )
+
+
+def cached_fragment(request, template_name, get_context, versions, vary=()):
+    key = FRAGMENT_KEY.format(
+        template_name,
+        versions,
+        _digest(request.GET.get("cursor", ""), *vary),
+    )
+    html = cache.get(key)
+    _count("fragment", html is not None)
+    if html is None:
+        html = render_to_string(template_name, get_context(), request)
+        if _settled(versions):
+            cache.set(key, html, timeout())
+    return html
+
+
+def render_cached(
+    request,
+    template_name,
+    context,
+    scopes,
+    fragment_name,
+    fragment_template,
+    get_fragment_context,
+    vary=(),
+):
+    # Anonymous visitors all see the same page, so it is cached whole.
+    # Logged-in pages vary per viewer, so only the fragment that doesn't
+    # (or varies by the given ``vary`` values) is cached.
+    versions = get_versions(scopes)
+    anonymous = not request.user.is_authenticated
+    if anonymous:
+        # Keyed like the fragment, on what the views read from the query
+        # string, so unrelated parameters don't each get a copy.
+        page_key = PAGE_KEY.format(
+            _digest(request.path, request.GET.get("cursor", ""), *vary),
+            versions,
+        )
+        content = cache.get(page_key)
+        _count("page", content is not None)
+        if content is not None:
+            return HttpResponse(content)
+    context[fragment_name] = cached_fragment(
+        request, fragment_template, get_fragment_context, versions, vary
+    )
+    response = render(request, template_name, context)
+    if anonymous and response.status_code == 200 and _settled(versions):
+        cache.set(page_key, response.content, timeout())
+    return response
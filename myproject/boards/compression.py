@@ -0,0 +1,139 @@
+"""Compression of cold post bodies."""
+
+import struct
+import zlib
+
+from django.db import connection, transaction
+from django.db.models import Case, Value, When
+from django.utils.functional import Promise
+
+# HEADER, the text's UTF-8 length as four big-endian bytes, then zlib.
+# Text never starts with NUL, so plain messages are told apart.
+HEADER = b"\x00z"
+LENGTH = struct.Struct(">I")
+
+
+def compress(text, level=6):
+    data = text.encode()
+    return HEADER + LENGTH.pack(len(data)) + zlib.compress(data, level)
+
+
+def is_compressed(data):
+    return data[: len(HEADER)] == HEADER
+
+
+def text_size(data):
+    """Bytes of UTF-8 text stored in ``data``, without decompressing."""
+    if is_compressed(data):
+        return LENGTH.unpack_from(data, len(HEADER))[0]
+    return len(data)
+
+
+def decompress(data):
+    if is_compressed(data):
+        data = zlib.decompress(data[len(HEADER) + LENGTH.size :])
+    return data.decode()
+
+
+def to_text(value):
+    """A stored message as text, whatever form the database returned."""
+    if value is None or isinstance(value, str):
+        return value
+    return decompress(bytes(value))
+
+
+class CompressedText(Promise):
+    """A compressed message, decompressed when first used as text."""
+
+    def __init__(self, data):
+        self.data = data
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            self._text = decompress(self.data)
+        return self._text
+
+    def __repr__(self):
+        return "<CompressedText: {!r}>".format(str(self))
+
+    def __eq__(self, other):
+        if isinstance(other, (str, CompressedText)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __len__(self):
+        return len(str(self))
+
+    def __getattr__(self, name):
+        # Any other str method, e.g. message.strip().
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(str(self), name)
+
+
+def compress_posts(model, before, batch_size=500, level=6):
+    """Compress old messages, yielding (rows, bytes before, bytes after)."""
+    field = model._meta.get_field("message")
+    rows = model.objects.filter(created_at__lt=before).order_by("pk")
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            # Locked, so an edit can't be overwritten with the old text.
+            batch = list(
+                rows.filter(pk__gt=last_pk)
+                .select_for_update()
+                .values_list("pk", "message")[:batch_size]
+            )
+            if not batch:
+                return
+            pks = []
+            whens = []
+            before_size = after_size = 0
+            for pk, message in batch:
+                if isinstance(message, CompressedText):
+                    continue
+                plain = len(message.encode())
+                data = compress(message, level)
+                if len(data) >= plain:
+                    continue
+                pks.append(pk)
+                whens.append(
+                    When(pk=pk, then=Value(CompressedText(data), field))
+                )
+                before_size += plain
+                after_size += len(data)
+            if pks:
+                model.objects.filter(pk__in=pks).update(
+                    message=Case(*whens, output_field=field)
+                )
+        last_pk = batch[-1][0]
+        yield len(pks), before_size, after_size
+
+
+def storage(model):
+    """Rows, compressed rows, and bytes of text and of storage for them."""
+    totals = {"posts": 0, "compressed": 0, "text_bytes": 0, "stored_bytes": 0}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT {} FROM {}".format(
+                connection.ops.quote_name(
+                    model._meta.get_field("message").column
+                ),
+                connection.ops.quote_name(model._meta.db_table),
+            )
+        )
+        for rows in iter(lambda: cursor.fetchmany(1000), []):
+            for (value,) in rows:
+                if isinstance(value, str):
+                    # Written before the column held bytes.
+                    value = value.encode()
+                data = bytes(value)
+                totals["posts"] += 1
+                totals["compressed"] += is_compressed(data)
+                totals["text_bytes"] += text_size(data)
+                totals["stored_bytes"] += len(data)
+    return totals
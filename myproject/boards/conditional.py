@@ -0,0 +1,160 @@
+import hashlib
+
+from django.http import Http404
+
+from . import caching
+from .models import ArchivedTopic, Board, Topic, TopicSubscription
+from .readmarkers import read_markers, reader_scope
+
+
+def _memoize(request, key, lookup):
+    # The validators and the view all need the same row; fetch it once per
+    # request.
+    cache = request.__dict__.setdefault("_conditional_objects", {})
+    if key not in cache:
+        cache[key] = lookup()
+    return cache[key]
+
+
+def find_board(request, pk):
+    return _memoize(
+        request,
+        ("board", pk),
+        lambda: Board.objects.select_related("last_post")
+        .filter(pk=pk)
+        .first(),
+    )
+
+
+def _topic(pk, topic_pk):
+    for model in (Topic, ArchivedTopic):
+        topic = (
+            model.objects.select_related("board")
+            .filter(board__pk=pk, pk=topic_pk)
+            .first()
+        )
+        if topic is not None:
+            return topic
+    return None
+
+
+def find_topic(request, pk, topic_pk):
+    """The topic, or the archived topic, with that id on that board."""
+    return _memoize(
+        request, ("topic", pk, topic_pk), lambda: _topic(pk, topic_pk)
+    )
+
+
+def is_following(request, topic_pk):
+    user = request.user
+    if not user.is_authenticated:
+        return False
+    return _memoize(
+        request,
+        ("following", topic_pk),
+        lambda: TopicSubscription.objects.filter(
+            user=user, topic_id=topic_pk
+        ).exists(),
+    )
+
+
+def get_board_or_404(request, pk):
+    board = find_board(request, pk)
+    if board is None:
+        raise Http404("No Board matches the given query.")
+    return board
+
+
+def get_topic_or_404(request, pk, topic_pk):
+    topic = find_topic(request, pk, topic_pk)
+    if topic is None:
+        raise Http404("No Topic matches the given query.")
+    return topic
+
+
+def _etag(request, *parts):
+    viewer = request.user.pk if request.user.is_authenticated else ""
+    return hashlib.md5(
+        ":".join(str(part) for part in parts + (viewer,)).encode()
+    ).hexdigest()
+
+
+def _read_state(request):
+    # Topic lists show the viewer's unread flags, so they change whenever
+    # the viewer reads something. Markers of theirs that failed to write
+    # are retried first so the version reflects them.
+    user = request.user
+    if not user.is_authenticated:
+        return ""
+    if read_markers.has_pending(user.pk):
+        read_markers.flush(user.pk)
+    return caching.get_versions([reader_scope(user.pk)])
+
+
+def _version(request, scope):
+    # Bumped by every write that changes a cached page (see signals),
+    # including edits and view counts, which leave the counters alone.
+    return _memoize(
+        request, ("version", scope), lambda: caching.get_versions([scope])
+    )
+
+
+def _last_modified(request, scope, *times):
+    return max(
+        (caching.changed_at(_version(request, scope)),)
+        + tuple(time for time in times if time is not None)
+    )
+
+
+def board_topics_etag(request, pk):
+    board = find_board(request, pk)
+    if board is None:
+        return None
+    return _etag(
+        request,
+        "board",
+        pk,
+        board.topic_count,
+        board.post_count,
+        board.last_post_id,
+        _version(request, "board:{}".format(pk)),
+        _read_state(request),
+    )
+
+
+def board_topics_last_modified(request, pk):
+    board = find_board(request, pk)
+    if board is None or request.user.is_authenticated:
+        # Reading a topic changes the page without a new post; the ETag
+        # covers that.
+        return None
+    return _last_modified(
+        request,
+        "board:{}".format(pk),
+        board.last_post and board.last_post.created_at,
+    )
+
+
+def topic_posts_etag(request, pk, topic_pk):
+    topic = find_topic(request, pk, topic_pk)
+    if topic is None:
+        return None
+    return _etag(
+        request,
+        "topic",
+        topic_pk,
+        topic.reply_count,
+        topic.last_updated,
+        _version(request, "topic:{}".format(topic_pk)),
+        is_following(request, topic_pk),
+    )
+
+
+def topic_posts_last_modified(request, pk, topic_pk):
+    topic = find_topic(request, pk, topic_pk)
+    if topic is None or request.user.is_authenticated:
+        # Following or unfollowing changes the page; the ETag covers that.
+        return None
+    return _last_modified(
+        request, "topic:{}".format(topic_pk), topic.last_updated
+    )
@@ -0,0 +1,210 @@
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Max,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from account.models import UserProfile
+
+from . import ranking
+from .models import ArchivedPost, Board, Post, Topic
+
+
+def topic_created(topic, post):
+    Topic.objects.filter(pk=topic.pk).update(
+        last_updated=post.created_at,
+        last_post=post,
+        hot_score=ranking.heated("post", at=post.created_at),
+    )
+    Board.objects.filter(pk=topic.board_id).update(
+        topic_count=F("topic_count") + 1,
+        post_count=F("post_count") + 1,
+        last_post=post,
+    )
+    _profiles(post).update(post_count=F("post_count") + 1)
+
+
+def post_created(post):
+    Topic.objects.filter(pk=post.topic_id).update(
+        reply_count=F("reply_count") + 1,
+        last_updated=post.created_at,
+        last_post=post,
+        hot_score=ranking.heated("post", at=post.created_at),
+    )
+    Board.objects.filter(pk=post.topic.board_id).update(
+        post_count=F("post_count") + 1, last_post=post
+    )
+    _profiles(post).update(post_count=F("post_count") + 1)
+
+
+def post_deleted(post):
+    Topic.objects.filter(pk=post.topic_id, reply_count__gt=0).update(
+        reply_count=F("reply_count") - 1
+    )
+    Topic.objects.filter(pk=post.topic_id, last_post__isnull=True).update(
+        last_post=_latest_topic_post()
+    )
+    boards = Board.objects.filter(topics=post.topic_id)
+    boards.filter(post_count__gt=0).update(post_count=F("post_count") - 1)
+    boards.filter(last_post__isnull=True).update(last_post=_latest_post())
+    _profiles(post).filter(post_count__gt=0).update(
+        post_count=F("post_count") - 1
+    )
+
+
+def topic_deleted(topic):
+    Board.objects.filter(pk=topic.board_id, topic_count__gt=0).update(
+        topic_count=F("topic_count") - 1
+    )
+
+
+def topics_archived(pks):
+    """
+    Take topics about to be archived off their boards' counts; archived
+    posts still count towards their authors' profiles.
+    """
+    per_board = (
+        Topic.objects.filter(pk__in=pks)
+        .values("board")
+        .annotate(topics=Count("pk"), posts=Count("pk") + Sum("reply_count"))
+    )
+    for row in per_board:
+        Board.objects.filter(pk=row["board"]).update(
+            topic_count=Greatest(F("topic_count") - row["topics"], 0),
+            post_count=Greatest(F("post_count") - row["posts"], 0),
+        )
+    Board.objects.filter(last_post__topic__in=pks).update(
+        last_post=Subquery(
+            Post.objects.filter(topic__board=OuterRef("pk"))
+            .exclude(topic__in=pks)
+            .order_by("-pk")
+            .values("pk")[:1]
+        )
+    )
+
+
+def posts_purged(authors):
+    """Take purged posts off profiles; ``authors`` maps user ids to counts."""
+    if not authors:
+        return
+    purged = Case(
+        *[When(user=user_id, then=Value(n)) for user_id, n in authors.items()]
+    )
+    UserProfile.objects.filter(user__in=authors).update(
+        post_count=Greatest(F("post_count") - purged, 0)
+    )
+
+
+# Topic and board counters change along with a saved or deleted Post or
+# Topic, whose signals bump the cached pages showing them. Profile post
+# counts don't: the post lists of other topics by the same author keep
+# showing the old count until their cache entries expire, at most
+# FORUM_CACHE_TIMEOUT seconds later.
+def _profiles(post):
+    return UserProfile.objects.filter(user=post.created_by_id)
+
+
+def _latest_post():
+    return Subquery(
+        Post.objects.filter(topic__board=OuterRef("pk"))
+        .order_by("-pk")
+        .values("pk")[:1]
+    )
+
+
+def _latest_topic_post():
+    return Subquery(
+        Post.objects.filter(topic=OuterRef("pk"))
+        .order_by("-pk")
+        .values("pk")[:1]
+    )
+
+
+def _total(queryset, group_by):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(group_by)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def _chunks(queryset, chunk_size):
+    last_pk = 0
+    while True:
+        pks = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def recount_topics(chunk_size=1000):
+    posts = Post.objects.filter(topic=OuterRef("pk"))
+    latest = (
+        posts.order_by()
+        .values("topic")
+        .annotate(latest=Max("created_at"))
+        .values("latest")
+    )
+    total = 0
+    for pks in _chunks(Topic.objects.all(), chunk_size):
+        with transaction.atomic():
+            Topic.objects.filter(pk__in=pks).update(
+                reply_count=Greatest(_total(posts, "topic") - 1, 0),
+                last_updated=Coalesce(Subquery(latest), F("created_at")),
+                last_post=_latest_topic_post(),
+            )
+        total += len(pks)
+    return total
+
+
+def recount_boards(chunk_size=100):
+    total = 0
+    for pks in _chunks(Board.objects.all(), chunk_size):
+        with transaction.atomic():
+            Board.objects.filter(pk__in=pks).update(
+                topic_count=_total(
+                    Topic.objects.filter(board=OuterRef("pk")), "board"
+                ),
+                post_count=_total(
+                    Post.objects.filter(topic__board=OuterRef("pk")),
+                    "topic__board",
+                ),
+                last_post=_latest_post(),
+            )
+        total += len(pks)
+    return total
+
+
+def recount_profiles(chunk_size=1000):
+    total = 0
+    for pks in _chunks(UserProfile.objects.all(), chunk_size):
+        with transaction.atomic():
+            UserProfile.objects.filter(pk__in=pks).update(
+                post_count=_total(
+                    Post.objects.filter(created_by=OuterRef("user")),
+                    "created_by",
+                )
+                + _total(
+                    ArchivedPost.objects.filter(created_by=OuterRef("user")),
+                    "created_by",
+                )
+            )
+        total += len(pks)
+    return total
@@ -0,0 +1,218 @@
+"""Server-sent events for new posts on topic pages."""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import Resolver404, resolve
+
+from .models import Post, Topic
+
+# Most posts a poll or a reconnect sends in one go.
+BACKLOG = 50
+
+
+def poll_interval():
+    return getattr(settings, "TOPIC_EVENTS_POLL_INTERVAL", 15.0)
+
+
+def payload(post):
+    return {
+        "id": post.pk,
+        "author": post.created_by.username,
+        "created_at": post.created_at.isoformat(),
+        "html": str(post.rendered_message),
+    }
+
+
+def format_event(data):
+    return "id: {}\nevent: post\ndata: {}\n\n".format(
+        data["id"], json.dumps(data)
+    ).encode()
+
+
+def posts_after(topic_id, last_id):
+    posts = (
+        Post.objects.filter(topic_id=topic_id, pk__gt=last_id)
+        .select_related("created_by")
+        .order_by("pk")[:BACKLOG]
+    )
+    return [payload(post) for post in posts]
+
+
+def last_post_id(last_event_id, after, topic_id):
+    """Last-Event-ID, else the ``after`` id, else the newest post."""
+    for value in (last_event_id, after):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            pass
+    last = (
+        Post.objects.filter(topic_id=topic_id)
+        .order_by("-pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return last or 0
+
+
+class Broker:
+    # Fans published posts out to the queues of the streams watching their
+    # topic. Publishers run in request threads and subscribers on the event
+    # loop, so delivery goes through call_soon_threadsafe.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, topic_id):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[topic_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, topic_id, subscriber):
+        with self._lock:
+            self._subscribers[topic_id].discard(subscriber)
+            if not self._subscribers[topic_id]:
+                del self._subscribers[topic_id]
+
+    def subscriber_count(self, topic_id=None):
+        with self._lock:
+            if topic_id is not None:
+                return len(self._subscribers.get(topic_id, ()))
+            return sum(map(len, self._subscribers.values()))
+
+    def publish(self, topic_id, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, data)
+            except RuntimeError:
+                # The loop has been closed under a stale subscription.
+                pass
+
+
+broker = Broker()
+
+
+def publish_post(post):
+    broker.publish(post.topic_id, post.pk)
+
+
+@sync_to_async
+def _db(func, *args):
+    # Streams outlive requests, so recycle stale connections like the
+    # request cycle would.
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+def topic_exists(board_id, topic_id):
+    return Topic.objects.filter(board_id=board_id, pk=topic_id).exists()
+
+
+class EventStreamApp:
+    """ASGI application serving topic events, wrapping Django for the rest."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            try:
+                match = resolve(scope["path"])
+            except Resolver404:
+                match = None
+            if match is not None and match.url_name == "topic_events":
+                await self.stream(scope, receive, send, **match.kwargs)
+                return
+        await self.application(scope, receive, send)
+
+    async def stream(self, scope, receive, send, pk, topic_pk):
+        if not await _db(topic_exists, pk, topic_pk):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 404,
+                    "headers": [(b"content-type", b"text/plain")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b"Not found"})
+            return
+        last_event_id = dict(scope["headers"]).get(b"last-event-id")
+        after = parse_qs(scope["query_string"].decode()).get("after", [None])
+        last_id = await _db(last_post_id, last_event_id, after[0], topic_pk)
+        subscriber = broker.subscribe(topic_pk)
+        disconnected = asyncio.ensure_future(self.disconnect(receive))
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            # Pins the browser's Last-Event-ID in case nothing else arrives
+            # before it reconnects.
+            await self.send(send, "id: {}\n\n".format(last_id).encode())
+            backlog = await _db(posts_after, topic_pk, last_id)
+            while not disconnected.done():
+                for data in backlog:
+                    if data["id"] > last_id:
+                        await self.send(send, format_event(data))
+                        last_id = data["id"]
+                backlog = await self.next_posts(
+                    subscriber[1], disconnected, topic_pk, last_id
+                )
+                if not backlog and not disconnected.done():
+                    # Lets proxies and the server notice dead connections.
+                    await self.send(send, b": keepalive\n\n")
+        finally:
+            broker.unsubscribe(topic_pk, subscriber)
+            disconnected.cancel()
+
+    async def next_posts(self, queue, disconnected, topic_id, last_id):
+        getter = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait(
+            {getter, disconnected},
+            timeout=poll_interval(),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if getter in done:
+            # A publish only wakes the stream: the database is read for
+            # everything after last_id, so a post committed by another
+            # worker with a lower id than the published one isn't skipped.
+            while not queue.empty():
+                queue.get_nowait()
+        else:
+            getter.cancel()
+            if disconnected in done:
+                return []
+            # Nothing published here for a while: look for posts made
+            # through other workers.
+        return await _db(posts_after, topic_id, last_id)
+
+    async def disconnect(self, receive):
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+
+    async def send(self, send, body):
+        await send(
+            {"type": "http.response.body", "body": body, "more_body": True}
+        )
@@ -0,0 +1,63 @@
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from .compression import CompressedText, decompress, is_compressed
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    # A data descriptor, so that __get__ runs even once the value is in
+    # the instance's __dict__.
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedText):
+            # Decompressed on first access only, then kept as plain text.
+            value = instance.__dict__[self.field.attname] = str(value)
+        return value
+
+
+class CompressedTextField(models.TextField):
+    """
+    Text in a binary column, plain or compressed by boards.compression.
+    Reading a model instance leaves compressed text compressed until the
+    attribute is used, and saving it untouched writes it back as it was.
+    """
+
+    descriptor_class = CompressedTextDescriptor
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, str):
+            # Rows written before the column held bytes are still text.
+            return value
+        value = bytes(value)
+        if is_compressed(value):
+            return CompressedText(value)
+        return value.decode()
+
+    def to_python(self, value):
+        if isinstance(value, CompressedText):
+            return str(value)
+        if isinstance(value, (bytes, memoryview)):
+            return decompress(bytes(value))
+        return super().to_python(value)
+
+    def pre_save(self, model_instance, add):
+        # Not through the descriptor, which would decompress the text.
+        return model_instance.__dict__.get(self.attname)
+
+    def get_prep_value(self, value):
+        if isinstance(value, CompressedText):
+            return value.data
+        value = super().get_prep_value(value)
+        return None if value is None else value.encode()
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is not None:
+            return connection.Database.Binary(value)
+        return value
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from boards import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move topics with no activity for a number of months, and their "
+        "posts, to the archive tables. They stay readable, but closed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=12,
+            help="Archive topics last updated more than this long ago.",
+        )
+        parser.add_argument(
+            "--board", type=int, help="Only archive topics on this board."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of topics moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        before = archive.months_ago(options["months"])
+        total = 0
+        for archived in archive.archive_topics(
+            before, options["board"], options["chunk_size"]
+        ):
+            total += archived
+            if options["verbosity"] > 1:
+                self.stdout.write("Archived {} topics...".format(total))
+        self.stdout.write(
+            self.style.SUCCESS("Archived {} topics.".format(total))
+        )
@@ -0,0 +1,76 @@
+import sqlite3
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+
+from boards import benchmark
+from boards.models import Topic
+
+
+class Command(BaseCommand):
+    help = (
+        "Post replies to one topic from several processes at once, with the "
+        "stock SQLite configuration and with the tuned one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument(
+            "--requests", type=int, default=50, help="Replies per process."
+        )
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            choices=["stock", "tuned"],
+            default=["stock", "tuned"],
+        )
+        parser.add_argument(
+            "--output", help="Write results to this JSON file."
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark only applies to SQLite.")
+        topic = Topic.objects.order_by("pk").first()
+        users = list(
+            User.objects.order_by("pk").values_list("pk", flat=True)[
+                : options["processes"]
+            ]
+        )
+        if topic is None or len(users) < options["processes"]:
+            raise CommandError(
+                "Not enough data to benchmark; run seed_forum first."
+            )
+        url = reverse(
+            "board:reply_topic",
+            kwargs={"pk": topic.board_id, "topic_pk": topic.pk},
+        )
+        connection.close()
+
+        report = {"results": {}}
+        for profile in options["profiles"]:
+            self.set_journal_mode("WAL" if profile == "tuned" else "DELETE")
+            result = benchmark.run_concurrent_replies(
+                profile, url, users, options["requests"]
+            )
+            report["results"][profile] = result
+            self.stdout.write(
+                "{profile:<8}{succeeded:>6}/{requests} ok {errors:>5} errors "
+                "p50 {p50_ms:8.2f} ms  p99 {p99_ms:8.2f} ms "
+                "{throughput_rps:8.1f} replies/s".format(
+                    profile=profile, **result
+                )
+            )
+        if options["output"]:
+            benchmark.save(report, options["output"])
+
+    def set_journal_mode(self, mode):
+        # The journal mode is stored in the database file, so reset it
+        # before each run rather than inheriting it from the last one.
+        db = sqlite3.connect(str(connection.settings_dict["NAME"]))
+        try:
+            db.execute("PRAGMA journal_mode = {}".format(mode))
+        finally:
+            db.close()
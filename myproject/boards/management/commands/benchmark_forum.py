@@ -0,0 +1,187 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.urls import reverse
+
+from boards import benchmark
+from boards.models import Board, Post, Topic
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency, queries per request and throughput of the forum "
+        "views. Run seed_forum first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the cache before every request.",
+        )
+        parser.add_argument(
+            "--anonymous",
+            action="store_true",
+            help="Read pages without logging in.",
+        )
+        parser.add_argument(
+            "--allow-writes",
+            action="store_true",
+            help="Also benchmark replying and signing up, which add posts "
+            "and users to the database.",
+        )
+        parser.add_argument(
+            "--output", help="Write results to this JSON file."
+        )
+        parser.add_argument(
+            "--baseline", help="Compare against an earlier JSON result."
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=None,
+            help="Fail if a metric gets worse than the baseline by more "
+            "than this fraction (e.g. 0.1).",
+        )
+
+    def handle(self, *args, **options):
+        topic = (
+            Topic.objects.annotate(total=Count("posts"))
+            .order_by("-total")
+            .first()
+        )
+        if topic is None:
+            raise CommandError("No topics to benchmark; run seed_forum.")
+        user = User.objects.order_by("pk").first()
+        board = Board.objects.get(pk=topic.board_id)
+        topic_kwargs = {"pk": board.pk, "topic_pk": topic.pk}
+        reads = [
+            benchmark.Scenario("index", "get", reverse("index")),
+            benchmark.Scenario(
+                "board_topics",
+                "get",
+                reverse("board:board_topics", kwargs={"pk": board.pk}),
+            ),
+            benchmark.Scenario(
+                "topic_posts",
+                "get",
+                reverse("board:topic_posts", kwargs=topic_kwargs),
+            ),
+            # Reads every message body, so it pays for decompression.
+            benchmark.Scenario(
+                "post_feed",
+                "get",
+                reverse("board:api_topic_posts", kwargs=topic_kwargs),
+            ),
+        ]
+        message = benchmark.unique_values("Benchmark reply ")
+        username = benchmark.unique_values("bench")
+        writes = [
+            benchmark.Scenario(
+                "reply_topic",
+                "post",
+                reverse("board:reply_topic", kwargs=topic_kwargs),
+                lambda: {"message": message()},
+                expect=302,
+            ),
+        ]
+        signup = benchmark.Scenario(
+            "signup",
+            "post",
+            reverse("account:signup"),
+            lambda: self.signup_data(username()),
+            expect=302,
+        )
+        login = None if options["anonymous"] else user
+        report = benchmark.run(
+            reads,
+            options["requests"],
+            warmup=options["warmup"],
+            cold=options["cold"],
+            login=login,
+        )
+        if options["allow_writes"]:
+            for results in (
+                benchmark.run(
+                    writes, options["requests"], warmup=0, login=user
+                ),
+                # Each signup logs the new user in, so use a fresh client
+                # and fewer requests: password hashing dominates this one.
+                benchmark.run([signup], max(1, options["requests"] // 10), 0),
+            ):
+                report["results"].update(results["results"])
+        else:
+            self.stdout.write(
+                "Skipping reply_topic and signup, which write to the "
+                "database; pass --allow-writes to run them."
+            )
+        report["storage"] = benchmark.message_storage(Post)
+        self.print_report(report)
+
+        if options["output"]:
+            benchmark.save(report, options["output"])
+        if options["baseline"]:
+            self.check_baseline(report, options)
+
+    def signup_data(self, username):
+        return {
+            "username": username,
+            "email": "{}@example.com".format(username),
+            "password1": "benchmark-password",
+            "password2": "benchmark-password",
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            "{:<14}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+                "view", "p50 ms", "p95 ms", "p99 ms", "queries", "req/s"
+            )
+        )
+        for name, result in report["results"].items():
+            self.stdout.write(
+                "{:<14}{p50_ms:>10.2f}{p95_ms:>10.2f}{p99_ms:>10.2f}"
+                "{queries_per_request:>10.1f}{throughput_rps:>10.1f}".format(
+                    name, **result
+                )
+            )
+        storage = report["storage"]
+        self.stdout.write(
+            "messages: {posts} posts, {compressed} compressed, {text_bytes} "
+            "bytes of text stored in {stored_bytes} ({saved_ratio:.1%} "
+            "saved)".format(**storage)
+        )
+        self.stdout.write(
+            "message read: {plain_read_us:.1f} us plain, "
+            "{compressed_read_us:.1f} us compressed".format(**storage)
+        )
+
+    def check_baseline(self, report, options):
+        changes = benchmark.compare(
+            report, benchmark.load(options["baseline"])
+        )
+        regressions = []
+        self.stdout.write(
+            "{:<14}{:>10}{:>10}{:>10}{:>10}".format(
+                "vs baseline", "p50", "p95", "p99", "queries"
+            )
+        )
+        for name, metrics in changes.items():
+            self.stdout.write(
+                "{:<14}".format(name)
+                + "".join(
+                    "{:>+10.1%}".format(metrics[metric])
+                    for metric in benchmark.COMPARED
+                )
+            )
+            limit = options["max_regression"]
+            regressions += [
+                "{} {}".format(name, metric)
+                for metric, change in metrics.items()
+                if limit is not None and change > limit
+            ]
+        if regressions:
+            raise CommandError(
+                "Regressed against the baseline: " + ", ".join(regressions)
+            )
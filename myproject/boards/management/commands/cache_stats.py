@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from boards import caching
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counts for the forum page and fragment caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters."
+        )
+
+    def handle(self, *args, **options):
+        for kind, counts in caching.stats().items():
+            total = counts["hits"] + counts["misses"]
+            ratio = counts["hits"] / total if total else 0
+            self.stdout.write(
+                "{}: {} hits, {} misses ({:.1%} hit ratio)".format(
+                    kind, counts["hits"], counts["misses"], ratio
+                )
+            )
+        if options["reset"]:
+            caching.reset_stats()
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from boards import compression
+from boards.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress the messages of old posts, archived or not, in batches. "
+        "Run it periodically; compressed posts are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Compress posts created more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of posts read per transaction.",
+        )
+        parser.add_argument(
+            "--level", type=int, default=6, help="zlib compression level."
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        posts = text_bytes = stored_bytes = 0
+        for model in (Post, ArchivedPost):
+            for compressed, plain, stored in compression.compress_posts(
+                model, before, options["batch_size"], options["level"]
+            ):
+                posts += compressed
+                text_bytes += plain
+                stored_bytes += stored
+                if options["verbosity"] > 1:
+                    self.stdout.write("Compressed {} posts...".format(posts))
+        saved = text_bytes - stored_bytes
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Compressed {} posts, saving {} bytes ({:.0%}).".format(
+                    posts, saved, saved / text_bytes if text_bytes else 0
+                )
+            )
+        )
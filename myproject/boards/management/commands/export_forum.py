@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from boards import transfer
+
+
+class Command(BaseCommand):
+    help = "Export users, boards, topics and posts as gzipped JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write, e.g. forum.jsonl.gz")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        totals = transfer.export(options["path"], options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Exported {user} users, {board} boards, {topic} topics, "
+                "{post} posts, {archived_topic} archived topics and "
+                "{archived_post} archived posts.".format(**totals)
+            )
+        )
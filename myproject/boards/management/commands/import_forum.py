@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from boards import caching, counters, ranking, search, transfer
+
+
+class Command(BaseCommand):
+    help = "Import a forum written by export_forum."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File written by export_forum.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        importer = transfer.Importer(options["batch_size"])
+        try:
+            totals = importer.load(transfer.read(options["path"]))
+        except (KeyError, OSError, ValueError) as e:
+            raise CommandError("Invalid export file: {}".format(e))
+        self.stdout.write("Updating counters, rankings and search index...")
+        counters.recount_topics()
+        counters.recount_boards()
+        counters.recount_profiles()
+        ranking.rebuild()
+        for _ in search.rebuild():
+            pass
+        caching.bump(
+            "index",
+            *("board:{}".format(pk) for pk in importer.boards.values())
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {user} users, {board} boards, {topic} topics, "
+                "{post} posts, {archived_topic} archived topics and "
+                "{archived_post} archived posts in {elapsed:.1f}s.".format(
+                    elapsed=time.perf_counter() - started, **totals
+                )
+            )
+        )
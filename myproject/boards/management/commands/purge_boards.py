@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from boards import purge
+from boards.models import Board
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete boards with everything in them, in chunks of raw bulk "
+        "deletes instead of loading them into memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("board_ids", nargs="+", type=int)
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the purges for run_workers instead.",
+        )
+
+    def handle(self, *args, **options):
+        board_ids = options["board_ids"]
+        missing = set(board_ids) - set(
+            Board.objects.filter(pk__in=board_ids).values_list("pk", flat=True)
+        )
+        if missing:
+            raise CommandError(
+                "No board with id {}.".format(", ".join(map(str, missing)))
+            )
+        if options["background"]:
+            purge.queue_purge(board_ids)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Queued {} boards for purging.".format(len(board_ids))
+                )
+            )
+            return
+        for board_id in board_ids:
+            total = 0
+            for deleted in purge.purge_steps(board_id, options["chunk_size"]):
+                total += deleted
+                if options["verbosity"] > 1:
+                    self.stdout.write("Deleted {} rows...".format(total))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Purged board {} ({} rows).".format(board_id, total)
+                )
+            )
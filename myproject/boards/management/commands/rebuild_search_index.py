@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from boards import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the posts table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of posts indexed per statement.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for indexed in search.rebuild(options["batch_size"]):
+            total += indexed
+            if options["verbosity"] > 1:
+                self.stdout.write("Indexed {} posts...".format(total))
+        self.stdout.write(
+            self.style.SUCCESS("Indexed {} posts.".format(total))
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from boards import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized topic, board and profile counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows updated per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        topics = counters.recount_topics(chunk_size)
+        boards = counters.recount_boards(chunk_size)
+        profiles = counters.recount_profiles(chunk_size)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Recounted {} topics, {} boards and {} profiles.".format(
+                    topics, boards, profiles
+                )
+            )
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from boards import rendering
+from boards.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Store freshly rendered HTML for posts rendered by an older version."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of posts updated per transaction.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every post, not just the stale ones.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for model in (Post, ArchivedPost):
+            posts = model.objects.all()
+            if not options["all"]:
+                posts = posts.exclude(
+                    message_renderer=rendering.RENDERER_VERSION
+                )
+            for rendered in rendering.rerender(posts, options["chunk_size"]):
+                total += rendered
+                if options["verbosity"] > 1:
+                    self.stdout.write("Rendered {} posts...".format(total))
+        self.stdout.write(
+            self.style.SUCCESS("Rendered {} posts.".format(total))
+        )
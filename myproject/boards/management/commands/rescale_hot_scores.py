@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from boards import ranking
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the hot ranking epoch to now, shrinking every topic's stored "
+        "score to match. Writes queue this by themselves when needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute every score from the topic counters instead.",
+        )
+
+    def handle(self, *args, **options):
+        ranking.rescale(force=True)
+        if options["rebuild"]:
+            topics = ranking.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS("Rebuilt {} hot scores.".format(topics))
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Rescaled hot scores."))
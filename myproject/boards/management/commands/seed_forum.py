@@ -0,0 +1,176 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from account.models import UserProfile
+from boards import counters, ranking, rendering, search
+from boards.models import Board, Post, Topic
+
+PASSWORD = "password"
+
+
+class Command(BaseCommand):
+    help = "Bulk-create synthetic users, boards, topics and posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--boards", type=int, default=10)
+        parser.add_argument("--topics", type=int, default=1000)
+        parser.add_argument(
+            "--posts",
+            type=int,
+            default=10000,
+            help="Total posts, including the opening post of every topic.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+        if options["topics"] > 0 and options["boards"] < 1:
+            raise CommandError("--boards must be at least 1 to add topics.")
+        self.verbosity = options["verbosity"]
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        users = self.create_users(options["users"])
+        boards = self.create_boards(options["boards"])
+        topics = self.create_topics(options["topics"], boards, users)
+        posts = self.create_posts(options["posts"], topics, users)
+        self.stdout.write("Updating counters, rankings and search index...")
+        counters.recount_topics()
+        counters.recount_boards()
+        counters.recount_profiles()
+        ranking.rebuild()
+        for _ in search.rebuild():
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Created {} users, {} boards, {} topics and {} posts. "
+                "Every user's password is '{}'.".format(
+                    len(users), len(boards), len(topics), posts, PASSWORD
+                )
+            )
+        )
+
+    def next_ids(self, model, count):
+        start = (model.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        return range(start, start + count)
+
+    def bulk_create(self, model, objects):
+        batch = []
+        total = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) == self.batch_size:
+                total += self.insert(model, batch)
+                batch = []
+        if batch:
+            total += self.insert(model, batch)
+        return total
+
+    def insert(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        if self.verbosity > 1:
+            self.stdout.write(
+                "Inserted {} {}".format(
+                    len(batch), model._meta.verbose_name_plural
+                )
+            )
+        return len(batch)
+
+    def create_users(self, count):
+        ids = self.next_ids(User, count)
+        password = make_password(PASSWORD)
+        self.bulk_create(
+            User,
+            (
+                User(
+                    id=pk,
+                    username="user{}".format(pk),
+                    email="user{}@example.com".format(pk),
+                    password=password,
+                )
+                for pk in ids
+            ),
+        )
+        self.bulk_create(UserProfile, (UserProfile(user_id=pk) for pk in ids))
+        return ids
+
+    def create_boards(self, count):
+        ids = self.next_ids(Board, count)
+        self.bulk_create(
+            Board,
+            (
+                Board(
+                    id=pk,
+                    name="Board {}".format(pk),
+                    description="Synthetic board {}.".format(pk),
+                )
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def create_topics(self, count, boards, users):
+        ids = self.next_ids(Topic, count)
+        self.bulk_create(
+            Topic,
+            (
+                Topic(
+                    id=pk,
+                    subject=self.sentence(8),
+                    board_id=self.rng.choice(boards),
+                    starter_id=self.starter(pk, users),
+                )
+                for pk in ids
+            ),
+        )
+        return ids
+
+    def create_posts(self, count, topics, users):
+        def posts():
+            for topic in topics:
+                yield self.post(
+                    self.sentence(self.rng.randint(5, 120)),
+                    topic,
+                    self.starter(topic, users),
+                )
+            for _ in range(count - len(topics)):
+                yield self.post(
+                    self.sentence(self.rng.randint(5, 120)),
+                    self.rng.choice(topics),
+                    self.rng.choice(users),
+                )
+
+        return self.bulk_create(Post, posts())
+
+    def post(self, message, topic, user):
+        post = Post(
+            message=message,
+            topic_id=topic,
+            created_by_id=user,
+        )
+        rendering.render(post)
+        return post
+
+    def starter(self, topic, users):
+        # Derived from the topic id so the opening post can be attributed
+        # to the starter without keeping every topic in memory.
+        return users[topic * 7919 % len(users)]
+
+    def sentence(self, words):
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua django python query "
+    "index cache template migration board topic reply thread database view "
+    "model form field request response server worker latency throughput"
+).split()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from myproject.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile every template into the cached template loader. Only "
+        "useful with DEBUG off, where the cached loader is enabled."
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Compiled {} templates.".format(warm_templates())
+            )
+        )
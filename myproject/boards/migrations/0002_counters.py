@@ -0,0 +1,100 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_counters(apps, schema_editor):
+    Board = apps.get_model("boards", "Board")
+    Topic = apps.get_model("boards", "Topic")
+    Post = apps.get_model("boards", "Post")
+
+    posts = Post.objects.filter(topic=OuterRef("pk")).order_by()
+    Topic.objects.update(
+        last_updated=Coalesce(
+            Subquery(
+                posts.values("topic")
+                .annotate(latest=Max("created_at"))
+                .values("latest")
+            ),
+            F("created_at"),
+        ),
+        reply_count=Coalesce(
+            Subquery(
+                posts.values("topic")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            1,
+        )
+        - 1,
+    )
+    board_posts = Post.objects.filter(topic__board=OuterRef("pk")).order_by()
+    Board.objects.update(
+        topic_count=Coalesce(
+            Subquery(
+                Topic.objects.filter(board=OuterRef("pk"))
+                .order_by()
+                .values("board")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        ),
+        post_count=Coalesce(
+            Subquery(
+                board_posts.values("topic__board")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        ),
+        last_post=Subquery(board_posts.order_by("-pk").values("pk")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0001_first"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="board",
+            name="last_post",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="boards.post",
+            ),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="post_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="board",
+            name="topic_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="last_updated",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
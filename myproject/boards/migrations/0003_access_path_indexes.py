@@ -0,0 +1,42 @@
+# Generated by Django 3.2.7 on 2026-10-18 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0002_counters"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="post",
+            options={"ordering": ["created_at", "id"]},
+        ),
+        migrations.AlterModelOptions(
+            name="topic",
+            options={"ordering": ["-last_updated", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["topic", "created_at", "id"],
+                name="post_topic_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["created_by", "created_at"],
+                name="post_author_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(
+                fields=["board", "-last_updated", "-id"],
+                name="topic_board_recent_idx",
+            ),
+        ),
+    ]
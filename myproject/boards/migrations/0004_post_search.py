@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE boards_post_fts USING fts5("
+        "subject, message, board_id UNINDEXED, topic_id UNINDEXED, "
+        "tokenize='porter unicode61')"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE boards_post_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0003_access_path_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0004_post_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="topic",
+            name="views",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
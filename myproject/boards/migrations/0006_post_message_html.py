@@ -0,0 +1,23 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0005_topic_views"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="message_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="message_renderer",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
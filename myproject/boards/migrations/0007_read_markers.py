@@ -0,0 +1,114 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_last_post(apps, schema_editor):
+    Topic = apps.get_model("boards", "Topic")
+    Post = apps.get_model("boards", "Post")
+    Topic.objects.update(
+        last_post=Subquery(
+            Post.objects.filter(topic=OuterRef("pk"))
+            .order_by("-pk")
+            .values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("boards", "0006_post_message_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="topic",
+            name="last_post",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="boards.post",
+            ),
+        ),
+        migrations.RunPython(backfill_last_post, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="TopicReadMarker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_read_post_id", models.BigIntegerField()),
+                (
+                    "topic",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="boards.topic",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="BoardReadMarker",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("read_at", models.DateTimeField()),
+                (
+                    "board",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="boards.board",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="topicreadmarker",
+            constraint=models.UniqueConstraint(
+                fields=("user", "topic"), name="topic_read_marker_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="boardreadmarker",
+            constraint=models.UniqueConstraint(
+                fields=("user", "board"), name="board_read_marker_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.2.7 on 2026-10-18 09:43
+
+import math
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.utils.timezone
+
+
+def backfill_hot_score(apps, schema_editor):
+    # As boards.ranking.rebuild() with the default settings: every post and
+    # view counted at the topic's last update, decayed to now.
+    RankingEpoch = apps.get_model("boards", "RankingEpoch")
+    Topic = apps.get_model("boards", "Topic")
+    now = timezone.now()
+    RankingEpoch.objects.create(started_at=now)
+    topics = Topic.objects.only("reply_count", "views", "last_updated")
+    batch = []
+    for topic in topics.iterator(chunk_size=1000):
+        age = (now - topic.last_updated).total_seconds()
+        topic.hot_score = math.exp(-age * math.log(2) / (12 * 3600)) * (
+            topic.reply_count + 1 + 0.05 * topic.views
+        )
+        batch.append(topic)
+        if len(batch) == 1000:
+            Topic.objects.bulk_update(batch, ["hot_score"])
+            batch = []
+    Topic.objects.bulk_update(batch, ["hot_score"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0008_topic_subscriptions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RankingEpoch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("scale", models.FloatField(default=1.0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="hot_score",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(
+                fields=["board", "-hot_score"], name="topic_board_hot_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(fields=["-hot_score"], name="topic_hot_idx"),
+        ),
+        migrations.RunPython(backfill_hot_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.7 on 2026-10-18 10:05
+
+import boards.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("boards", "0010_archive"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivedpost",
+            name="message",
+            field=boards.fields.CompressedTextField(),
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="message",
+            field=boards.fields.CompressedTextField(max_length=4000),
+        ),
+    ]
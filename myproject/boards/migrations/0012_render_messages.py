@@ -0,0 +1,50 @@
+# Generated by Django 3.2.7 on 2026-10-18 11:20
+
+from django.db import migrations, transaction
+from django.utils.html import linebreaks, urlize
+
+# The renderer as of this migration, version 1; later versions ship their
+# own migration or are applied with rerender_posts.
+RENDERER_VERSION = 1
+
+
+def render_message(text):
+    return linebreaks(
+        urlize(text, trim_url_limit=60, nofollow=True, autoescape=True)
+    )
+
+
+def render_messages(apps, schema_editor):
+    # Rows from before 0006 have no stored HTML. One transaction per chunk,
+    # so a large table isn't rewritten in a single transaction.
+    for name in ("Post", "ArchivedPost"):
+        model = apps.get_model("boards", name)
+        posts = model.objects.filter(message_renderer=0).order_by("pk")
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    posts.filter(pk__gt=last_pk).only("message")[:1000]
+                )
+                if not batch:
+                    break
+                for post in batch:
+                    post.message_html = render_message(str(post.message))
+                    post.message_renderer = RENDERER_VERSION
+                model.objects.bulk_update(
+                    batch, ["message_html", "message_renderer"]
+                )
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("boards", "0011_compressed_messages"),
+    ]
+
+    operations = [
+        migrations.RunPython(render_messages, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,20 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from . import rendering
+from .fields import CompressedTextField
 
 
 class Board(models.Model):
     name = models.CharField(max_length=25, unique=True)
     description = models.CharField(max_length=100)
+    topic_count = models.PositiveIntegerField(default=0)
+    post_count = models.PositiveIntegerField(default=0)
+    last_post = models.ForeignKey(
+        "Post", null=True, related_name="+", on_delete=models.SET_NULL
+    )
 
     def __str__(self):
         return self.name
@@ -13,16 +23,66 @@ class Board(models.Model):
 class Topic(models.Model):
     subject = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now_add=True)
     board = models.ForeignKey(
         Board, related_name="topics", on_delete=models.CASCADE
     )
     starter = models.ForeignKey(
         User, related_name="topics", on_delete=models.CASCADE
     )
+    reply_count = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    last_post = models.ForeignKey(
+        "Post", null=True, related_name="+", on_delete=models.SET_NULL
+    )
+    # See boards.ranking; only comparable between topics.
+    hot_score = models.FloatField(default=0, editable=False)
+
+    class Meta:
+        ordering = ["-last_updated", "-id"]
+        indexes = [
+            models.Index(
+                fields=["board", "-last_updated", "-id"],
+                name="topic_board_recent_idx",
+            ),
+            models.Index(
+                fields=["board", "-hot_score"], name="topic_board_hot_idx"
+            ),
+            models.Index(fields=["-hot_score"], name="topic_hot_idx"),
+        ]
+
+    def __str__(self):
+        return self.subject
+
 
+class RenderedMessage:
+    # Messages are rendered when saved, or by rerender_posts after a change
+    # to the renderer; reading a post never renders it.
 
-class Post(models.Model):
-    message = models.TextField(max_length=4000)
+    @property
+    def rendered_message(self):
+        return mark_safe(self.message_html)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            rendering.render(self)
+        elif "message" in update_fields:
+            rendering.render(self)
+            kwargs["update_fields"] = set(update_fields) | {
+                "message_html",
+                "message_renderer",
+            }
+        super().save(*args, **kwargs)
+
+
+class Post(RenderedMessage, models.Model):
+    # Old posts are compressed by the compress_posts command.
+    message = CompressedTextField(max_length=4000)
+    message_html = models.TextField(blank=True, default="", editable=False)
+    message_renderer = models.PositiveSmallIntegerField(
+        default=0, editable=False
+    )
     topic = models.ForeignKey(
         Topic, related_name="posts", on_delete=models.CASCADE
     )
@@ -34,3 +94,133 @@ class Post(models.Model):
     updated_by = models.ForeignKey(
         User, null=True, related_name="+", on_delete=models.CASCADE
     )
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["topic", "created_at", "id"],
+                name="post_topic_created_idx",
+            ),
+            models.Index(
+                fields=["created_by", "created_at"],
+                name="post_author_created_idx",
+            ),
+        ]
+
+
+class TopicReadMarker(models.Model):
+    # One row per user and topic they have opened: the newest post they
+    # have seen, rather than a row per post read.
+    user = models.ForeignKey(User, related_name="+", on_delete=models.CASCADE)
+    topic = models.ForeignKey(
+        Topic, related_name="+", on_delete=models.CASCADE
+    )
+    last_read_post_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "topic"], name="topic_read_marker_unique"
+            ),
+        ]
+
+
+class BoardReadMarker(models.Model):
+    # Everything in the board updated before read_at counts as read.
+    user = models.ForeignKey(User, related_name="+", on_delete=models.CASCADE)
+    board = models.ForeignKey(
+        Board, related_name="+", on_delete=models.CASCADE
+    )
+    read_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "board"], name="board_read_marker_unique"
+            ),
+        ]
+
+
+class TopicSubscription(models.Model):
+    # Subscribers hear about posts above notified_post_id, which each
+    # digest moves up to the newest post it covered.
+    user = models.ForeignKey(
+        User, related_name="topic_subscriptions", on_delete=models.CASCADE
+    )
+    topic = models.ForeignKey(
+        Topic, related_name="subscriptions", on_delete=models.CASCADE
+    )
+    notified_post_id = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "topic"], name="topic_subscription_unique"
+            ),
+        ]
+
+
+class RankingEpoch(models.Model):
+    # The newest row is the time hot scores are currently measured from.
+    # ``scale`` converts a score measured from an older epoch to the
+    # current one.
+    started_at = models.DateTimeField(default=timezone.now)
+    scale = models.FloatField(default=1.0)
+
+
+# Topics untouched for months and their posts are moved here by
+# boards.archive, keeping their ids, so the live tables stay small while
+# topic_posts still serves them read-only.
+
+
+class ArchivedTopic(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    subject = models.CharField(max_length=255)
+    created_at = models.DateTimeField()
+    last_updated = models.DateTimeField()
+    board = models.ForeignKey(
+        Board, related_name="archived_topics", on_delete=models.CASCADE
+    )
+    starter = models.ForeignKey(
+        User, related_name="+", on_delete=models.CASCADE
+    )
+    reply_count = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    last_post = models.ForeignKey(
+        "ArchivedPost", null=True, related_name="+", on_delete=models.SET_NULL
+    )
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-last_updated", "-id"]
+
+    def __str__(self):
+        return self.subject
+
+
+class ArchivedPost(RenderedMessage, models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    message = CompressedTextField()
+    message_html = models.TextField(blank=True, default="")
+    message_renderer = models.PositiveSmallIntegerField(default=0)
+    topic = models.ForeignKey(
+        ArchivedTopic, related_name="posts", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(null=True)
+    created_by = models.ForeignKey(
+        User, related_name="archived_posts", on_delete=models.CASCADE
+    )
+    updated_by = models.ForeignKey(
+        User, null=True, related_name="+", on_delete=models.CASCADE
+    )
+
+    class Meta:
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["topic", "created_at", "id"],
+                name="archived_post_topic_idx",
+            ),
+        ]
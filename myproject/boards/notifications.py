@@ -0,0 +1,120 @@
+"""Email digests of new replies for topic subscribers."""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+from django.db.models import Count, F, OuterRef, Subquery
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from jobs import queue
+
+from .models import Post, TopicSubscription
+
+FAN_OUT_CHUNK_SIZE = 500
+
+
+def digest_delay():
+    return getattr(settings, "NOTIFICATION_DIGEST_DELAY", 300)
+
+
+def subscribe(user, topic_id, post_id):
+    # New subscribers hear about posts after ``post_id``; an existing
+    # subscription is left as it is.
+    TopicSubscription.objects.bulk_create(
+        [
+            TopicSubscription(
+                user=user, topic_id=topic_id, notified_post_id=post_id or 0
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def post_created(post):
+    """Subscribe the author and queue the fan-out; call inside the write."""
+    subscribe(post.created_by, post.topic_id, post.pk)
+    queue.enqueue(notify_subscribers, {"post_id": post.pk})
+
+
+def notify_subscribers(post_id):
+    post = Post.objects.filter(pk=post_id).values("topic", "created_by")
+    post = post.first()
+    if post is None:
+        return
+    subscribers = (
+        TopicSubscription.objects.filter(
+            topic=post["topic"], notified_post_id__lt=post_id
+        )
+        .exclude(user=post["created_by"])
+        .values_list("user", flat=True)
+    )
+    jobs = []
+    for user_id in subscribers.iterator(chunk_size=FAN_OUT_CHUNK_SIZE):
+        jobs.append(
+            queue.job(
+                send_digest,
+                {"user_id": user_id},
+                dedupe_key="digest:{}".format(user_id),
+                delay=digest_delay(),
+            )
+        )
+        if len(jobs) == FAN_OUT_CHUNK_SIZE:
+            queue.enqueue_many(jobs)
+            jobs = []
+    queue.enqueue_many(jobs)
+
+
+def pending_topics(user):
+    """The user's subscriptions with posts by others since the last digest."""
+    new_posts = (
+        Post.objects.filter(
+            topic=OuterRef("topic"), pk__gt=OuterRef("notified_post_id")
+        )
+        .exclude(created_by=user)
+        .order_by()
+        .values("topic")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return (
+        TopicSubscription.objects.filter(
+            user=user, topic__last_post__gt=F("notified_post_id")
+        )
+        .select_related("topic")
+        .annotate(new_posts=Subquery(new_posts))
+        .order_by("topic__last_updated")
+    )
+
+
+def send_digest(user_id):
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None:
+        return
+    subscriptions = list(pending_topics(user))
+    topics = [
+        subscription
+        for subscription in subscriptions
+        if subscription.new_posts
+    ]
+    if topics and user.email:
+        for subscription in topics:
+            subscription.url = settings.FORUM_BASE_URL + reverse(
+                "board:topic_posts",
+                kwargs={
+                    "pk": subscription.topic.board_id,
+                    "topic_pk": subscription.topic_id,
+                },
+            )
+        context = {"user": user, "topics": topics}
+        subject = render_to_string("emails/reply_digest_subject.txt", context)
+        send_mail(
+            " ".join(subject.split()),
+            render_to_string("emails/reply_digest.txt", context),
+            None,
+            [user.email],
+        )
+    # Only after the mail is sent, so a failed send is retried in full.
+    for subscription in subscriptions:
+        subscription.notified_post_id = subscription.topic.last_post_id
+    TopicSubscription.objects.bulk_update(subscriptions, ["notified_post_id"])
@@ -0,0 +1,149 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+FORWARD = "n"
+BACKWARD = "p"
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def last_cursor(self):
+        return encode_cursor(BACKWARD)
+
+
+class KeysetPaginator:
+    # Seeks past the ordering key of the last row seen instead of using
+    # OFFSET, so page N costs the same as page 1. ``ordering`` must end
+    # with a unique field.
+
+    def __init__(self, queryset, ordering, per_page=20):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip("-"))
+            for name in ordering
+        ]
+
+    def page(self, cursor=None):
+        direction, values = self.decode(cursor)
+        backward = direction == BACKWARD
+        queryset = self.queryset.order_by(
+            *(
+                (self._reverse(name) for name in self.ordering)
+                if backward
+                else self.ordering
+            )
+        )
+        if values:
+            queryset = queryset.filter(self._seek(values, backward))
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backward:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, None, None)
+        if backward:
+            has_next, has_previous = bool(values), has_more
+        else:
+            has_next, has_previous = has_more, bool(values)
+        next_cursor = previous_cursor = None
+        if has_next:
+            next_cursor = encode_cursor(FORWARD, self._key(rows[-1]))
+        if has_previous:
+            previous_cursor = encode_cursor(BACKWARD, self._key(rows[0]))
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+    def decode(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            direction, values = decode_cursor(cursor)
+            if not values:
+                return direction, None
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+            if None in values:
+                raise ValueError(values)
+            return direction, values
+        except (TypeError, ValueError, ValidationError):
+            return FORWARD, None
+
+    def _key(self, obj):
+        return [getattr(obj, field.attname) for field in self.fields]
+
+    def _seek(self, values, backward):
+        # (a, b) > (x, y) expands to a >= x AND (a > x OR (a = x AND b > y));
+        # the leading range keeps the lookup on the index.
+        condition = Q()
+        equal = Q()
+        for name, field, value in zip(self.ordering, self.fields, values):
+            descending = name.startswith("-") != backward
+            lookup = "{}__{}".format(field.name, "lt" if descending else "gt")
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{field.name: value})
+        first = self.ordering[0].startswith("-") != backward
+        leading = "{}__{}".format(
+            self.fields[0].name, "lte" if first else "gte"
+        )
+        return Q(**{leading: values[0]}) & condition
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith("-") else "-" + name
+
+
+def encode_cursor(direction, values=()):
+    payload = [direction] + [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    return (
+        base64.urlsafe_b64encode(json.dumps(payload).encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor):
+    payload = json.loads(
+        base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    )
+    if not isinstance(payload, list) or not payload:
+        raise ValueError(cursor)
+    direction, *values = payload
+    if direction not in (FORWARD, BACKWARD):
+        raise ValueError(direction)
+    for value in values:
+        # Only what encode_cursor writes: strings and numbers.
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(value)
+    return direction, values
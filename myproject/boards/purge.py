@@ -0,0 +1,117 @@
+"""Deleting whole boards without Django's cascade collector."""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from jobs import queue
+
+from . import counters, search
+from .models import (
+    ArchivedPost,
+    ArchivedTopic,
+    Board,
+    Post,
+    Topic,
+    TopicReadMarker,
+    TopicSubscription,
+)
+
+
+def chunk_size():
+    return getattr(settings, "PURGE_CHUNK_SIZE", 1000)
+
+
+def chunks_per_job():
+    return getattr(settings, "PURGE_CHUNKS_PER_JOB", 20)
+
+
+def raw_delete(queryset):
+    # A single DELETE: no collector, no signals, nothing loaded.
+    return queryset._raw_delete(queryset.db)
+
+
+def _authors(posts):
+    return dict(
+        posts.order_by()
+        .values("created_by")
+        .annotate(posts=Count("pk"))
+        .values_list("created_by", "posts")
+    )
+
+
+def delete_posts(pks):
+    posts = Post.objects.filter(pk__in=pks)
+    counters.posts_purged(_authors(posts))
+    search.remove_posts(pks)
+    Topic.objects.filter(last_post__in=pks).update(last_post=None)
+    Board.objects.filter(last_post__in=pks).update(last_post=None)
+    raw_delete(posts)
+
+
+def delete_topics(pks):
+    # Replies that arrived after the posts were purged.
+    delete_posts(
+        list(Post.objects.filter(topic__in=pks).values_list("pk", flat=True))
+    )
+    raw_delete(TopicReadMarker.objects.filter(topic__in=pks))
+    raw_delete(TopicSubscription.objects.filter(topic__in=pks))
+    raw_delete(Topic.objects.filter(pk__in=pks))
+
+
+def delete_archived_posts(pks):
+    posts = ArchivedPost.objects.filter(pk__in=pks)
+    counters.posts_purged(_authors(posts))
+    ArchivedTopic.objects.filter(last_post__in=pks).update(last_post=None)
+    raw_delete(posts)
+
+
+def delete_archived_topics(pks):
+    raw_delete(ArchivedTopic.objects.filter(pk__in=pks))
+
+
+def purge_steps(board_id, size=None):
+    """Purge a board, yielding how many rows each chunk deleted."""
+    size = size or chunk_size()
+    for rows, delete in (
+        (Post.objects.filter(topic__board=board_id), delete_posts),
+        (Topic.objects.filter(board=board_id), delete_topics),
+        (
+            ArchivedPost.objects.filter(topic__board=board_id),
+            delete_archived_posts,
+        ),
+        (ArchivedTopic.objects.filter(board=board_id), delete_archived_topics),
+    ):
+        rows = rows.order_by()
+        while True:
+            with transaction.atomic():
+                pks = list(rows.values_list("pk", flat=True)[:size])
+                if pks:
+                    delete(pks)
+            if not pks:
+                break
+            yield len(pks)
+    with transaction.atomic():
+        Board.objects.filter(pk=board_id).delete()
+
+
+def purge_board(board_id):
+    steps = purge_steps(board_id)
+    for _ in range(chunks_per_job()):
+        if next(steps, None) is None:
+            return
+    steps.close()
+    queue_purge([board_id])
+
+
+def queue_purge(board_ids):
+    queue.enqueue_many(
+        [
+            queue.job(
+                purge_board,
+                {"board_id": board_id},
+                dedupe_key="purge:board:{}".format(board_id),
+            )
+            for board_id in board_ids
+        ]
+    )
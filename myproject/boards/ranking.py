@@ -0,0 +1,185 @@
+"""Hot ranking of topics by recent replies and views."""
+
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from jobs import queue
+
+from . import caching
+from .models import Board, RankingEpoch, Topic
+
+# Events are added to hot_score scaled up by exp(time since the epoch)
+# rather than decaying old scores, so ORDER BY hot_score ranks by current
+# heat. rescale() starts a new epoch before the scale grows too large.
+
+# exp(200) leaves plenty of headroom below the float limit of about
+# exp(709), and takes months to reach with any sensible half-life.
+RESCALE_EXPONENT = 200
+
+# Seconds a process keeps using the epoch it last read. Replaced epochs
+# are kept a day, far longer than any process can still be using one.
+EPOCH_REFRESH_INTERVAL = 300
+EPOCH_RETENTION = timedelta(days=1)
+
+DEFAULT_WEIGHTS = {"post": 1.0, "view": 0.05}
+
+HOT_TOPICS_KEY = "forum:hot:{}:{}"
+
+_epoch_lock = threading.Lock()
+_epoch = None
+
+
+def half_life():
+    return getattr(settings, "HOT_SCORE_HALF_LIFE", 12 * 3600)
+
+
+def weight(kind):
+    weights = getattr(settings, "HOT_SCORE_WEIGHTS", DEFAULT_WEIGHTS)
+    return weights[kind]
+
+
+def exponent(at, started_at):
+    return (at - started_at).total_seconds() * math.log(2) / half_life()
+
+
+def latest_epoch():
+    epoch = RankingEpoch.objects.order_by("-pk").first()
+    if epoch is None:
+        epoch = RankingEpoch.objects.create()
+    return epoch
+
+
+def epoch(refresh=False):
+    """The epoch this process measures from, re-read every few minutes."""
+    global _epoch
+    with _epoch_lock:
+        if (
+            refresh
+            or _epoch is None
+            or time.monotonic() - _epoch[0] > EPOCH_REFRESH_INTERVAL
+        ):
+            _epoch = (time.monotonic(), latest_epoch())
+        return _epoch[1]
+
+
+def boost(kind, count=1, at=None, since=None):
+    """What ``count`` events of ``kind`` at ``at`` add, in ``since`` units."""
+    since = since or epoch()
+    power = exponent(at or timezone.now(), since.started_at)
+    if power > RESCALE_EXPONENT:
+        queue.enqueue(rescale, dedupe_key="ranking:rescale")
+    return weight(kind) * count * math.exp(power)
+
+
+def increment(amount, since):
+    """``hot_score`` plus ``amount``, an expression in ``since`` units."""
+    scale = RankingEpoch.objects.filter(pk=since.pk).values("scale")[:1]
+    # An epoch row deleted from under a process counts as current.
+    return F("hot_score") + amount * Coalesce(Subquery(scale), 1.0)
+
+
+def heated(kind, count=1, at=None):
+    """``hot_score`` plus ``count`` events of ``kind`` at ``at``."""
+    since = epoch()
+    return increment(Value(boost(kind, count, at, since)), since)
+
+
+def heat(score, at=None):
+    """A stored score decayed to ``at``, for display and tests."""
+    return score * math.exp(
+        -exponent(at or timezone.now(), latest_epoch().started_at)
+    )
+
+
+def rescale(force=False):
+    """Start a new epoch now, scaling every stored score down to it."""
+    with transaction.atomic():
+        current = latest_epoch()
+        now = timezone.now()
+        power = exponent(now, current.started_at)
+        if power <= RESCALE_EXPONENT / 2 and not force:
+            # Queued by a process on an epoch since replaced.
+            return
+        factor = math.exp(-power)
+        # Every score shrinks by the same factor, so no ranking changes and
+        # no cached page needs bumping.
+        Topic.objects.update(hot_score=F("hot_score") * factor)
+        RankingEpoch.objects.update(scale=F("scale") * factor)
+        # Epochs replaced more than EPOCH_RETENTION ago: every epoch before
+        # the last one that started that long ago.
+        expired = (
+            RankingEpoch.objects.filter(started_at__lt=now - EPOCH_RETENTION)
+            .order_by("-pk")
+            .values("pk")[:1]
+        )
+        RankingEpoch.objects.filter(pk__lt=Subquery(expired)).delete()
+        RankingEpoch.objects.create(started_at=now)
+    epoch(refresh=True)
+
+
+def rebuild(chunk_size=1000):
+    """Recompute every score as if all activity was at the last update."""
+    started_at = epoch(refresh=True).started_at
+    last_pk = 0
+    total = 0
+    while True:
+        topics = list(
+            Topic.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("reply_count", "views", "last_updated")[:chunk_size]
+        )
+        if not topics:
+            # Hot topic lists may come out in a new order.
+            caching.bump(
+                *(
+                    "board:{}".format(pk)
+                    for pk in Board.objects.values_list("pk", flat=True)
+                )
+            )
+            return total
+        for topic in topics:
+            scale = math.exp(exponent(topic.last_updated, started_at))
+            topic.hot_score = scale * (
+                weight("post") * (topic.reply_count + 1)
+                + weight("view") * topic.views
+            )
+        Topic.objects.bulk_update(topics, ["hot_score"])
+        total += len(topics)
+        last_pk = topics[-1].pk
+
+
+def top_n():
+    return getattr(settings, "HOT_TOPICS", 20)
+
+
+def hot_topics_key(board_id):
+    return HOT_TOPICS_KEY.format(board_id or "all", top_n())
+
+
+def hot_topic_ids(board_id=None):
+    """Ids of the hottest topics, cached for HOT_TOPICS_CACHE_TIMEOUT."""
+    key = hot_topics_key(board_id)
+    ids = cache.get(key)
+    if ids is None:
+        topics = Topic.objects.order_by("-hot_score")
+        if board_id is not None:
+            topics = topics.filter(board=board_id)
+        ids = list(topics.values_list("pk", flat=True)[: top_n()])
+        cache.set(key, ids, getattr(settings, "HOT_TOPICS_CACHE_TIMEOUT", 60))
+    return ids
+
+
+def hot_topics(topics, board_id=None):
+    """The hottest of ``topics``, hottest first."""
+    ids = hot_topic_ids(board_id)
+    by_pk = topics.in_bulk(ids)
+    return [by_pk[pk] for pk in ids if pk in by_pk]
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.utils import timezone
+
+from . import caching
+from .models import BoardReadMarker, Topic, TopicReadMarker
+
+logger = logging.getLogger(__name__)
+
+# Three parameters per marker; stay well under SQLite's bound parameter
+# limit.
+MAX_MARKERS_PER_STATEMENT = 250
+
+# Markers for topics or users deleted since they were recorded are
+# dropped by the joins. "WHERE true" keeps SQLite from reading ON CONFLICT
+# as a join constraint.
+UPSERT_SQL = """
+    WITH seen (user_id, topic_id, post_id) AS (VALUES {values})
+    INSERT INTO {table} (user_id, topic_id, last_read_post_id)
+    SELECT seen.user_id, seen.topic_id, seen.post_id
+      FROM seen
+      JOIN {topics} ON {topics}.id = seen.topic_id
+      JOIN {users} ON {users}.id = seen.user_id
+     WHERE true
+    ON CONFLICT (user_id, topic_id) DO UPDATE SET last_read_post_id =
+        CASE WHEN excluded.last_read_post_id > {table}.last_read_post_id
+             THEN excluded.last_read_post_id
+             ELSE {table}.last_read_post_id END
+"""
+
+
+def reader_scope(user_id):
+    # Cached pages that show read state depend on this scope.
+    return "reader:{}".format(user_id)
+
+
+class ReadMarkerBuffer:
+    # Collects the newest post each user has seen per topic and upserts
+    # them in batches, like the view counter. Reads go through read(),
+    # which writes the reader's markers at once: their next request may go
+    # to another process, whose buffer doesn't have them, and they must
+    # never see a topic they just read as unread. Markers that failed to
+    # write stay buffered and are retried.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self.flushes = 0
+        self.flushed_markers = 0
+        self.failed_flushes = 0
+
+    @property
+    def max_pending(self):
+        return getattr(settings, "READ_MARKERS_MAX_PENDING", 1000)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "READ_MARKERS_FLUSH_INTERVAL", 5.0)
+
+    def record(self, user_id, topic_id, post_id):
+        if post_id is None:
+            return
+        key = (user_id, topic_id)
+        with self._lock:
+            if post_id > self._pending.get(key, 0):
+                self._pending[key] = post_id
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def read(self, user_id, topic_id, post_id):
+        self.record(user_id, topic_id, post_id)
+        self.flush(user_id)
+
+    def has_pending(self, user_id):
+        with self._lock:
+            return any(user == user_id for user, _ in self._pending)
+
+    def flush(self, user_id=None):
+        """Write the pending markers, or only ``user_id``'s."""
+        with self._lock:
+            if user_id is None:
+                pending = self._pending
+                self._pending = {}
+                self._last_flush = time.monotonic()
+            else:
+                pending = {
+                    key: post_id
+                    for key, post_id in self._pending.items()
+                    if key[0] == user_id
+                }
+                for key in pending:
+                    del self._pending[key]
+        if not pending:
+            return 0
+        markers = list(pending.items())
+        try:
+            for i in range(0, len(markers), MAX_MARKERS_PER_STATEMENT):
+                self._write(markers[i : i + MAX_MARKERS_PER_STATEMENT])
+        except DatabaseError:
+            logger.exception("Could not flush %d read markers", len(markers))
+            with self._lock:
+                for key, post_id in pending.items():
+                    if post_id > self._pending.get(key, 0):
+                        self._pending[key] = post_id
+                self.failed_flushes += 1
+            return 0
+        caching.bump(*{reader_scope(user) for user, _ in pending})
+        with self._lock:
+            self.flushes += 1
+            self.flushed_markers += len(markers)
+        return len(markers)
+
+    def _write(self, markers):
+        sql = UPSERT_SQL.format(
+            table=TopicReadMarker._meta.db_table,
+            topics=Topic._meta.db_table,
+            users=User._meta.db_table,
+            values=", ".join(["(%s, %s, %s)"] * len(markers)),
+        )
+        params = [
+            value
+            for (user_id, topic_id), post_id in markers
+            for value in (user_id, topic_id, post_id)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending_markers": len(self._pending),
+                "flushes": self.flushes,
+                "flushed_markers": self.flushed_markers,
+                "failed_flushes": self.failed_flushes,
+            }
+
+
+read_markers = ReadMarkerBuffer()
+
+
+def with_unread(topics, user):
+    """
+    Annotate ``topics`` with ``unread``: the topic has a post newer than
+    both the user's marker for it and their mark-all-read time for its
+    board. Both are looked up as subqueries of the same SELECT.
+    """
+    last_read = TopicReadMarker.objects.filter(
+        user=user, topic=OuterRef("pk")
+    ).values("last_read_post_id")[:1]
+    board_read = BoardReadMarker.objects.filter(
+        user=user, board=OuterRef("board")
+    ).values("read_at")[:1]
+    return topics.annotate(
+        last_read_post_id=Subquery(last_read),
+        board_read_at=Subquery(board_read),
+    ).annotate(
+        unread=Case(
+            When(last_post__isnull=True, then=Value(False)),
+            When(last_read_post_id__gte=F("last_post"), then=Value(False)),
+            When(board_read_at__gte=F("last_updated"), then=Value(False)),
+            default=Value(True),
+            output_field=BooleanField(),
+        )
+    )
+
+
+def mark_all_read(user, board):
+    BoardReadMarker.objects.update_or_create(
+        user=user, board=board, defaults={"read_at": timezone.now()}
+    )
+    caching.bump(reader_scope(user.pk))
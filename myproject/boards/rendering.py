@@ -0,0 +1,39 @@
+"""Message rendering, stored with each post."""
+
+from django.db import transaction
+from django.utils.html import linebreaks, urlize
+
+RENDERER_VERSION = 1
+
+
+def render_message(text):
+    # urlize escapes the text itself, so linebreaks must not escape again.
+    return linebreaks(
+        urlize(text, trim_url_limit=60, nofollow=True, autoescape=True)
+    )
+
+
+def render(post):
+    post.message_html = render_message(post.message)
+    post.message_renderer = RENDERER_VERSION
+
+
+def rerender(queryset, chunk_size=1000):
+    """Re-render the posts in ``queryset`` and yield each chunk's size."""
+    last_pk = 0
+    while True:
+        posts = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("message")[:chunk_size]
+        )
+        if not posts:
+            return
+        for post in posts:
+            render(post)
+        with transaction.atomic():
+            queryset.model.objects.bulk_update(
+                posts, ["message_html", "message_renderer"]
+            )
+        yield len(posts)
+        last_pk = posts[-1].pk
@@ -0,0 +1,199 @@
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from . import compression
+from .models import Post
+from .pagination import FORWARD, decode_cursor, encode_cursor
+
+TABLE = "boards_post_fts"
+
+# Messages may be stored compressed; the index needs their text.
+TEXT_FUNCTION = "forum_text"
+
+# Subject matches weigh more than message matches.
+SCORE = "bm25({}, 5.0, 1.0)".format(TABLE)
+
+# Control characters cannot appear in user text, so they mark the snippet
+# highlights until the text has been escaped.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+INDEX_SQL = """
+    INSERT INTO {table} (rowid, subject, message, board_id, topic_id)
+    SELECT p.id,
+           CASE WHEN p.id = (
+               SELECT MIN(id) FROM boards_post WHERE topic_id = p.topic_id
+           ) THEN t.subject ELSE '' END,
+           {text}(p.message), t.board_id, p.topic_id
+      FROM boards_post p
+      JOIN boards_topic t ON t.id = p.topic_id
+""".format(table=TABLE, text=TEXT_FUNCTION)
+
+
+class SearchResult:
+    def __init__(self, post, snippet):
+        self.post = post
+        self.snippet = snippet
+
+
+class SearchPage:
+    def __init__(self, results, next_cursor):
+        self.results = results
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def is_available():
+    return connection.vendor == "sqlite"
+
+
+def register_functions(connection):
+    connection.connection.create_function(
+        TEXT_FUNCTION, 1, compression.to_text, deterministic=True
+    )
+
+
+def index_post(post):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM {} WHERE rowid = %s".format(TABLE), [post.pk]
+        )
+        cursor.execute(INDEX_SQL + " WHERE p.id = %s", [post.pk])
+
+
+def remove_post(post_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM {} WHERE rowid = %s".format(TABLE), [post_id]
+        )
+
+
+def remove_posts(post_ids):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        # One lookup per rowid; FTS5 may scan the whole index for an IN.
+        cursor.executemany(
+            "DELETE FROM {} WHERE rowid = %s".format(TABLE),
+            [[post_id] for post_id in post_ids],
+        )
+
+
+def update_subject(topic):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE {} SET subject = %s WHERE rowid = ("
+            "SELECT MIN(id) FROM boards_post WHERE topic_id = %s)".format(
+                TABLE
+            ),
+            [topic.subject, topic.pk],
+        )
+
+
+def rebuild(batch_size=5000):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM {}".format(TABLE))
+        last_pk = 0
+        while True:
+            cursor.execute(
+                "SELECT MAX(id) FROM (SELECT id FROM boards_post "
+                "WHERE id > %s ORDER BY id LIMIT %s)",
+                [last_pk, batch_size],
+            )
+            upper = cursor.fetchone()[0]
+            if upper is None:
+                break
+            cursor.execute(
+                INDEX_SQL + " WHERE p.id > %s AND p.id <= %s",
+                [last_pk, upper],
+            )
+            yield cursor.rowcount
+            last_pk = upper
+        cursor.execute(
+            "INSERT INTO {table} ({table}) VALUES ('optimize')".format(
+                table=TABLE
+            )
+        )
+
+
+def match_expression(query):
+    # Quote every term so user input can't use FTS5 query syntax.
+    return " ".join('"{}"'.format(term) for term in re.findall(r"\w+", query))
+
+
+def search(query, board_id=None, cursor=None, limit=20):
+    match = match_expression(query)
+    if not match or not is_available():
+        return SearchPage([], None)
+    sql = [
+        "SELECT rowid, {score}, snippet({table}, -1, %s, %s, '...', 16)"
+        " FROM {table} WHERE {table} MATCH %s".format(score=SCORE, table=TABLE)
+    ]
+    params = [HIGHLIGHT_START, HIGHLIGHT_END, match]
+    if board_id is not None:
+        sql.append("AND board_id = %s")
+        params.append(board_id)
+    after = _decode(cursor)
+    if after:
+        sql.append(
+            "AND ({score} > %s OR ({score} = %s AND rowid > %s))".format(
+                score=SCORE
+            )
+        )
+        params += [after[0], after[0], after[1]]
+    sql.append("ORDER BY 2, rowid LIMIT %s")
+    params.append(limit + 1)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(" ".join(sql), params)
+        rows = db_cursor.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        pk, score, snippet = rows[-1]
+        next_cursor = encode_cursor(FORWARD, [score, pk])
+    posts = Post.objects.select_related("topic__board", "created_by").in_bulk(
+        [row[0] for row in rows]
+    )
+    results = [
+        SearchResult(posts[pk], _highlight(snippet))
+        for pk, score, snippet in rows
+        if pk in posts
+    ]
+    return SearchPage(results, next_cursor)
+
+
+def _decode(cursor):
+    if not cursor:
+        return None
+    try:
+        direction, values = decode_cursor(cursor)
+        score, rowid = values
+        return float(score), int(rowid)
+    except (ValueError, TypeError):
+        return None
+
+
+def _highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
@@ -0,0 +1,74 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching, counters, search
+from .models import Board, Post, Topic
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+
+
+@receiver(post_delete, sender=Topic)
+def topic_deleted(sender, instance, **kwargs):
+    counters.topic_deleted(instance)
+
+
+@receiver(connection_created)
+def register_search_functions(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        search.register_functions(connection)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Topic)
+def reindex_subject(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        search.update_subject(instance)
+
+
+def _bump(*scopes):
+    # Bump now so this process never reads its own write from the cache,
+    # and again on commit so a concurrent request can't cache pre-commit
+    # data under the new version.
+    caching.bump(*scopes)
+    transaction.on_commit(lambda: caching.bump(*scopes))
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def board_changed(sender, instance, **kwargs):
+    _bump("index", "board:{}".format(instance.pk))
+
+
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def topic_changed(sender, instance, **kwargs):
+    _bump(
+        "index",
+        "board:{}".format(instance.board_id),
+        "topic:{}".format(instance.pk),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    _bump(
+        "index",
+        "board:{}".format(instance.topic.board_id),
+        "topic:{}".format(instance.topic_id),
+    )
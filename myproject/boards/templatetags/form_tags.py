@@ -1,14 +1,32 @@
+from functools import wraps
+
 from django import template
 
 register = template.Library()
 
 
+def per_form(func):
+    # A form is rendered once per request but its fields can be looked at
+    # several times; remember each field's result on the form itself.
+    @wraps(func)
+    def wrapper(bound_field):
+        results = bound_field.form.__dict__.setdefault("_form_tags", {})
+        key = (func.__name__, bound_field.name)
+        if key not in results:
+            results[key] = func(bound_field)
+        return results[key]
+
+    return wrapper
+
+
 @register.filter
+@per_form
 def field_type(bound_field):
     return bound_field.field.widget.__class__.__name__
 
 
 @register.filter
+@per_form
 def input_class(bound_field):
     css_class = ""
     if bound_field.form.is_bound:
@@ -0,0 +1,106 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Board, Post, Topic
+
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.user = User.objects.create_user(username="john")
+        self.topic = Topic.objects.create(
+            subject="Hello", board=self.board, starter=self.user
+        )
+        self.posts = [
+            Post.objects.create(
+                message="Post {}".format(i),
+                topic=self.topic,
+                created_by=self.user,
+            )
+            for i in range(5)
+        ]
+        self.url = reverse(
+            "board:api_topic_posts",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+
+    def get_rows(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        body = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+
+class TopicPostsApiTests(ApiTestCase):
+    def test_streams_posts_in_id_order(self):
+        rows = self.get_rows(self.url)
+        self.assertEqual(
+            [row["id"] for row in rows], [p.pk for p in self.posts]
+        )
+        self.assertEqual(rows[0]["message"], "Post 0")
+        self.assertEqual(rows[0]["author"], "john")
+
+    def test_resumes_after_cursor(self):
+        rows = self.get_rows(self.url, after=self.posts[2].pk)
+        self.assertEqual(
+            [row["id"] for row in rows], [p.pk for p in self.posts[3:]]
+        )
+
+    def test_since_returns_changed_posts(self):
+        old = timezone.now() - timedelta(days=2)
+        Post.objects.filter(pk__in=[p.pk for p in self.posts[:3]]).update(
+            created_at=old, updated_at=old
+        )
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        rows = self.get_rows(self.url, since=since)
+        self.assertEqual(
+            [row["id"] for row in rows], [p.pk for p in self.posts[3:]]
+        )
+
+    def test_streams_from_a_single_query(self):
+        # One query to find the topic, one cursor for the posts.
+        with self.assertNumQueries(2):
+            rows = self.get_rows(self.url)
+        self.assertEqual(len(rows), 5)
+
+    def test_invalid_params(self):
+        for params in ({"after": "x"}, {"since": "yesterday"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_not_found(self):
+        url = reverse(
+            "board:api_topic_posts",
+            kwargs={"pk": 99, "topic_pk": self.topic.pk},
+        )
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_read_only(self):
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class BoardsApiTests(ApiTestCase):
+    def test_boards(self):
+        rows = self.get_rows(reverse("board:api_boards"))
+        self.assertEqual(rows[0]["name"], "Django")
+        self.assertEqual(
+            set(rows[0]),
+            {"id", "name", "description", "topic_count", "post_count"},
+        )
+
+    def test_board_topics(self):
+        url = reverse("board:api_board_topics", kwargs={"pk": self.board.pk})
+        rows = self.get_rows(url)
+        self.assertEqual(rows[0]["subject"], "Hello")
+        self.assertEqual(rows[0]["started_by"], "john")
+        later = (timezone.now() + timedelta(minutes=1)).isoformat()
+        self.assertEqual(self.get_rows(url, since=later), [])
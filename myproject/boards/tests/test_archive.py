@@ -0,0 +1,146 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from account.models import UserProfile
+
+from .. import archive, counters, search
+from ..models import (
+    ArchivedPost,
+    ArchivedTopic,
+    Board,
+    Post,
+    Topic,
+    TopicSubscription,
+)
+
+
+@override_settings(
+    VIEW_COUNTER_FLUSH_INTERVAL=3600, READ_MARKERS_FLUSH_INTERVAL=3600
+)
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="123")
+        self.client.login(username="john", password="123")
+        self.board = Board.objects.create(name="Django", description="-")
+        self.old = self.start("Old news")
+        self.reply(self.old, "Stale reply")
+        self.new = self.start("Fresh")
+        Topic.objects.filter(pk=self.old.pk).update(
+            last_updated=timezone.now() - timedelta(days=400)
+        )
+
+    def start(self, subject):
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": subject, "message": "Lorem ipsum"},
+        )
+        return Topic.objects.get(subject=subject)
+
+    def reply(self, topic, message):
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": topic.pk},
+            ),
+            {"message": message},
+        )
+
+    def archive(self):
+        return sum(archive.archive_topics(archive.months_ago(12)))
+
+    def test_old_topics_move_to_the_archive(self):
+        posts = list(self.old.posts.values_list("pk", "message"))
+        self.assertEquals(self.archive(), 1)
+        self.assertFalse(Topic.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(Post.objects.filter(topic=self.old.pk).exists())
+        self.assertFalse(
+            TopicSubscription.objects.filter(topic=self.old.pk).exists()
+        )
+        topic = ArchivedTopic.objects.get()
+        self.assertEquals(
+            (topic.pk, topic.subject, topic.reply_count),
+            (self.old.pk, "Old news", 1),
+        )
+        self.assertEquals(topic.last_post_id, posts[-1][0])
+        self.assertEquals(
+            list(topic.posts.values_list("pk", "message")), posts
+        )
+        self.assertTrue(Topic.objects.filter(pk=self.new.pk).exists())
+        self.assertEquals(self.archive(), 0)
+
+    def test_archiving_updates_counters_and_search(self):
+        self.archive()
+        self.board.refresh_from_db()
+        self.assertEquals(
+            (self.board.topic_count, self.board.post_count), (1, 1)
+        )
+        self.assertEquals(self.board.last_post_id, self.new.posts.get().pk)
+        self.assertEquals(len(search.search("stale")), 0)
+        self.assertEquals(len(search.search("lorem")), 1)
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEquals(profile.post_count, 3)
+        counters.recount_profiles()
+        profile.refresh_from_db()
+        self.assertEquals(profile.post_count, 3)
+
+    def test_archived_topics_stay_readable(self):
+        self.archive()
+        response = self.client.get(
+            reverse(
+                "board:topic_posts",
+                kwargs={"pk": self.board.pk, "topic_pk": self.old.pk},
+            )
+        )
+        self.assertContains(response, "Stale reply")
+        self.assertContains(response, "archived")
+        self.assertNotContains(
+            response,
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.old.pk},
+            ),
+        )
+        self.assertNotContains(response, "EventSource")
+        response = self.client.get(
+            reverse("board:board_topics", kwargs={"pk": self.board.pk})
+        )
+        self.assertNotContains(response, "Old news")
+
+    def test_archived_topics_take_no_replies(self):
+        self.archive()
+        response = self.client.get(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.old.pk},
+            )
+        )
+        self.assertEquals(response.status_code, 404)
+
+    def test_archive_is_limited_to_a_board(self):
+        other = Board.objects.create(name="Python", description="-")
+        self.assertEquals(
+            sum(archive.archive_topics(timezone.now(), other.pk)), 0
+        )
+        self.assertEquals(ArchivedPost.objects.count(), 0)
+
+    def test_months_ago_clamps_to_the_end_of_the_month(self):
+        now = timezone.make_aware(datetime(2024, 3, 31, 12))
+        self.assertEquals(
+            archive.months_ago(1, now),
+            timezone.make_aware(datetime(2024, 2, 29, 12)),
+        )
+        self.assertEquals(
+            archive.months_ago(15, now),
+            timezone.make_aware(datetime(2022, 12, 31, 12)),
+        )
+
+    def test_archive_command(self):
+        out = StringIO()
+        call_command("archive_topics", "--months=12", stdout=out)
+        self.assertIn("Archived 1 topics.", out.getvalue())
@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from .. import benchmark
+from ..models import Board, Post, Topic
+
+
+class SeedForumTests(TestCase):
+    def test_seed_forum_creates_consistent_data(self):
+        call_command(
+            "seed_forum",
+            users=5,
+            boards=2,
+            topics=10,
+            posts=40,
+            batch_size=7,
+            stdout=StringIO(),
+        )
+        self.assertEquals(User.objects.count(), 5)
+        self.assertEquals(Board.objects.count(), 2)
+        self.assertEquals(Topic.objects.count(), 10)
+        self.assertEquals(Post.objects.count(), 40)
+        self.assertFalse(Topic.objects.filter(posts__isnull=True).exists())
+        self.assertEquals(
+            sum(Board.objects.values_list("post_count", flat=True)), 40
+        )
+        self.assertTrue(
+            self.client.login(username="user1", password="password")
+        )
+
+    def test_seed_forum_needs_users(self):
+        with self.assertRaisesMessage(CommandError, "--users"):
+            call_command("seed_forum", users=0, stdout=StringIO())
+        self.assertFalse(Topic.objects.exists())
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        call_command(
+            "seed_forum",
+            users=3,
+            boards=1,
+            topics=3,
+            posts=10,
+            stdout=StringIO(),
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, "results.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def benchmark(self, **options):
+        stdout = StringIO()
+        call_command(
+            "benchmark_forum", requests=2, warmup=1, stdout=stdout, **options
+        )
+        return stdout.getvalue()
+
+    def test_results_are_saved_as_json(self):
+        self.benchmark(output=self.output, allow_writes=True)
+        with open(self.output) as f:
+            report = json.load(f)
+        self.assertEquals(
+            set(report["results"]),
+            {
+                "index",
+                "board_topics",
+                "topic_posts",
+                "post_feed",
+                "reply_topic",
+                "signup",
+            },
+        )
+        for result in report["results"].values():
+            self.assertGreater(result["p99_ms"], 0)
+            self.assertGreaterEqual(result["p99_ms"], result["p50_ms"])
+            self.assertGreater(result["throughput_rps"], 0)
+
+    def test_writes_need_to_be_allowed(self):
+        users, posts = User.objects.count(), Post.objects.count()
+        output = self.benchmark(output=self.output)
+        self.assertIn("pass --allow-writes", output)
+        self.assertNotIn("reply_topic", benchmark.load(self.output)["results"])
+        self.assertEquals(
+            (User.objects.count(), Post.objects.count()), (users, posts)
+        )
+
+    def test_regressions_against_the_baseline_fail(self):
+        self.benchmark(output=self.output)
+        report = benchmark.load(self.output)
+        for result in report["results"].values():
+            result["queries_per_request"] = 0.5
+        benchmark.save(report, self.output)
+        with self.assertRaisesMessage(CommandError, "queries_per_request"):
+            self.benchmark(baseline=self.output, max_regression=0.1)
+
+    def test_message_storage_is_reported(self):
+        Post.objects.update(message="Lorem ipsum dolor sit amet. " * 10)
+        call_command("compress_posts", days=-1, stdout=StringIO())
+        output = self.benchmark(output=self.output)
+        self.assertIn("messages: 10 posts, 10 compressed", output)
+        storage = benchmark.load(self.output)["storage"]
+        self.assertGreater(storage["saved_ratio"], 0.5)
+        self.assertGreater(storage["compressed_read_us"], 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEquals(benchmark.percentile(values, 50), 50.5)
+        self.assertAlmostEqual(benchmark.percentile(values, 99), 99.01)
@@ -0,0 +1,157 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from account.models import UserProfile
+
+from .. import caching
+from ..models import Board, Post, Topic
+
+
+class CachingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.author = User.objects.create_user(username="john", password="123")
+        User.objects.create_user(username="jane", password="123")
+        self.topic = Topic.objects.create(
+            subject="Hello, world", board=self.board, starter=self.author
+        )
+        Post.objects.create(
+            message="Lorem ipsum", topic=self.topic, created_by=self.author
+        )
+        self.url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+
+
+class PageCacheTests(CachingTestCase):
+    def test_anonymous_pages_are_served_from_the_cache(self):
+        for url, queries in (
+            (reverse("index"), 0),
+            (reverse("board:board_topics", kwargs={"pk": self.board.pk}), 1),
+        ):
+            first = self.client.get(url)
+            with self.assertNumQueries(queries):
+                second = self.client.get(url)
+            self.assertEquals(first.content, second.content)
+        self.assertEquals(caching.stats()["page"], {"hits": 2, "misses": 2})
+
+    def test_unread_parameters_share_the_cached_page(self):
+        url = reverse("board:board_topics", kwargs={"pk": self.board.pk})
+        self.client.get(url)
+        self.client.get(url, {"utm_source": "feed"})
+        self.assertEquals(caching.stats()["page"], {"hits": 1, "misses": 1})
+        hot = self.client.get(url, {"sort": "hot", "utm_source": "feed"})
+        self.assertEquals(caching.stats()["page"], {"hits": 1, "misses": 2})
+        self.assertEquals(
+            self.client.get(url, {"sort": "hot"}).content, hot.content
+        )
+        self.assertEquals(caching.stats()["page"], {"hits": 2, "misses": 2})
+
+    def test_profile_counts_are_stale_for_at_most_the_timeout(self):
+        # Nothing bumps the topic when its author posts elsewhere.
+        self.client.get(self.url)
+        UserProfile.objects.filter(user=self.author).update(post_count=42)
+        self.assertNotContains(self.client.get(self.url), "Posts: 42")
+        later = time.time() + caching.timeout() + 1
+        with mock.patch(
+            "django.core.cache.backends.locmem.time.time", return_value=later
+        ):
+            self.assertContains(self.client.get(self.url), "Posts: 42")
+
+    def test_reply_invalidates_the_cached_pages(self):
+        self.client.get(self.url)
+        self.client.get(reverse("index"))
+        self.client.login(username="jane", password="123")
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+            {"message": "A fresh reply"},
+        )
+        self.client.logout()
+        self.assertContains(self.client.get(self.url), "A fresh reply")
+        self.assertContains(self.client.get(reverse("index")), "By jane")
+
+
+@mock.patch("boards.caching.reading_from_replica", return_value=True)
+class ReplicaReadTests(CachingTestCase):
+    @override_settings(PRIMARY_PIN_SECONDS=10)
+    def test_nothing_is_cached_while_replicas_may_lag_a_write(self, _):
+        caching.bump("topic:{}".format(self.topic.pk))
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEquals(caching.stats()["page"], {"hits": 0, "misses": 2})
+        self.client.login(username="jane", password="123")
+        self.client.get(self.url)
+        self.assertEquals(caching.stats()["fragment"]["hits"], 0)
+
+    @override_settings(PRIMARY_PIN_SECONDS=0)
+    def test_pages_are_cached_once_replicas_caught_up(self, _):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEquals(caching.stats()["page"], {"hits": 1, "misses": 1})
+
+
+class FragmentCacheTests(CachingTestCase):
+    def test_logged_in_users_get_fragment_hits(self):
+        self.client.login(username="jane", password="123")
+        self.client.get(self.url)
+        with self.assertNumQueries(3):
+            # The topic, the following state and the authorship check; the
+            # session, user and posts come from the cache.
+            response = self.client.get(self.url)
+        self.assertContains(response, "Lorem ipsum")
+        self.assertEquals(caching.stats()["fragment"]["hits"], 1)
+
+    def test_fragments_vary_on_authorship(self):
+        self.client.login(username="jane", password="123")
+        self.assertNotContains(self.client.get(self.url), "Edit</a>")
+        self.client.login(username="john", password="123")
+        self.assertContains(self.client.get(self.url), "Edit</a>")
+        self.client.login(username="jane", password="123")
+        self.assertNotContains(self.client.get(self.url), "Edit</a>")
+
+
+class FileBasedCacheTests(CachingTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            CACHES=dict(
+                settings.CACHES,
+                default={
+                    "BACKEND": "django.core.cache.backends.filebased"
+                    ".FileBasedCache",
+                    "LOCATION": self.cache_dir,
+                },
+            )
+        )
+        self.settings_override.enable()
+        super().setUp()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir)
+
+    def test_pages_are_cached_and_invalidated(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            # The topic lookup still runs to count the view.
+            self.client.get(self.url)
+        Post.objects.create(
+            message="Second post", topic=self.topic, created_by=self.author
+        )
+        self.assertContains(self.client.get(self.url), "Second post")
+        self.assertEquals(caching.stats()["page"], {"hits": 1, "misses": 2})
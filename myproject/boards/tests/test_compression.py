@@ -0,0 +1,150 @@
+import gzip
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, compression, search, transfer
+from ..models import ArchivedPost, Board, Post, Topic
+
+MESSAGE = "The quick brown fox jumps over the lazy dog. " * 20
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="123")
+        self.board = Board.objects.create(name="Django", description="-")
+        self.topic = Topic.objects.create(
+            subject="Hello", board=self.board, starter=self.user
+        )
+        self.old = Post.objects.create(
+            message=MESSAGE, topic=self.topic, created_by=self.user
+        )
+        self.short = Post.objects.create(
+            message="Short", topic=self.topic, created_by=self.user
+        )
+        self.new = Post.objects.create(
+            message=MESSAGE, topic=self.topic, created_by=self.user
+        )
+        Post.objects.exclude(pk=self.new.pk).update(
+            created_at=timezone.now() - timedelta(days=100)
+        )
+
+    def compress(self):
+        out = StringIO()
+        call_command("compress_posts", stdout=out)
+        return out.getvalue()
+
+    def stored(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT message FROM boards_post WHERE id = %s", [post.pk]
+            )
+            return bytes(cursor.fetchone()[0])
+
+    def test_round_trip(self):
+        data = compression.compress(MESSAGE)
+        self.assertTrue(data.startswith(compression.HEADER))
+        self.assertLess(len(data), len(MESSAGE) // 5)
+        self.assertEquals(compression.text_size(data), len(MESSAGE))
+        self.assertEquals(compression.decompress(data), MESSAGE)
+        self.assertEquals(compression.decompress("Plain".encode()), "Plain")
+
+    def test_old_posts_are_compressed_unless_too_short(self):
+        self.assertIn("Compressed 1 posts", self.compress())
+        self.assertTrue(compression.is_compressed(self.stored(self.old)))
+        self.assertEquals(self.stored(self.short), b"Short")
+        self.assertEquals(self.stored(self.new), MESSAGE.encode())
+        self.assertIn("Compressed 0 posts", self.compress())
+
+    def test_messages_are_decompressed_on_first_access(self):
+        self.compress()
+        post = Post.objects.get(pk=self.old.pk)
+        self.assertIsInstance(
+            post.__dict__["message"], compression.CompressedText
+        )
+        self.assertEquals(post.message, MESSAGE)
+        self.assertIsInstance(post.__dict__["message"], str)
+        self.assertEquals(
+            Post.objects.filter(pk=self.old.pk).values_list(
+                "message", flat=True
+            )[0],
+            MESSAGE,
+        )
+
+    def test_untouched_messages_are_saved_compressed(self):
+        self.compress()
+        Post.objects.bulk_update(
+            Post.objects.filter(pk=self.old.pk), ["message_html"]
+        )
+        self.assertTrue(compression.is_compressed(self.stored(self.old)))
+        post = Post.objects.get(pk=self.old.pk)
+        post.message = "Edited"
+        post.save()
+        self.assertEquals(self.stored(post), b"Edited")
+
+    def test_search_export_and_feeds_see_plain_text(self):
+        self.compress()
+        list(search.rebuild())
+        self.assertEquals(
+            {result.post.pk for result in search.search("fox")},
+            {self.old.pk, self.new.pk},
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "forum.jsonl.gz")
+        transfer.export(path)
+        with gzip.open(path, "rt") as lines:
+            messages = [
+                record["fields"]["message"]
+                for record in map(json.loads, lines)
+                if record["model"] == "post"
+            ]
+        self.assertEquals(messages, [MESSAGE, "Short", MESSAGE])
+        response = self.client.get(
+            reverse(
+                "board:api_topic_posts",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            )
+        )
+        body = b"".join(response.streaming_content).decode()
+        self.assertEquals(json.loads(body.splitlines()[0])["message"], MESSAGE)
+
+    def test_text_rows_from_before_the_migration_are_read_and_compressed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE boards_post SET message = %s WHERE id = %s",
+                [MESSAGE, self.old.pk],
+            )
+        self.assertEquals(Post.objects.get(pk=self.old.pk).message, MESSAGE)
+        self.compress()
+        self.assertTrue(compression.is_compressed(self.stored(self.old)))
+
+    def test_archived_posts_are_compressed_and_readable(self):
+        Topic.objects.update(last_updated=timezone.now() - timedelta(days=400))
+        list(archive.archive_topics(archive.months_ago(12)))
+        self.compress()
+        # The newest post is not old enough yet.
+        self.assertEquals(compression.storage(ArchivedPost)["compressed"], 1)
+        response = self.client.get(
+            reverse(
+                "board:topic_posts",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            )
+        )
+        self.assertContains(response, "lazy dog")
+
+    def test_storage_report(self):
+        self.compress()
+        report = compression.storage(Post)
+        self.assertEquals((report["posts"], report["compressed"]), (3, 1))
+        self.assertEquals(report["text_bytes"], 2 * len(MESSAGE) + 5)
+        self.assertLess(report["stored_bytes"], len(MESSAGE) + 200)
@@ -0,0 +1,121 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import parse_http_date
+
+from ..models import Board, Post, Topic
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.user = User.objects.create_user(username="john", password="123")
+        self.client.login(username="john", password="123")
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": "Hello, world", "message": "Lorem ipsum"},
+        )
+        self.client.logout()
+        self.topic = Topic.objects.get()
+        self.urls = [
+            reverse("board:board_topics", kwargs={"pk": self.board.pk}),
+            reverse(
+                "board:topic_posts",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+        ]
+
+    def reply(self):
+        self.client.login(username="john", password="123")
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+            {"message": "hello, world!"},
+        )
+        self.client.logout()
+
+    def test_matching_etag_returns_304_with_a_single_lookup(self):
+        for url in self.urls:
+            etag = self.client.get(url)["ETag"]
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEquals(response.status_code, 304)
+
+    def test_new_reply_changes_the_etag(self):
+        etags = [self.client.get(url)["ETag"] for url in self.urls]
+        self.reply()
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEquals(response.status_code, 200)
+
+    def later(self):
+        # Writes made inside the block are stamped a minute from now.
+        return mock.patch(
+            "boards.caching.time.time_ns",
+            return_value=time.time_ns() + 60 * 10**9,
+        )
+
+    def assertChanged(self, url, response):
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEquals(response.status_code, 200)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEquals(response.status_code, 304)
+
+    def test_post_edit_changes_the_topic_validators(self):
+        url = self.urls[1]
+        response = self.client.get(url)
+        post = Post.objects.get()
+        with self.later():
+            post.message = "Edited"
+            post.save()
+        self.assertChanged(url, response)
+
+    def test_subject_edit_changes_the_board_validators(self):
+        url = self.urls[0]
+        response = self.client.get(url)
+        with self.later():
+            self.topic.subject = "Renamed"
+            self.topic.save()
+        self.assertChanged(url, response)
+
+    def test_etag_changes_with_the_viewer(self):
+        for url in self.urls:
+            etag = self.client.get(url)["ETag"]
+            self.client.login(username="john", password="123")
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEquals(response.status_code, 200)
+            self.assertNotEquals(response["ETag"], etag)
+            self.client.logout()
+
+    def test_if_modified_since(self):
+        last_post = Post.objects.latest("pk")
+        for url in self.urls:
+            response = self.client.get(url)
+            # Or the moment the post bumped the cached versions, just after.
+            self.assertGreaterEqual(
+                parse_http_date(response["Last-Modified"]),
+                int(last_post.created_at.timestamp()),
+            )
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            )
+            self.assertEquals(response.status_code, 304)
+
+    def test_missing_topic_is_still_a_404(self):
+        url = reverse(
+            "board:topic_posts", kwargs={"pk": self.board.pk, "topic_pk": 99}
+        )
+        self.assertEquals(self.client.get(url).status_code, 404)
@@ -0,0 +1,94 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Board, Post, Topic
+
+
+class CountersTestCase(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.user = User.objects.create_user(
+            username="john", email="john@doe.com", password="123"
+        )
+        self.client.login(username="john", password="123")
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": "Hello, world", "message": "Lorem ipsum"},
+        )
+        self.topic = Topic.objects.get()
+
+    def reply(self, message="hello, world!"):
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+            {"message": message},
+        )
+
+
+class CountersTests(CountersTestCase):
+    def test_new_topic_updates_board_counters(self):
+        self.board.refresh_from_db()
+        self.assertEquals(self.board.topic_count, 1)
+        self.assertEquals(self.board.post_count, 1)
+        self.assertEquals(self.board.last_post, Post.objects.get())
+
+    def test_reply_updates_topic_and_board_counters(self):
+        self.reply()
+        self.board.refresh_from_db()
+        self.topic.refresh_from_db()
+        last_post = Post.objects.latest("pk")
+        self.assertEquals(self.topic.reply_count, 1)
+        self.assertEquals(self.topic.last_updated, last_post.created_at)
+        self.assertEquals(self.topic.last_post, last_post)
+        self.assertEquals(self.board.post_count, 2)
+        self.assertEquals(self.board.last_post, last_post)
+
+    def test_deleting_last_post_moves_the_last_post_pointer_back(self):
+        self.reply()
+        first_post = Post.objects.earliest("pk")
+        Post.objects.latest("pk").delete()
+        self.board.refresh_from_db()
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.reply_count, 0)
+        self.assertEquals(self.topic.last_post, first_post)
+        self.assertEquals(self.board.post_count, 1)
+        self.assertEquals(self.board.last_post, first_post)
+
+    def test_deleting_topic_updates_board_counters(self):
+        self.reply()
+        self.topic.delete()
+        self.board.refresh_from_db()
+        self.assertEquals(self.board.topic_count, 0)
+        self.assertEquals(self.board.post_count, 0)
+        self.assertIsNone(self.board.last_post)
+
+    def test_recount_fixes_drift(self):
+        self.reply()
+        Board.objects.update(topic_count=7, post_count=0, last_post=None)
+        Topic.objects.update(reply_count=42, last_post=None)
+        call_command("recount", chunk_size=1, stdout=StringIO())
+        self.board.refresh_from_db()
+        self.topic.refresh_from_db()
+        self.assertEquals(self.topic.reply_count, 1)
+        self.assertEquals(self.topic.last_post, Post.objects.latest("pk"))
+        self.assertEquals(self.board.topic_count, 1)
+        self.assertEquals(self.board.post_count, 2)
+        self.assertEquals(self.board.last_post, Post.objects.latest("pk"))
+
+
+class IndexQueriesTests(CountersTestCase):
+    def test_index_runs_a_single_query(self):
+        self.client.logout()
+        for i in range(5):
+            Board.objects.create(name="Board {}".format(i), description="-")
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("index"))
+        self.assertContains(response, "By john")
@@ -0,0 +1,174 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .. import events
+from ..models import Board, Post, Topic
+
+
+class EventsTestMixin:
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.user = User.objects.create_user(username="john", password="123")
+        self.topic = Topic.objects.create(
+            subject="Hello", board=self.board, starter=self.user
+        )
+        self.first = self.reply("First")
+        self.url = reverse(
+            "board:topic_events",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+
+    def reply(self, message):
+        return Post.objects.create(
+            message=message, topic=self.topic, created_by=self.user
+        )
+
+
+class BrokerTests(TestCase):
+    def test_delivers_to_subscribers_of_the_topic(self):
+        broker = events.Broker()
+
+        async def run():
+            subscriber = broker.subscribe(1)
+            other = broker.subscribe(2)
+            await sync_to_async(broker.publish, thread_sensitive=False)(
+                1, {"id": 5}
+            )
+            received = await asyncio.wait_for(subscriber[1].get(), 1)
+            self.assertTrue(other[1].empty())
+            broker.unsubscribe(1, subscriber)
+            broker.unsubscribe(2, other)
+            return received
+
+        self.assertEqual(async_to_sync(run)(), {"id": 5})
+        self.assertEqual(broker.subscriber_count(), 0)
+
+
+class EventStreamAppTests(EventsTestMixin, TransactionTestCase):
+    def stream(self, path, until, headers=(), query=b"", action=None):
+        """Run the app until ``until`` events were sent; return them."""
+        self.django_app = mock.AsyncMock()
+        app = events.EventStreamApp(self.django_app)
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query,
+            "headers": list(headers),
+        }
+
+        async def run():
+            messages = []
+            done = asyncio.Event()
+
+            async def receive():
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+                body = b"".join(m.get("body", b"") for m in messages)
+                if body.count(b"event: post") >= until:
+                    done.set()
+
+            task = asyncio.ensure_future(app(scope, receive, send))
+            if action is not None:
+                while not events.broker.subscriber_count(self.topic.pk):
+                    await asyncio.sleep(0.01)
+                await sync_to_async(action)()
+            await asyncio.wait_for(task, 5)
+            return messages
+
+        return async_to_sync(run)()
+
+    def posts(self, messages):
+        body = b"".join(m.get("body", b"") for m in messages).decode()
+        return [
+            json.loads(line[len("data: ") :])
+            for line in body.splitlines()
+            if line.startswith("data: ")
+        ]
+
+    def test_pushes_published_posts(self):
+        def reply():
+            events.publish_post(self.reply("Second"))
+
+        messages = self.stream(self.url, 1, action=reply)
+        self.assertEqual(messages[0]["status"], 200)
+        self.assertIn(
+            (b"content-type", b"text/event-stream"), messages[0]["headers"]
+        )
+        [post] = self.posts(messages)
+        self.assertEqual(post["author"], "john")
+        self.assertEqual(post["html"], "<p>Second</p>")
+        self.assertEqual(events.broker.subscriber_count(), 0)
+
+    def test_sends_backlog_after_the_last_seen_post(self):
+        second = self.reply("Second")
+        messages = self.stream(
+            self.url, 1, headers=[(b"last-event-id", str(self.first.pk))]
+        )
+        self.assertEqual([p["id"] for p in self.posts(messages)], [second.pk])
+        messages = self.stream(
+            self.url, 2, query="after={}".format(self.first.pk - 1).encode()
+        )
+        self.assertEqual(len(self.posts(messages)), 2)
+
+    def test_published_posts_dont_skip_earlier_ones(self):
+        def reply():
+            # Committed by another worker, which publishes elsewhere.
+            self.reply("From elsewhere")
+            events.publish_post(self.reply("From here"))
+
+        messages = self.stream(self.url, 2, action=reply)
+        self.assertEqual(
+            [post["html"] for post in self.posts(messages)],
+            ["<p>From elsewhere</p>", "<p>From here</p>"],
+        )
+
+    @override_settings(TOPIC_EVENTS_POLL_INTERVAL=0.05)
+    def test_polls_for_posts_from_other_workers(self):
+        messages = self.stream(self.url, 1, action=lambda: self.reply("Hi"))
+        self.assertEqual(self.posts(messages)[0]["html"], "<p>Hi</p>")
+
+    def test_unknown_topic(self):
+        url = reverse(
+            "board:topic_events", kwargs={"pk": self.board.pk, "topic_pk": 99}
+        )
+        self.assertEqual(self.stream(url, 0)[0]["status"], 404)
+
+    def test_other_requests_go_to_django(self):
+        self.assertEqual(self.stream("/", 0), [])
+        self.assertEqual(self.django_app.await_count, 1)
+
+
+class TopicEventsViewTests(EventsTestMixin, TestCase):
+    def test_sends_new_posts_and_asks_for_a_reconnect(self):
+        second = self.reply("Second")
+        response = self.client.get(
+            self.url, HTTP_LAST_EVENT_ID=str(self.first.pk)
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = response.content.decode()
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn("id: {}\nevent: post".format(second.pk), body)
+
+    def test_reply_publishes_after_commit(self):
+        self.client.login(username="john", password="123")
+        url = reverse(
+            "board:reply_topic",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        with mock.patch.object(events, "publish_post") as publish_post:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(url, {"message": "Live"})
+        [(post,), _] = publish_post.call_args
+        self.assertEqual(post.message, "Live")
@@ -0,0 +1,173 @@
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs import queue
+from jobs.models import Job
+
+from ..models import Board, Topic, TopicSubscription
+
+
+@override_settings(
+    NOTIFICATION_DIGEST_DELAY=0,
+    FORUM_BASE_URL="http://forum.test",
+    VIEW_COUNTER_FLUSH_INTERVAL=3600,
+    READ_MARKERS_FLUSH_INTERVAL=3600,
+)
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.john = User.objects.create_user(
+            username="john", email="john@doe.com", password="123"
+        )
+        self.jane = User.objects.create_user(
+            username="jane", email="jane@doe.com", password="123"
+        )
+        self.client.login(username="john", password="123")
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": "Hello", "message": "Lorem ipsum"},
+        )
+        self.topic = Topic.objects.get()
+        self.topic_url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+
+    def reply(self, username, message="A reply"):
+        self.client.login(username=username, password="123")
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+            {"message": message},
+        )
+
+    def test_starters_and_repliers_are_subscribed(self):
+        self.reply("jane")
+        self.assertEquals(
+            set(self.topic.subscriptions.values_list("user", flat=True)),
+            {self.john.pk, self.jane.pk},
+        )
+
+    def test_reply_only_queues_one_job(self):
+        self.reply("jane")
+        self.assertEquals(Job.objects.count(), 1)
+        self.assertEquals(mail.outbox, [])
+
+    def test_subscribers_get_one_digest_for_several_replies(self):
+        self.reply("jane", "First reply")
+        self.reply("jane", "Second reply")
+        queue.work(once=True)
+        self.assertEquals(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEquals(message.to, ["john@doe.com"])
+        self.assertEquals(message.subject, 'New replies to "Hello"')
+        self.assertIn("Hello (2 new)", message.body)
+        self.assertIn("http://forum.test" + self.topic_url, message.body)
+        self.assertFalse(Job.objects.exists())
+
+    def test_subscribers_are_not_notified_twice(self):
+        self.reply("jane")
+        queue.work(once=True)
+        queue.enqueue(
+            "boards.notifications.send_digest", {"user_id": self.john.pk}
+        )
+        queue.work(once=True)
+        self.assertEquals(len(mail.outbox), 1)
+        self.reply("jane")
+        queue.work(once=True)
+        self.assertEquals(len(mail.outbox), 2)
+
+    def test_authors_are_not_notified_of_their_own_replies(self):
+        self.reply("jane")
+        self.reply("john")
+        queue.work(once=True)
+        messages = {message.to[0]: message.body for message in mail.outbox}
+        self.assertIn("Hello (1 new)", messages["john@doe.com"])
+        self.assertIn("Hello (1 new)", messages["jane@doe.com"])
+
+    def test_digests_cover_every_followed_topic(self):
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": "Again", "message": "Lorem ipsum"},
+        )
+        second = Topic.objects.get(subject="Again")
+        self.reply("jane")
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": second.pk},
+            ),
+            {"message": "Another reply"},
+        )
+        queue.work(once=True)
+        self.assertEquals(len(mail.outbox), 1)
+        self.assertEquals(
+            mail.outbox[0].subject, "New replies in 2 topics you follow"
+        )
+
+    def test_failed_sends_are_retried(self):
+        self.reply("jane")
+        with override_settings(
+            EMAIL_BACKEND="boards.tests.test_notifications.BrokenBackend"
+        ), self.assertLogs("jobs.queue", "ERROR"):
+            queue.work(once=True)
+        self.assertEquals(Job.objects.get().attempts, 1)
+        Job.objects.update(run_at=Job.objects.get().created_at)
+        queue.work(once=True)
+        self.assertEquals(len(mail.outbox), 1)
+        self.assertFalse(Job.objects.exists())
+
+    def test_follow_and_unfollow(self):
+        self.client.login(username="jane", password="123")
+        follow_url = reverse(
+            "board:follow_topic",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        self.assertContains(self.client.get(self.topic_url), "Follow</button>")
+        self.client.post(follow_url)
+        response = self.client.get(self.topic_url)
+        self.assertContains(response, "Unfollow</button>")
+        self.assertTrue(
+            TopicSubscription.objects.filter(user=self.jane).exists()
+        )
+        self.client.post(follow_url, {"follow": "0"})
+        self.assertFalse(
+            TopicSubscription.objects.filter(user=self.jane).exists()
+        )
+
+    def test_following_changes_the_etag(self):
+        self.client.login(username="jane", password="123")
+        etag = self.client.get(self.topic_url)["ETag"]
+        self.client.post(
+            reverse(
+                "board:follow_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            )
+        )
+        response = self.client.get(self.topic_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+
+    def test_follow_requires_login(self):
+        self.client.logout()
+        response = self.client.post(
+            reverse(
+                "board:follow_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            )
+        )
+        self.assertEquals(response.status_code, 302)
+        self.assertFalse(self.topic.subscriptions.exclude(user=self.john))
+
+
+class BrokenBackend:
+    def __init__(self, **kwargs):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError("SMTP server down")
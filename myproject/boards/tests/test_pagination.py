@@ -0,0 +1,124 @@
+import base64
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import rendering
+from ..models import Board, Post, Topic
+from ..pagination import KeysetPaginator
+
+
+def encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        user = User.objects.create_user(
+            username="john", email="john@doe.com", password="123"
+        )
+        self.topic = Topic.objects.create(
+            subject="Hello, world", board=board, starter=user
+        )
+        posts = [
+            Post(
+                message="Post {}".format(i), topic=self.topic, created_by=user
+            )
+            for i in range(12)
+        ]
+        for post in posts:
+            rendering.render(post)
+        Post.objects.bulk_create(posts)
+        # Force ties on created_at so the id tie-breaker is exercised.
+        Post.objects.filter(pk__lte=6).update(
+            created_at=Post.objects.get(pk=1).created_at
+        )
+        self.expected = list(
+            Post.objects.order_by("created_at", "id").values_list(
+                "pk", flat=True
+            )
+        )
+        self.paginator = KeysetPaginator(
+            Post.objects.all(), ("created_at", "id"), per_page=5
+        )
+
+    def test_walking_forward_visits_every_row_once(self):
+        seen = []
+        page = self.paginator.page()
+        self.assertFalse(page.has_previous)
+        while True:
+            seen.extend(post.pk for post in page)
+            if not page.has_next:
+                break
+            page = self.paginator.page(page.next_cursor)
+        self.assertEquals(seen, self.expected)
+
+    def test_walking_backward_from_the_last_page(self):
+        seen = []
+        page = self.paginator.page(self.paginator.page().last_cursor)
+        self.assertFalse(page.has_next)
+        while True:
+            seen[:0] = [post.pk for post in page]
+            if not page.has_previous:
+                break
+            page = self.paginator.page(page.previous_cursor)
+        self.assertEquals(seen, self.expected)
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.paginator.page()
+        second = self.paginator.page(first.next_cursor)
+        back = self.paginator.page(second.previous_cursor)
+        self.assertEquals(list(back), list(first))
+        self.assertTrue(back.has_next)
+
+    def test_invalid_cursor_falls_back_to_the_first_page(self):
+        page = self.paginator.page("not-a-cursor")
+        self.assertEquals([post.pk for post in page], self.expected[:5])
+
+    def test_malformed_cursors_fall_back_to_the_first_page(self):
+        topic_posts = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.topic.board_id, "topic_pk": self.topic.pk},
+        )
+        board_topics = reverse(
+            "board:board_topics", kwargs={"pk": self.topic.board_id}
+        )
+        for payload in (
+            ["n", None, None],
+            ["n", {}, 1],
+            ["n", [1], 2],
+            ["n", 1],
+            ["n", True, 1],
+            ["x", 1, 2],
+            {"n": 1},
+            [],
+            7,
+        ):
+            cursor = encode(payload)
+            with self.subTest(payload=payload):
+                page = self.paginator.page(cursor)
+                self.assertEquals(
+                    [post.pk for post in page], self.expected[:5]
+                )
+                for url in (topic_posts, board_topics):
+                    response = self.client.get(url, {"cursor": cursor})
+                    self.assertEquals(response.status_code, 200)
+
+    @mock.patch("boards.views.POSTS_PER_PAGE", 5)
+    def test_topic_posts_view_shows_page_navigation(self):
+        url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.topic.board_id, "topic_pk": self.topic.pk},
+        )
+        response = self.client.get(url)
+        posts = response.context.get("posts")
+        self.assertTrue(posts.has_next)
+        self.assertContains(
+            response, 'href="?cursor={}"'.format(posts.next_cursor)
+        )
@@ -0,0 +1,135 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from account.models import UserProfile
+from jobs import queue
+from jobs.models import Job
+
+from .. import archive, purge, search
+from ..models import (
+    ArchivedPost,
+    ArchivedTopic,
+    Board,
+    Post,
+    Topic,
+    TopicReadMarker,
+    TopicSubscription,
+)
+from ..readmarkers import read_markers
+
+
+@override_settings(
+    VIEW_COUNTER_FLUSH_INTERVAL=3600, READ_MARKERS_FLUSH_INTERVAL=3600
+)
+class PurgeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="123")
+        self.client.login(username="john", password="123")
+        self.board = Board.objects.create(name="Django", description="-")
+        self.other = Board.objects.create(name="Python", description="-")
+        for board in (self.board, self.board, self.other):
+            self.start(board)
+        for topic in Topic.objects.filter(board=self.board):
+            self.reply(topic)
+        read_markers.flush()
+        Job.objects.all().delete()
+
+    def start(self, board):
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": board.pk}),
+            {"subject": "Hello", "message": "Lorem ipsum"},
+        )
+
+    def reply(self, topic):
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": topic.board_id, "topic_pk": topic.pk},
+            ),
+            {"message": "Lorem ipsum"},
+        )
+
+    def post_count(self):
+        return UserProfile.objects.get(user=self.user).post_count
+
+    def test_purge_deletes_the_board_in_bounded_chunks(self):
+        self.assertEquals(self.post_count(), 5)
+        chunks = list(purge.purge_steps(self.board.pk, size=3))
+        self.assertEquals(chunks, [3, 1, 2])
+        self.assertFalse(Board.objects.filter(pk=self.board.pk).exists())
+        self.assertFalse(Topic.objects.filter(board=self.board.pk).exists())
+        self.assertEquals(Post.objects.count(), 1)
+        self.assertFalse(
+            TopicReadMarker.objects.exclude(topic__board=self.other).exists()
+        )
+        self.assertFalse(
+            TopicSubscription.objects.exclude(topic__board=self.other).exists()
+        )
+        self.assertEquals(len(search.search("lorem")), 1)
+        self.assertEquals(self.post_count(), 1)
+        self.other.refresh_from_db()
+        self.assertEquals(self.other.post_count, 1)
+
+    def test_purge_never_loads_posts(self):
+        with self.assertNumQueries(9):
+            # Ids, authors, profiles, search index, topics' and board's
+            # last posts and the delete, in a savepoint.
+            next(purge.purge_steps(self.board.pk, size=1000))
+
+    def test_purge_includes_archived_topics(self):
+        topic = Topic.objects.filter(board=self.board).first()
+        list(archive.archive_topics(topic.last_updated, self.board.pk))
+        list(
+            archive.archive_topics(
+                Topic.objects.latest("last_updated").last_updated
+            )
+        )
+        self.assertTrue(ArchivedPost.objects.exists())
+        list(purge.purge_steps(self.board.pk))
+        self.assertFalse(
+            ArchivedTopic.objects.filter(board=self.board.pk).exists()
+        )
+        self.assertFalse(
+            ArchivedPost.objects.filter(topic__board=self.board.pk).exists()
+        )
+        self.assertEquals(self.post_count(), 1)
+
+    @override_settings(PURGE_CHUNK_SIZE=1, PURGE_CHUNKS_PER_JOB=2)
+    def test_purge_job_queues_the_rest_of_the_board(self):
+        purge.queue_purge([self.board.pk])
+        purge.queue_purge([self.board.pk])
+        self.assertEquals(Job.objects.count(), 1)
+        # Four posts, two topics and the board itself.
+        self.assertEquals(queue.work(once=True), 4)
+        self.assertFalse(Board.objects.filter(pk=self.board.pk).exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_admin_queues_purges_instead_of_deleting(self):
+        User.objects.create_superuser(username="admin", password="123")
+        self.client.login(username="admin", password="123")
+        response = self.client.get(
+            reverse("admin:boards_board_delete", args=[self.board.pk])
+        )
+        self.assertEquals(response.status_code, 403)
+        response = self.client.post(
+            reverse("admin:boards_board_changelist"),
+            {"action": "purge", "_selected_action": [self.board.pk]},
+        )
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(
+            list(Job.objects.values_list("task", "payload")),
+            [("boards.purge.purge_board", {"board_id": self.board.pk})],
+        )
+        self.assertTrue(Board.objects.filter(pk=self.board.pk).exists())
+
+    def test_purge_command(self):
+        out = StringIO()
+        call_command("purge_boards", self.board.pk, stdout=out)
+        self.assertIn(
+            "Purged board {} (6 rows).".format(self.board.pk), out.getvalue()
+        )
+        self.assertFalse(Board.objects.filter(pk=self.board.pk).exists())
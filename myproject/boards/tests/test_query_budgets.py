@@ -0,0 +1,122 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from myproject.middleware import QueryBudgetExceeded
+
+from .. import rendering
+from ..models import Board, Post, Topic
+from ..readmarkers import read_markers
+from ..viewcounter import view_counter
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="john", password="123")
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.topic = Topic.objects.create(
+            subject="Hello, world", board=self.board, starter=self.user
+        )
+
+    def seed(self, scale):
+        users = [
+            User.objects.create_user(username="user{}-{}".format(scale, i))
+            for i in range(scale)
+        ]
+        for i in range(scale):
+            board = Board.objects.create(
+                name="Board {}-{}".format(scale, i), description="-"
+            )
+            topic = Topic.objects.create(
+                subject="Topic", board=self.board, starter=users[i]
+            )
+            posts = [
+                Post(message="Post", topic=t, created_by=user)
+                for t in (topic, self.topic)
+                for user in users
+            ]
+            for post in posts:
+                rendering.render(post)
+            Post.objects.bulk_create(posts)
+            Topic.objects.create(
+                subject="Topic", board=board, starter=users[i]
+            )
+
+    def visit_every_view(self):
+        board_kwargs = {"pk": self.board.pk}
+        topic_kwargs = {"pk": self.board.pk, "topic_pk": self.topic.pk}
+        for name, kwargs in (
+            ("index", {}),
+            ("board:board_topics", board_kwargs),
+            ("board:topic_posts", topic_kwargs),
+            ("board:reply_topic", topic_kwargs),
+            ("board:add_new_topic", board_kwargs),
+            ("search", {}),
+            ("hot", {}),
+        ):
+            cache.clear()
+            view_counter.flush()
+            read_markers.flush()
+            response = self.client.get(
+                reverse(name, kwargs=kwargs), {"q": "post"}
+            )
+            self.assertIn(response.status_code, (200, 302))
+            self.assertIn("Server-Timing", response)
+
+    def test_views_stay_within_budget_as_data_grows(self):
+        for scale in (1, 5, 25):
+            self.seed(scale)
+            self.visit_every_view()
+            self.client.login(username="john", password="123")
+            self.visit_every_view()
+            self.client.logout()
+
+    def test_writes_stay_within_budget(self):
+        self.client.login(username="john", password="123")
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": "Subject", "message": "Message"},
+        )
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+            ),
+            {"message": "Reply"},
+        )
+        self.assertEquals(Post.objects.count(), 2)
+
+
+@override_settings(QUERY_BUDGET_STRICT=False)
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        Board.objects.create(name="Django", description="Django board.")
+        cache.clear()
+
+    def test_server_timing_reports_queries(self):
+        response = self.client.get(reverse("index"))
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[0-9.]+;desc="1 queries", db-slowest;dur=[0-9.]+',
+        )
+
+    @override_settings(QUERY_BUDGETS={"index": 0})
+    def test_requests_over_budget_are_logged(self):
+        with self.assertLogs("myproject.middleware", "WARNING") as logs:
+            self.client.get(reverse("index"))
+        self.assertIn("GET / ran 1 queries (budget 0)", logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={"board:api_boards": 0})
+    def test_streamed_queries_count(self):
+        response = self.client.get(reverse("board:api_boards"))
+        with self.assertLogs("myproject.middleware", "WARNING") as logs:
+            b"".join(response.streaming_content)
+        self.assertIn("ran 1 queries (budget 0)", logs.output[0])
+
+    @override_settings(QUERY_BUDGETS={"index": 0}, QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_fails_requests_over_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse("index"))
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Board, Post, Topic
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.user = User.objects.create_user(username="john")
+        self.topic = Topic.objects.create(
+            subject="Hello, world", board=self.board, starter=self.user
+        )
+        Post.objects.create(
+            message="Lorem ipsum", topic=self.topic, created_by=self.user
+        )
+
+    def query_plans(self, url, table):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEquals(response.status_code, 200)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if 'FROM "{}"'.format(table) not in query["sql"]:
+                    continue
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plans.append(" / ".join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans)
+        return plans
+
+    def assertIndexScan(self, plans, index):
+        for plan in plans:
+            self.assertIn("USING INDEX {}".format(index), plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_board_topics_uses_the_board_recency_index(self):
+        url = reverse("board:board_topics", kwargs={"pk": self.board.pk})
+        response = self.client.get(url)
+        cursor = response.context["topics"].last_cursor
+        plans = self.query_plans(url, "boards_topic")
+        plans += self.query_plans(url + "?cursor=" + cursor, "boards_topic")
+        self.assertIndexScan(plans, "topic_board_recent_idx")
+
+    def test_topic_posts_uses_the_topic_created_index(self):
+        url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+        response = self.client.get(url)
+        cursor = response.context["posts"].last_cursor
+        plans = self.query_plans(url, "boards_post")
+        plans += self.query_plans(url + "?cursor=" + cursor, "boards_post")
+        self.assertIndexScan(plans, "post_topic_created_idx")
+
+    def test_posts_by_author_use_the_author_index(self):
+        queryset = Post.objects.filter(created_by=self.user).order_by(
+            "created_at"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + str(queryset.query))
+            plan = " / ".join(row[-1] for row in cursor.fetchall())
+        self.assertIndexScan([plan], "post_author_created_idx")
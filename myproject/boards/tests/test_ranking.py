@@ -0,0 +1,178 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Value
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+
+from .. import caching, ranking
+from ..models import Board, Post, RankingEpoch, Topic
+from ..viewcounter import ViewCounter
+
+
+@override_settings(
+    HOT_SCORE_HALF_LIFE=3600,
+    HOT_SCORE_WEIGHTS={"post": 1.0, "view": 0.1},
+    VIEW_COUNTER_FLUSH_INTERVAL=3600,
+    READ_MARKERS_FLUSH_INTERVAL=3600,
+)
+class RankingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ranking.epoch(refresh=True)
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.user = User.objects.create_user(username="john", password="123")
+        self.client.login(username="john", password="123")
+        self.quiet, self.busy = [self.start(subject) for subject in "AB"]
+
+    def start(self, subject):
+        self.client.post(
+            reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+            {"subject": subject, "message": "Lorem ipsum"},
+        )
+        return Topic.objects.get(subject=subject)
+
+    def reply(self, topic):
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": topic.pk},
+            ),
+            {"message": "A reply"},
+        )
+
+    def heat(self, topic):
+        topic.refresh_from_db()
+        return ranking.heat(topic.hot_score)
+
+    def test_rebuild_bumps_the_boards(self):
+        scope = ["board:{}".format(self.board.pk)]
+        before = caching.get_versions(scope)
+        ranking.rebuild()
+        self.assertNotEquals(caching.get_versions(scope), before)
+
+    def test_new_topics_start_with_the_weight_of_one_post(self):
+        self.assertAlmostEqual(self.heat(self.quiet), 1.0, places=3)
+
+    def test_replies_heat_their_topic(self):
+        self.reply(self.busy)
+        self.reply(self.busy)
+        self.assertAlmostEqual(self.heat(self.busy), 3.0, places=3)
+        self.assertEquals(
+            ranking.hot_topic_ids(self.board.pk), [self.busy.pk, self.quiet.pk]
+        )
+
+    def test_heat_halves_every_half_life(self):
+        at = timezone.now()
+        self.assertAlmostEqual(
+            ranking.boost("post", at=at + timedelta(hours=1))
+            / ranking.boost("post", at=at),
+            2.0,
+        )
+        self.assertAlmostEqual(
+            ranking.heat(1.0, at + timedelta(hours=2)) / ranking.heat(1.0, at),
+            0.25,
+        )
+
+    def test_recent_activity_outranks_older_activity(self):
+        since = ranking.epoch()
+        earlier = timezone.now() - timedelta(hours=3)
+        Topic.objects.filter(pk=self.quiet.pk).update(
+            hot_score=ranking.increment(
+                Value(ranking.boost("post", 5, earlier, since)), since
+            )
+        )
+        self.reply(self.busy)
+        # Five posts three half-lives ago count for less than one now.
+        self.assertEquals(
+            ranking.hot_topic_ids(), [self.busy.pk, self.quiet.pk]
+        )
+
+    def test_views_heat_their_topic(self):
+        counter = ViewCounter()
+        for _ in range(20):
+            counter.record(self.quiet.pk)
+        counter.flush()
+        self.assertAlmostEqual(self.heat(self.quiet), 3.0, places=3)
+
+    def test_rescale_keeps_heat_and_order(self):
+        self.reply(self.busy)
+        RankingEpoch.objects.update(
+            started_at=timezone.now() - timedelta(days=30)
+        )
+        stale = ranking.epoch(refresh=True)
+        Topic.objects.update(hot_score=0)
+        ranking.rebuild()
+        before = [self.heat(topic) for topic in (self.quiet, self.busy)]
+        ranking.rescale()
+        self.assertEquals(RankingEpoch.objects.count(), 2)
+        after = [self.heat(topic) for topic in (self.quiet, self.busy)]
+        for old, new in zip(before, after):
+            self.assertAlmostEqual(old, new, places=3)
+        self.assertLess(
+            max(topic.hot_score for topic in Topic.objects.all()), 10
+        )
+        # A process still on the replaced epoch adds the same heat.
+        Topic.objects.filter(pk=self.quiet.pk).update(
+            hot_score=ranking.increment(
+                Value(ranking.boost("post", since=stale)), stale
+            )
+        )
+        self.assertAlmostEqual(self.heat(self.quiet), after[0] + 1, places=3)
+
+    def test_rescale_is_queued_once_scores_grow_large(self):
+        RankingEpoch.objects.update(
+            started_at=timezone.now() - timedelta(days=30)
+        )
+        ranking.epoch(refresh=True)
+        self.reply(self.busy)
+        self.reply(self.busy)
+        self.assertEquals(
+            Job.objects.filter(task="boards.ranking.rescale").count(), 1
+        )
+
+    def test_rescale_skips_recent_epochs(self):
+        ranking.rescale()
+        self.assertEquals(RankingEpoch.objects.count(), 1)
+
+    def test_top_topics_are_cached(self):
+        ranking.hot_topic_ids(self.board.pk)
+        with self.assertNumQueries(0):
+            ranking.hot_topic_ids(self.board.pk)
+
+    @override_settings(HOT_TOPICS=1)
+    def test_only_the_top_topics_are_listed(self):
+        self.reply(self.busy)
+        self.assertEquals(ranking.hot_topic_ids(), [self.busy.pk])
+
+    def test_board_lists_hot_topics(self):
+        self.reply(self.quiet)
+        response = self.client.get(
+            reverse("board:board_topics", kwargs={"pk": self.board.pk}),
+            {"sort": "hot"},
+        )
+        self.assertEquals(
+            [topic.pk for topic in response.context["topics"]],
+            [self.quiet.pk, self.busy.pk],
+        )
+        self.assertContains(response, "?sort=hot")
+
+    def test_hot_page_lists_topics_from_every_board(self):
+        other = Board.objects.create(name="Python", description="-")
+        topic = Topic.objects.create(
+            subject="Elsewhere", board=other, starter=self.user
+        )
+        Post.objects.create(message="-", topic=topic, created_by=self.user)
+        self.reply(self.busy)
+        response = self.client.get(reverse("hot"))
+        self.assertEquals(
+            [topic.pk for topic in response.context["topics"]][:2],
+            [self.busy.pk, self.quiet.pk],
+        )
+        self.assertContains(response, "Elsewhere")
@@ -0,0 +1,170 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Board, Topic, TopicReadMarker
+from ..readmarkers import ReadMarkerBuffer, read_markers, with_unread
+
+
+@override_settings(
+    READ_MARKERS_MAX_PENDING=1000, READ_MARKERS_FLUSH_INTERVAL=3600
+)
+class ReadMarkersTestCase(TestCase):
+    def setUp(self):
+        read_markers.flush()
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.john = User.objects.create_user(username="john", password="123")
+        self.jane = User.objects.create_user(username="jane", password="123")
+        self.client.login(username="john", password="123")
+        for subject in ("First", "Second"):
+            self.client.post(
+                reverse("board:add_new_topic", kwargs={"pk": self.board.pk}),
+                {"subject": subject, "message": "Lorem ipsum"},
+            )
+        self.first, self.second = Topic.objects.order_by("pk")
+        self.board_url = reverse(
+            "board:board_topics", kwargs={"pk": self.board.pk}
+        )
+
+    def topic_url(self, topic):
+        return reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.board.pk, "topic_pk": topic.pk},
+        )
+
+    def reply(self, topic):
+        self.client.post(
+            reverse(
+                "board:reply_topic",
+                kwargs={"pk": self.board.pk, "topic_pk": topic.pk},
+            ),
+            {"message": "A reply"},
+        )
+
+    def unread(self, user):
+        topics = with_unread(Topic.objects.order_by("pk"), user)
+        return [topic.unread for topic in topics]
+
+
+class ReadMarkerBufferTests(ReadMarkersTestCase):
+    def test_flush_upserts_the_newest_post_in_one_statement(self):
+        buffer = ReadMarkerBuffer()
+        buffer.record(self.jane.pk, self.first.pk, 10)
+        buffer.record(self.jane.pk, self.first.pk, 5)
+        buffer.record(self.jane.pk, self.second.pk, 7)
+        self.assertTrue(buffer.has_pending(self.jane.pk))
+        self.assertFalse(buffer.has_pending(self.john.pk))
+        with self.assertNumQueries(1):
+            self.assertEquals(buffer.flush(), 2)
+        buffer.record(self.jane.pk, self.first.pk, 3)
+        buffer.record(self.jane.pk, self.second.pk, 9)
+        buffer.flush()
+        self.assertEquals(
+            dict(
+                TopicReadMarker.objects.filter(user=self.jane).values_list(
+                    "topic", "last_read_post_id"
+                )
+            ),
+            {self.first.pk: 10, self.second.pk: 9},
+        )
+
+    def test_markers_for_deleted_topics_are_dropped(self):
+        buffer = ReadMarkerBuffer()
+        buffer.record(self.jane.pk, self.first.pk, 10)
+        self.first.delete()
+        buffer.flush()
+        self.assertFalse(
+            TopicReadMarker.objects.filter(user=self.jane).exists()
+        )
+
+    def test_flushing_one_user_leaves_the_others_pending(self):
+        buffer = ReadMarkerBuffer()
+        buffer.record(self.jane.pk, self.first.pk, 10)
+        buffer.record(self.john.pk, self.first.pk, 10)
+        self.assertEquals(buffer.flush(self.jane.pk), 1)
+        self.assertFalse(buffer.has_pending(self.jane.pk))
+        self.assertTrue(buffer.has_pending(self.john.pk))
+
+
+class UnreadTests(ReadMarkersTestCase):
+    def test_topics_are_unread_until_opened(self):
+        read_markers.flush()
+        self.assertEquals(self.unread(self.john), [False, False])
+        self.assertEquals(self.unread(self.jane), [True, True])
+        self.client.login(username="jane", password="123")
+        self.client.get(self.topic_url(self.first))
+        read_markers.flush()
+        self.assertEquals(self.unread(self.jane), [False, True])
+
+    def test_new_replies_make_a_topic_unread_again(self):
+        self.client.login(username="jane", password="123")
+        self.client.get(self.topic_url(self.first))
+        self.client.login(username="john", password="123")
+        self.reply(self.first)
+        read_markers.flush()
+        self.assertEquals(self.unread(self.jane), [True, True])
+        self.assertEquals(self.unread(self.john), [False, False])
+
+    @mock.patch("boards.views.POSTS_PER_PAGE", 2)
+    def test_only_the_pages_read_count(self):
+        for _ in range(3):
+            self.reply(self.first)
+        posts = list(self.first.posts.order_by("pk").values_list("pk"))
+        self.client.login(username="jane", password="123")
+        page = self.client.get(self.topic_url(self.first)).context["posts"]
+        read_markers.flush()
+        self.assertEquals(self.unread(self.jane), [True, True])
+        marker = TopicReadMarker.objects.get(user=self.jane)
+        self.assertEquals(marker.last_read_post_id, posts[1][0])
+        self.client.get(
+            self.topic_url(self.first), {"cursor": page.last_cursor}
+        )
+        read_markers.flush()
+        self.assertEquals(self.unread(self.jane), [False, True])
+        # Going back to the first page, served from the fragment cache,
+        # leaves the marker where it is.
+        self.client.get(self.topic_url(self.first))
+        read_markers.flush()
+        marker.refresh_from_db()
+        self.assertEquals(marker.last_read_post_id, posts[-1][0])
+
+    def test_mark_all_read(self):
+        self.client.login(username="jane", password="123")
+        response = self.client.post(
+            reverse("board:mark_board_read", kwargs={"pk": self.board.pk})
+        )
+        self.assertRedirects(response, self.board_url)
+        self.assertEquals(self.unread(self.jane), [False, False])
+        self.client.login(username="john", password="123")
+        self.reply(self.second)
+        self.assertEquals(self.unread(self.jane), [False, True])
+
+    def test_topic_list_shows_unread_topics_after_own_reads(self):
+        self.client.login(username="jane", password="123")
+        response = self.client.get(self.board_url)
+        self.assertContains(response, "<strong>First</strong>")
+        self.assertContains(response, "<strong>Second</strong>")
+        etag = response["ETag"]
+        self.client.get(self.topic_url(self.first))
+        # The marker is written as the topic is read.
+        response = self.client.get(self.board_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(response.status_code, 200)
+        self.assertNotContains(response, "<strong>First</strong>")
+        self.assertContains(response, "<strong>Second</strong>")
+
+    def test_reads_show_in_topic_lists_served_by_other_processes(self):
+        self.client.login(username="jane", password="123")
+        self.client.get(self.topic_url(self.first))
+        with mock.patch("boards.conditional.read_markers", ReadMarkerBuffer()):
+            response = self.client.get(self.board_url)
+        self.assertNotContains(response, "<strong>First</strong>")
+        self.assertContains(response, "<strong>Second</strong>")
+
+    def test_unread_flags_come_from_the_topic_query(self):
+        with self.assertNumQueries(1):
+            topics = list(with_unread(self.board.topics.all(), self.jane))
+        self.assertEquals([t.unread for t in topics], [True, True])
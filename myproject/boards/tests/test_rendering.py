@@ -0,0 +1,72 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import rendering
+from ..models import Board, Post, Topic
+
+
+class RenderMessageTests(TestCase):
+    def test_escapes_and_links(self):
+        html = rendering.render_message(
+            "<script>x</script>\nsee https://example.com"
+        )
+        self.assertEqual(
+            html,
+            "<p>&lt;script&gt;x&lt;/script&gt;<br>see "
+            '<a href="https://example.com" rel="nofollow">'
+            "https://example.com</a></p>",
+        )
+
+
+class PostRenderingTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(name="Django", description="Django.")
+        user = User.objects.create_user(username="john")
+        topic = Topic.objects.create(subject="Hi", board=board, starter=user)
+        self.post = Post.objects.create(
+            message="Hello\n\nworld", topic=topic, created_by=user
+        )
+
+    def test_rendered_on_save(self):
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.message_html, "<p>Hello</p>\n\n<p>world</p>"
+        )
+        self.assertEqual(
+            self.post.message_renderer, rendering.RENDERER_VERSION
+        )
+        self.assertEqual(self.post.rendered_message, self.post.message_html)
+
+    def test_rendered_when_message_is_updated(self):
+        self.post.message = "Edited"
+        self.post.save(update_fields=["message"])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.message_html, "<p>Edited</p>")
+
+    def assertRendered(self):
+        self.assertEqual(
+            Post.objects.values_list("message_html", "message_renderer").get(),
+            ("<p>Hello</p>\n\n<p>world</p>", rendering.RENDERER_VERSION),
+        )
+
+    def test_reading_never_renders(self):
+        Post.objects.update(message_html="<p>old</p>", message_renderer=0)
+        post = Post.objects.get()
+        with self.assertNumQueries(0):
+            self.assertEqual(post.rendered_message, "<p>old</p>")
+
+    def test_stale_rows_render_in_batch(self):
+        Post.objects.update(message_html="old", message_renderer=0)
+        call_command("rerender_posts", stdout=StringIO())
+        self.assertRendered()
+
+    def test_migration_renders_stale_rows(self):
+        Post.objects.update(message_html="old", message_renderer=0)
+        migration = import_module("boards.migrations.0012_render_messages")
+        migration.render_messages(apps, None)
+        self.assertRendered()
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from myproject.warmup import warm_templates
+
+from ..forms import PostForm
+from ..templatetags.form_tags import field_type, input_class
+
+CACHED_TEMPLATES = [
+    dict(
+        settings.TEMPLATES[0],
+        OPTIONS=dict(
+            settings.TEMPLATES[0]["OPTIONS"],
+            loaders=[
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
+            ],
+        ),
+    )
+]
+
+
+class WarmTemplatesTests(SimpleTestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_compiles_project_templates_into_the_cache(self):
+        self.assertGreater(warm_templates(), 0)
+        loader = engines["django"].engine.template_loaders[0]
+        cached = set(loader.get_template_cache)
+        for name in ("base.html", "topic_posts.html", "includes/form.html"):
+            self.assertIn(name, cached)
+        self.assertIn("registration/login.html", cached)
+
+    def test_does_nothing_without_a_cached_loader(self):
+        self.assertEqual(warm_templates(), 0)
+
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_command(self):
+        out = StringIO()
+        call_command("warm_templates", stdout=out)
+        self.assertIn("Compiled", out.getvalue())
+
+
+class FormTagsTests(SimpleTestCase):
+    def test_results_are_memoized_per_form(self):
+        form = PostForm(data={"message": ""})
+        field = form["message"]
+        self.assertEqual(input_class(field), "form-control is-invalid")
+        self.assertEqual(field_type(field), "Textarea")
+        self.assertEqual(
+            form._form_tags,
+            {
+                ("input_class", "message"): "form-control is-invalid",
+                ("field_type", "message"): "Textarea",
+            },
+        )
+        self.assertEqual(input_class(PostForm()["message"]), "form-control ")
@@ -0,0 +1,116 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import archive
+from ..models import ArchivedPost, ArchivedTopic, Board, Post, Topic
+
+
+class TransferTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "forum.jsonl.gz")
+        self.created = timezone.now() - timedelta(days=30)
+        self.user = User.objects.create_user(username="john", password="x")
+        self.board = board = Board.objects.create(
+            name="Django", description="Django."
+        )
+        topic = Topic.objects.create(
+            subject="Hello", board=board, starter=self.user
+        )
+        for message in ("First", "Second"):
+            Post.objects.create(
+                message=message, topic=topic, created_by=self.user
+            )
+        Topic.objects.update(created_at=self.created)
+        Post.objects.update(created_at=self.created)
+
+    def export(self):
+        call_command("export_forum", self.path, stdout=StringIO())
+
+    def load(self):
+        call_command("import_forum", self.path, stdout=StringIO())
+
+    def test_round_trip(self):
+        self.export()
+        User.objects.all().delete()
+        Board.objects.all().delete()
+        self.load()
+        user = User.objects.get(username="john")
+        self.assertTrue(user.check_password("x"))
+        self.assertEqual(user.profile.post_count, 2)
+        board = Board.objects.get(name="Django")
+        self.assertEqual((board.topic_count, board.post_count), (1, 2))
+        topic = board.topics.get()
+        self.assertEqual(topic.starter, user)
+        self.assertEqual(topic.created_at, self.created)
+        self.assertEqual(topic.reply_count, 1)
+        self.assertEqual(
+            list(topic.posts.values_list("message", "created_at")),
+            [("First", self.created), ("Second", self.created)],
+        )
+
+    def test_import_merges_users_and_boards_and_renumbers_the_rest(self):
+        self.export()
+        self.load()
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Board.objects.count(), 1)
+        board = Board.objects.get()
+        self.assertEqual((board.topic_count, board.post_count), (2, 4))
+        self.assertEqual(
+            Post.objects.filter(topic__starter=self.user).count(), 4
+        )
+        self.assertEqual(self.user.profile.__class__.objects.count(), 1)
+
+    def archive(self):
+        Topic.objects.update(last_updated=self.created)
+        list(archive.archive_topics(timezone.now()))
+
+    def test_archived_topics_round_trip(self):
+        self.archive()
+        self.export()
+        User.objects.all().delete()
+        Board.objects.all().delete()
+        self.load()
+        topic = ArchivedTopic.objects.get()
+        self.assertEqual(
+            (topic.subject, topic.board.name), ("Hello", "Django")
+        )
+        self.assertEqual(
+            list(topic.posts.values_list("message", flat=True)),
+            ["First", "Second"],
+        )
+        self.assertEqual(topic.last_post, topic.posts.last())
+        self.assertEqual(
+            User.objects.get(username="john").profile.post_count, 2
+        )
+
+    def test_imported_ids_stay_clear_of_archived_ones(self):
+        self.export()
+        self.archive()
+        self.load()
+        self.assertEqual(ArchivedTopic.objects.count(), 1)
+        self.assertEqual(ArchivedPost.objects.count(), 2)
+        self.assertFalse(
+            Topic.objects.filter(pk__in=ArchivedTopic.objects.values("pk"))
+        )
+        self.assertFalse(
+            Post.objects.filter(pk__in=ArchivedPost.objects.values("pk"))
+        )
+        self.board.refresh_from_db()
+        self.assertEqual(
+            (self.board.topic_count, self.board.post_count), (1, 2)
+        )
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not gzip")
+        with self.assertRaises(CommandError):
+            self.load()
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import caching, ranking
+from ..models import Board, Topic
+from ..viewcounter import ViewCounter, view_counter
+
+
+@override_settings(
+    VIEW_COUNTER_MAX_PENDING=1000, VIEW_COUNTER_FLUSH_INTERVAL=3600
+)
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        user = User.objects.create_user(username="john")
+        self.topics = [
+            Topic.objects.create(subject=str(i), board=board, starter=user)
+            for i in range(3)
+        ]
+        self.counter = ViewCounter()
+
+    def views(self):
+        return [topic.views for topic in Topic.objects.order_by("pk")]
+
+    def test_views_are_buffered_until_flushed(self):
+        self.counter.record(self.topics[0].pk)
+        self.assertEquals(self.views(), [0, 0, 0])
+        self.assertEquals(self.counter.stats()["pending_views"], 1)
+
+    def test_flush_writes_all_topics_in_one_statement(self):
+        for topic, count in zip(self.topics, (3, 1, 2)):
+            for _ in range(count):
+                self.counter.record(topic.pk)
+        # The ranking epoch is read once per process, not per flush; the
+        # second query finds the boards to bump.
+        ranking.epoch()
+        with self.assertNumQueries(2):
+            self.assertEquals(self.counter.flush(), 6)
+        self.assertEquals(self.views(), [3, 1, 2])
+        stats = self.counter.stats()
+        self.assertEquals(stats["pending_views"], 0)
+        self.assertEquals(stats["flushes"], 1)
+        self.assertEquals(stats["flushed_views"], 6)
+
+    @override_settings(VIEW_COUNTER_MAX_PENDING=2)
+    def test_size_threshold_triggers_a_flush(self):
+        self.counter.record(self.topics[0].pk)
+        self.counter.record(self.topics[0].pk)
+        self.assertEquals(self.views(), [2, 0, 0])
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0)
+    def test_flush_interval_triggers_a_flush(self):
+        self.counter.record(self.topics[1].pk)
+        self.assertEquals(self.views(), [0, 1, 0])
+
+    def test_flush_refreshes_cached_topic_lists(self):
+        url = reverse(
+            "board:board_topics", kwargs={"pk": self.topics[0].board_id}
+        )
+        cache.clear()
+        self.client.get(url)
+        self.counter.record(self.topics[0].pk)
+        self.counter.flush()
+        self.client.get(url)
+        self.assertEquals(caching.stats()["page"], {"hits": 0, "misses": 2})
+
+    def test_failed_flush_keeps_the_views(self):
+        self.counter.record(self.topics[0].pk)
+        with mock.patch.object(
+            ViewCounter, "_write", side_effect=DatabaseError
+        ), self.assertLogs("boards.viewcounter", "ERROR"):
+            self.assertEquals(self.counter.flush(), 0)
+        self.assertEquals(self.counter.stats()["failed_flushes"], 1)
+        self.counter.flush()
+        self.assertEquals(self.views(), [1, 0, 0])
+
+    def test_failed_chunk_keeps_only_the_unwritten_views(self):
+        write = ViewCounter._write
+        calls = []
+
+        def fail_second_chunk(counter, increments):
+            calls.append(increments)
+            if len(calls) == 2:
+                raise DatabaseError
+            write(counter, increments)
+
+        for topic, count in zip(self.topics, (3, 1, 2)):
+            for _ in range(count):
+                self.counter.record(topic.pk)
+        with mock.patch(
+            "boards.viewcounter.MAX_TOPICS_PER_STATEMENT", 1
+        ), mock.patch.object(
+            ViewCounter, "_write", fail_second_chunk
+        ), self.assertLogs(
+            "boards.viewcounter", "ERROR"
+        ):
+            self.assertEquals(self.counter.flush(), 3)
+        self.assertEquals(self.views(), [3, 0, 0])
+        self.assertEquals(self.counter.stats()["pending_views"], 3)
+        self.assertEquals(self.counter.flush(), 3)
+        self.assertEquals(self.views(), [3, 1, 2])
+
+    def test_topic_posts_view_counts_views(self):
+        view_counter.flush()
+        topic = self.topics[2]
+        url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": topic.board_id, "topic_pk": topic.pk},
+        )
+        self.client.get(url)
+        self.client.get(url)
+        view_counter.flush()
+        topic.refresh_from_db()
+        self.assertEquals(topic.views, 2)
@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import resolve, reverse
+
+from ..models import Board, Post, Topic
+from ..search import search as search_posts
+from ..views import search
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.django = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.python = Board.objects.create(
+            name="Python", description="Python board."
+        )
+        self.user = User.objects.create_user(username="john")
+        self.topic = self.create_topic(
+            self.django, "Migrations", "Squashing migrations is fun"
+        )
+        self.reply = Post.objects.create(
+            message="Running <b>migrations</b> on SQLite",
+            topic=self.topic,
+            created_by=self.user,
+        )
+        self.create_topic(self.python, "Generators", "Lazy migrations too")
+
+    def create_topic(self, board, subject, message):
+        topic = Topic.objects.create(
+            subject=subject, board=board, starter=self.user
+        )
+        Post.objects.create(message=message, topic=topic, created_by=self.user)
+        return topic
+
+
+class SearchIndexTests(SearchTestCase):
+    def test_posts_are_indexed_when_created(self):
+        results = search_posts("squashing")
+        self.assertEquals([r.post.topic for r in results], [self.topic])
+
+    def test_subject_matches_rank_first(self):
+        results = search_posts("migrations", board_id=self.django.pk)
+        self.assertEquals(len(results), 2)
+        self.assertEquals(results.results[0].post.topic, self.topic)
+
+    def test_board_filter(self):
+        results = search_posts("lazy", board_id=self.django.pk)
+        self.assertEquals(len(results), 0)
+
+    def test_edits_and_deletes_update_the_index(self):
+        self.reply.message = "Nothing to see here"
+        self.reply.save()
+        self.assertEquals(len(search_posts("sqlite")), 0)
+        self.assertEquals(len(search_posts("nothing")), 1)
+        self.reply.delete()
+        self.assertEquals(len(search_posts("nothing")), 0)
+
+    def test_subject_change_is_reindexed(self):
+        self.topic.subject = "Schema changes"
+        self.topic.save()
+        self.assertEquals(len(search_posts("schema")), 1)
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEquals(len(search_posts('migrations" OR "x')), 0)
+        self.assertEquals(len(search_posts("NEAR(")), 0)
+
+    def test_cursor_paging(self):
+        first = search_posts("migrations", limit=2)
+        self.assertTrue(first.has_next)
+        second = search_posts("migrations", cursor=first.next_cursor, limit=2)
+        self.assertFalse(second.has_next)
+        pks = [r.post.pk for r in first] + [r.post.pk for r in second]
+        self.assertEquals(
+            sorted(pks), list(Post.objects.values_list("pk", flat=True))
+        )
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        result = search_posts("sqlite").results[0]
+        self.assertIn("&lt;b&gt;migrations&lt;/b&gt;", result.snippet)
+        self.assertIn("<mark>SQLite</mark>", result.snippet)
+
+    def test_rebuild_search_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM boards_post_fts")
+        self.assertEquals(len(search_posts("migrations")), 0)
+        call_command("rebuild_search_index", batch_size=1, stdout=StringIO())
+        self.assertEquals(len(search_posts("migrations")), 3)
+
+
+class SearchViewTests(SearchTestCase):
+    def test_search_url_resolves_search_view(self):
+        view = resolve("/search/")
+        self.assertEquals(view.func, search)
+
+    def test_search_view_lists_matching_posts(self):
+        url = reverse("search")
+        response = self.client.get(url, {"q": "squashing"})
+        topic_url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.django.pk, "topic_pk": self.topic.pk},
+        )
+        self.assertContains(response, 'href="{0}"'.format(topic_url))
+        self.assertContains(response, "<mark>Squashing</mark>")
+
+    def test_search_view_without_query(self):
+        response = self.client.get(reverse("search"))
+        self.assertEquals(response.status_code, 200)
+        self.assertNotContains(response, "No posts match")
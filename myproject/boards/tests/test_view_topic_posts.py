@@ -3,6 +3,7 @@ from django.test import TestCase
 from django.urls import resolve, reverse
 
 from ..models import Board, Post, Topic
+from ..viewcounter import view_counter
 from ..views import topic_posts
 
 
@@ -31,3 +32,56 @@ class TopicPostsTests(TestCase):
     def test_url_resolves_topic_posts_function(self):
         view = resolve("/boards/1/topics/1/")
         self.assertEquals(view.func, topic_posts)
+
+
+class TopicPostsQueriesTests(TestCase):
+    def setUp(self):
+        self.board = Board.objects.create(
+            name="Django", description="Django board."
+        )
+        self.users = [
+            User.objects.create_user(username="user{}".format(i))
+            for i in range(5)
+        ]
+        self.topic = Topic.objects.create(
+            subject="Hello, world", board=self.board, starter=self.users[0]
+        )
+        self.url = reverse(
+            "board:topic_posts",
+            kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+        )
+
+    def add_posts(self, count):
+        for i in range(count):
+            self.client.force_login(self.users[i % len(self.users)])
+            self.client.post(
+                reverse(
+                    "board:reply_topic",
+                    kwargs={"pk": self.board.pk, "topic_pk": self.topic.pk},
+                ),
+                {"message": "Reply {}".format(i)},
+            )
+        self.client.logout()
+
+    def test_query_count_does_not_grow_with_posts(self):
+        self.add_posts(2)
+        view_counter.flush()
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        self.add_posts(15)
+        view_counter.flush()
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_author_post_totals_come_from_the_profile(self):
+        self.add_posts(10)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Posts: 2", count=10)
+        self.users[0].profile.refresh_from_db()
+        self.assertEquals(self.users[0].profile.post_count, 2)
+
+    def test_deleting_a_post_decrements_the_author_total(self):
+        self.add_posts(1)
+        Post.objects.get().delete()
+        self.users[0].profile.refresh_from_db()
+        self.assertEquals(self.users[0].profile.post_count, 0)
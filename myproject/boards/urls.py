@@ -1,11 +1,12 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = "board"
 
 urlpatterns = [
     path("<int:pk>/", views.board_topics, name="board_topics"),
     path("<int:pk>/new_topic", views.add_new_topic, name="add_new_topic"),
+    path("<int:pk>/mark_read/", views.mark_board_read, name="mark_board_read"),
     path(
         "<int:pk>/topics/<int:topic_pk>/",
         views.topic_posts,
@@ -16,4 +17,21 @@ urlpatterns = [
         views.reply_topic,
         name="reply_topic",
     ),
+    path(
+        "<int:pk>/topics/<int:topic_pk>/follow/",
+        views.follow_topic,
+        name="follow_topic",
+    ),
+    path(
+        "<int:pk>/topics/<int:topic_pk>/events/",
+        views.topic_events,
+        name="topic_events",
+    ),
+    path("api/", api.boards, name="api_boards"),
+    path("api/<int:pk>/topics/", api.board_topics, name="api_board_topics"),
+    path(
+        "api/<int:pk>/topics/<int:topic_pk>/posts/",
+        api.topic_posts,
+        name="api_topic_posts",
+    ),
 ]
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    PositiveIntegerField,
+    Value,
+    When,
+)
+
+from . import caching, ranking
+from .models import Topic
+
+logger = logging.getLogger(__name__)
+
+# Each topic takes five parameters in the UPDATE; stay well under
+# SQLite's bound parameter limit.
+MAX_TOPICS_PER_STATEMENT = 150
+
+
+class ViewCounter:
+    # Buffers topic views in process memory and writes them in one
+    # UPDATE ... CASE statement once MAX_PENDING views are buffered or
+    # FLUSH_INTERVAL seconds have passed. A crash loses at most
+    # MAX_PENDING views. Topic lists show view counts, so a flush bumps the
+    # boards of the topics it wrote.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._pending_views = 0
+        self._last_flush = time.monotonic()
+        self.flushes = 0
+        self.flushed_views = 0
+        self.failed_flushes = 0
+        self.last_flush_duration = 0.0
+
+    @property
+    def max_pending(self):
+        return getattr(settings, "VIEW_COUNTER_MAX_PENDING", 1000)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "VIEW_COUNTER_FLUSH_INTERVAL", 5.0)
+
+    def record(self, topic_id):
+        with self._lock:
+            self._pending[topic_id] += 1
+            self._pending_views += 1
+            due = (
+                self._pending_views >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = Counter()
+            self._pending_views = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        started = time.monotonic()
+        topic_ids = list(pending)
+        written = []
+        try:
+            for i in range(0, len(topic_ids), MAX_TOPICS_PER_STATEMENT):
+                chunk = topic_ids[i : i + MAX_TOPICS_PER_STATEMENT]
+                self._write({pk: pending[pk] for pk in chunk})
+                # Each chunk commits on its own, so only the ones not
+                # written yet go back into the buffer on a failure.
+                written.extend(chunk)
+        except DatabaseError:
+            unwritten = Counter(
+                {pk: pending[pk] for pk in topic_ids[len(written) :]}
+            )
+            logger.exception(
+                "Could not flush %d topic views", sum(unwritten.values())
+            )
+            with self._lock:
+                self._pending.update(unwritten)
+                self._pending_views += sum(unwritten.values())
+                self.failed_flushes += 1
+            if not written:
+                return 0
+        boards = (
+            Topic.objects.filter(pk__in=written)
+            .values_list("board", flat=True)
+            .distinct()
+        )
+        caching.bump(*("board:{}".format(pk) for pk in boards))
+        views = sum(pending[pk] for pk in written)
+        with self._lock:
+            self.flushes += 1
+            self.flushed_views += views
+            self.last_flush_duration = time.monotonic() - started
+        return views
+
+    def _write(self, increments):
+        # The views also heat their topics, as of the flush.
+        since = ranking.epoch()
+        boost = ranking.boost("view", since=since)
+        Topic.objects.filter(pk__in=increments).update(
+            views=F("views")
+            + Case(
+                *(
+                    When(pk=pk, then=Value(count))
+                    for pk, count in increments.items()
+                ),
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            ),
+            hot_score=ranking.increment(
+                Case(
+                    *(
+                        When(pk=pk, then=Value(count * boost))
+                        for pk, count in increments.items()
+                    ),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                since,
+            ),
+        )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending_views": self._pending_views,
+                "pending_topics": len(self._pending),
+                "flushes": self.flushes,
+                "flushed_views": self.flushed_views,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_duration": self.last_flush_duration,
+            }
+
+
+view_counter = ViewCounter()
@@ -1,19 +1,116 @@
+from django.http import HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.utils.http import urlencode
+from django.views.decorators.http import condition, require_POST
 
+from . import (
+    caching,
+    conditional,
+    counters,
+    events,
+    notifications,
+    ranking,
+)
 from .forms import NewTopicForm, PostForm
-from .models import Board, Post, Topic
+from .models import ArchivedTopic, Board, Post, Topic, TopicSubscription
+from .pagination import KeysetPaginator
+from .readmarkers import (
+    mark_all_read,
+    read_markers,
+    reader_scope,
+    with_unread,
+)
+from .search import search as search_posts
+from .viewcounter import view_counter
+
+TOPICS_PER_PAGE = 20
+POSTS_PER_PAGE = 20
+SEARCH_RESULTS_PER_PAGE = 20
+RECENT_POSTS = 10
 
 
 def index(request):
-    boards = Board.objects.all()
-    return render(request, "index.html", {"boards": boards})
+    def board_list():
+        boards = Board.objects.select_related("last_post__created_by")
+        return {"boards": boards}
+
+    return caching.render_cached(
+        request,
+        "index.html",
+        {},
+        ["index"],
+        "board_list",
+        "includes/board_list.html",
+        board_list,
+    )
 
 
+@condition(
+    etag_func=conditional.board_topics_etag,
+    last_modified_func=conditional.board_topics_last_modified,
+)
 def board_topics(request, pk):
+    board = conditional.get_board_or_404(request, pk)
+    user = request.user
+    hot = request.GET.get("sort") == "hot"
+    scopes = ["board:{}".format(board.pk)]
+    vary = ["hot"] if hot else []
+    if user.is_authenticated:
+        # Unread flags make the topic list personal.
+        scopes.append(reader_scope(user.pk))
+        vary.append(user.pk)
+
+    def topic_list():
+        topics = board.topics.select_related("starter")
+        if user.is_authenticated:
+            topics = with_unread(topics, user)
+        if hot:
+            topics = ranking.hot_topics(topics, board.pk)
+        else:
+            topics = KeysetPaginator(
+                topics, ("-last_updated", "-id"), per_page=TOPICS_PER_PAGE
+            ).page(request.GET.get("cursor"))
+        return {"board": board, "topics": topics}
+
+    return caching.render_cached(
+        request,
+        "topics.html",
+        {"board": board, "hot": hot},
+        scopes,
+        "topic_list",
+        "includes/topic_list.html",
+        topic_list,
+        vary=vary,
+    )
+
+
+def hot_topics(request):
+    topics = Topic.objects.select_related("board", "starter")
+    return render(request, "hot.html", {"topics": ranking.hot_topics(topics)})
+
+
+@login_required
+@require_POST
+def mark_board_read(request, pk):
     board = get_object_or_404(Board, pk=pk)
-    return render(request, "topics.html", {"board": board})
+    mark_all_read(request.user, board)
+    return redirect("board:board_topics", pk=board.pk)
+
+
+@login_required
+@require_POST
+def follow_topic(request, pk, topic_pk):
+    topic = get_object_or_404(Topic, board__pk=pk, pk=topic_pk)
+    if request.POST.get("follow") == "0":
+        TopicSubscription.objects.filter(
+            user=request.user, topic=topic
+        ).delete()
+    else:
+        notifications.subscribe(request.user, topic.pk, topic.last_post_id)
+    return redirect("board:topic_posts", pk=pk, topic_pk=topic_pk)
 
 
 @login_required
@@ -23,37 +120,176 @@ def add_new_topic(request, pk):
     if request.method == "POST":
         form = NewTopicForm(request.POST)
         if form.is_valid():
-            topic = form.save(commit=False)
-            topic.board = board
-            topic.starter = user
-            topic.save()
-            Post.objects.create(
-                message=form.cleaned_data.get("message"),
-                topic=topic,
-                created_by=user,
-            )
+            with transaction.atomic():
+                topic = form.save(commit=False)
+                topic.board = board
+                topic.starter = user
+                topic.save()
+                post = Post.objects.create(
+                    message=form.cleaned_data.get("message"),
+                    topic=topic,
+                    created_by=user,
+                )
+                counters.topic_created(topic, post)
+                notifications.subscribe(user, topic.pk, post.pk)
+            read_markers.read(user.pk, topic.pk, post.pk)
             return redirect("board:board_topics", pk=board.pk)
     else:
         form = NewTopicForm()
     return render(request, "new_topic.html", {"board": board, "form": form})
 
 
+def _last_post_id(topic, cursor, pages):
+    if pages:
+        posts = pages[0]
+    elif not cursor and topic.reply_count < POSTS_PER_PAGE:
+        # A single page ends with the topic's last post.
+        return topic.last_post_id
+    else:
+        # The post list came from the cache; only the keys are needed.
+        posts = KeysetPaginator(
+            topic.posts.only("created_at"),
+            ("created_at", "id"),
+            per_page=POSTS_PER_PAGE,
+        ).page(cursor)
+    return posts.object_list[-1].pk if posts else None
+
+
+@condition(
+    etag_func=conditional.topic_posts_etag,
+    last_modified_func=conditional.topic_posts_last_modified,
+)
 def topic_posts(request, pk, topic_pk):
-    topic = get_object_or_404(Topic, board__pk=pk, pk=topic_pk)
-    return render(request, "topic_posts.html", {"topic": topic})
+    topic = conditional.get_topic_or_404(request, pk, topic_pk)
+    archived = isinstance(topic, ArchivedTopic)
+    if not archived:
+        view_counter.record(topic.pk)
+    cursor = request.GET.get("cursor")
+    pages = []
+
+    def post_list():
+        posts = KeysetPaginator(
+            topic.posts.select_related("created_by__profile"),
+            ("created_at", "id"),
+            per_page=POSTS_PER_PAGE,
+        ).page(cursor)
+        pages.append(posts)
+        return {"topic": topic, "posts": posts, "archived": archived}
+
+    # Authors see Edit buttons on their own posts, unless the topic is
+    # archived; everybody else shares one cached copy of the post list.
+    author = ""
+    user = request.user
+    if (
+        not archived
+        and user.is_authenticated
+        and topic.posts.filter(created_by=user).exists()
+    ):
+        author = user.pk
+    response = caching.render_cached(
+        request,
+        "topic_posts.html",
+        {
+            "topic": topic,
+            "archived": archived,
+            "following": conditional.is_following(request, topic.pk),
+        },
+        ["topic:{}".format(topic.pk)],
+        "post_list",
+        "includes/post_list.html",
+        post_list,
+        vary=[author],
+    )
+    if not archived and user.is_authenticated:
+        # The viewer has read up to the last post on this page, not the
+        # topic's last post. The buffer never moves a marker back.
+        read_markers.read(
+            user.pk, topic.pk, _last_post_id(topic, cursor, pages)
+        )
+    return response
 
 
 @login_required
 def reply_topic(request, pk, topic_pk):
-    topic = get_object_or_404(Topic, board__pk=pk, pk=topic_pk)
+    topic = get_object_or_404(
+        Topic.objects.select_related("board"), board__pk=pk, pk=topic_pk
+    )
     if request.method == "POST":
         form = PostForm(request.POST)
         if form.is_valid():
-            post = form.save(commit=False)
-            post.topic = topic
-            post.created_by = request.user
-            post.save()
+            with transaction.atomic():
+                post = form.save(commit=False)
+                post.topic = topic
+                post.created_by = request.user
+                post.save()
+                counters.post_created(post)
+                notifications.post_created(post)
+                transaction.on_commit(lambda: events.publish_post(post))
+            read_markers.read(request.user.pk, topic.pk, post.pk)
             return redirect("board:topic_posts", pk=pk, topic_pk=topic_pk)
     else:
         form = PostForm()
-    return render(request, "reply_topic.html", {"topic": topic, "form": form})
+    posts = topic.posts.select_related("created_by").order_by(
+        "-created_at", "-id"
+    )[:RECENT_POSTS]
+    return render(
+        request,
+        "reply_topic.html",
+        {"topic": topic, "form": form, "posts": posts},
+    )
+
+
+def topic_events(request, pk, topic_pk):
+    # Under ASGI, events.EventStreamApp keeps this stream open instead.
+    # Here the browser is told to reconnect, so it polls for new posts.
+    get_object_or_404(Topic, board__pk=pk, pk=topic_pk)
+    last_id = events.last_post_id(
+        request.headers.get("Last-Event-ID"),
+        request.GET.get("after"),
+        topic_pk,
+    )
+    body = [
+        "retry: {}\n".format(int(events.poll_interval() * 1000)),
+        "id: {}\n\n".format(last_id),
+    ]
+    body += [
+        events.format_event(data).decode()
+        for data in events.posts_after(topic_pk, last_id)
+    ]
+    return HttpResponse(
+        "".join(body),
+        content_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def search(request):
+    query = request.GET.get("q", "").strip()
+    board_id = request.GET.get("board", "")
+    board_id = int(board_id) if board_id.isdigit() else None
+    results = search_posts(
+        query,
+        board_id=board_id,
+        cursor=request.GET.get("cursor"),
+        limit=SEARCH_RESULTS_PER_PAGE,
+    )
+    next_query = None
+    if results.has_next:
+        next_query = urlencode(
+            {
+                "q": query,
+                "board": board_id or "",
+                "cursor": results.next_cursor,
+            }
+        )
+    return render(
+        request,
+        "search.html",
+        {
+            "query": query,
+            "board_id": board_id,
+            "boards": Board.objects.all(),
+            "results": results,
+            "next_query": next_query,
+        },
+    )
@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import Job, QueuedEmail
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["task", "status", "attempts", "run_at", "created_at"]
+    list_filter = ["status", "task"]
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ["recipients", "attempts", "failed", "run_at"]
+    list_filter = ["failed"]
+    exclude = ["message"]
@@ -0,0 +1,141 @@
+"""Outbound mail through a spool table."""
+
+import copy
+import logging
+import pickle
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from . import queue
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+def batch_size():
+    return getattr(settings, "QUEUED_EMAIL_BATCH_SIZE", 100)
+
+
+def max_attempts():
+    return getattr(settings, "QUEUED_EMAIL_MAX_ATTEMPTS", 5)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        spooled = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            message = copy.copy(message)
+            # The connection is this backend; the sender brings its own.
+            message.connection = None
+            spooled.append(
+                QueuedEmail(
+                    message=pickle.dumps(message),
+                    recipients=", ".join(message.recipients()),
+                )
+            )
+        if spooled:
+            with transaction.atomic():
+                QueuedEmail.objects.bulk_create(spooled)
+                queue.enqueue(send_queued_mail, dedupe_key="mail")
+        return len(spooled)
+
+
+def claim(size):
+    now = timezone.now()
+    ready = QueuedEmail.objects.filter(failed=False, run_at__lte=now).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    )
+    return queue.lock(ready, size)
+
+
+def release(emails):
+    QueuedEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        locked_until=None, attempts=F("attempts") - 1
+    )
+
+
+def retry(email, error):
+    email.last_error = "{}: {}".format(type(error).__name__, error)
+    email.locked_until = None
+    if email.attempts >= max_attempts():
+        email.failed = True
+        logger.error("Giving up on mail to %s: %s", email, email.last_error)
+    else:
+        delay = queue.backoff(email.attempts)
+        email.run_at = timezone.now() + timedelta(seconds=delay)
+    email.save(
+        update_fields=["last_error", "locked_until", "failed", "run_at"]
+    )
+
+
+def disconnected(error):
+    # SMTPException is an OSError too, but only a lost connection fails
+    # the rest of the batch.
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(
+        error, smtplib.SMTPException
+    )
+
+
+def send_queued_mail():
+    """Send every ready message over one connection; return how many."""
+    connection = None
+    sent = 0
+    try:
+        while True:
+            emails = claim(batch_size())
+            if not emails:
+                break
+            if connection is None:
+                connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+                try:
+                    connection.open()
+                except Exception:
+                    # Nothing was attempted; the job is retried instead.
+                    release(emails)
+                    raise
+            delivered = []
+            for index, email in enumerate(emails):
+                try:
+                    connection.send_messages([pickle.loads(email.message)])
+                except Exception as error:
+                    if disconnected(error):
+                        # Not the message's fault: keep what got through,
+                        # hand the rest back and let the job be retried.
+                        QueuedEmail.objects.filter(pk__in=delivered).delete()
+                        release(emails[index:])
+                        raise
+                    logger.warning("Could not send mail to %s", email)
+                    retry(email, error)
+                else:
+                    delivered.append(email.pk)
+            QueuedEmail.objects.filter(pk__in=delivered).delete()
+            sent += len(delivered)
+    finally:
+        if connection is not None:
+            connection.close()
+    schedule_retries()
+    return sent
+
+
+def schedule_retries():
+    # Under its own key, so that a retry due later never holds back mail
+    # queued meanwhile. Locked messages belong to another sender, which
+    # schedules their retries itself.
+    waiting = QueuedEmail.objects.filter(
+        failed=False, locked_until__isnull=True
+    )
+    next_retry = waiting.aggregate(next_retry=Min("run_at"))["next_retry"]
+    if next_retry is not None:
+        delay = max(0, (next_retry - timezone.now()).total_seconds())
+        queue.enqueue(send_queued_mail, dedupe_key="mail:retry", delay=delay)
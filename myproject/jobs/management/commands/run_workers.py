@@ -0,0 +1,55 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import queue, worker
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help="Worker processes; 0 runs jobs in this process.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Jobs each worker claims at a time.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before looking again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no jobs are ready instead of waiting for more.",
+        )
+
+    def handle(self, *args, **options):
+        arguments = (
+            options["batch_size"],
+            options["poll_interval"],
+            options["once"],
+        )
+        if options["processes"] < 1:
+            total = queue.work(*arguments)
+        else:
+            connections.close_all()
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(options["processes"]) as pool:
+                total = sum(
+                    pool.starmap(
+                        worker.worker_process,
+                        [arguments] * options["processes"],
+                    )
+                )
+        self.stdout.write("Ran {} jobs.".format(total))
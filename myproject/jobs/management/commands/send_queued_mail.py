@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the mail waiting in the spool now, instead of waiting for "
+        "run_workers."
+    )
+
+    def handle(self, *args, **options):
+        sent = send_queued_mail()
+        self.stdout.write("Sent {} messages.".format(sent))
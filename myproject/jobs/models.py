@@ -0,0 +1,72 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    # A call to ``task`` with ``payload`` as keyword arguments. Jobs are
+    # deleted once they succeed; those that run out of attempts stay behind
+    # as failed.
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    # At most one pending job per key; enqueuing another is a no-op.
+    dedupe_key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    # A running job whose lock has expired belongs to a dead worker and is
+    # claimed again.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="job_ready_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=Q(status="pending"),
+                name="job_pending_dedupe_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return "{} #{}".format(self.task, self.pk)
+
+
+class QueuedEmail(models.Model):
+    # A pickled EmailMessage waiting for jobs.mail.send_queued_mail. Sent
+    # messages are deleted; those that run out of attempts are kept with
+    # ``failed`` set.
+    message = models.BinaryField()
+    recipients = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["failed", "run_at"], name="queued_email_ready_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return self.recipients
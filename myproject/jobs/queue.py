@@ -0,0 +1,144 @@
+"""A persistent job queue in the database."""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def lock_timeout():
+    return getattr(settings, "JOBS_LOCK_TIMEOUT", 300)
+
+
+def retry_delay():
+    return getattr(settings, "JOBS_RETRY_DELAY", 30)
+
+
+def max_retry_delay():
+    return getattr(settings, "JOBS_MAX_RETRY_DELAY", 3600)
+
+
+def task_name(task):
+    if isinstance(task, str):
+        return task
+    return "{}.{}".format(task.__module__, task.__qualname__)
+
+
+def job(task, payload=None, dedupe_key=None, delay=0):
+    """Build an unsaved job; ``task`` is a function or its dotted path."""
+    return Job(
+        task=task_name(task),
+        payload=payload or {},
+        dedupe_key=dedupe_key,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue(task, payload=None, dedupe_key=None, delay=0):
+    enqueue_many([job(task, payload, dedupe_key, delay)])
+
+
+def enqueue_many(jobs, batch_size=500):
+    # Jobs whose dedupe_key is already pending are dropped by the database.
+    Job.objects.bulk_create(jobs, batch_size=batch_size, ignore_conflicts=True)
+
+
+def backoff(attempts):
+    return min(retry_delay() * 2 ** (attempts - 1), max_retry_delay())
+
+
+def lock(ready, batch_size, **changes):
+    """Lock up to ``batch_size`` ready rows, counting an attempt on each."""
+    model = ready.model
+    now = timezone.now()
+    # SQLite has no SELECT ... FOR UPDATE, but the write lock taken by the
+    # IMMEDIATE transaction keeps other workers out until the update.
+    with transaction.atomic():
+        ids = list(
+            ready.select_for_update(skip_locked=True)
+            .order_by("run_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        model.objects.filter(pk__in=ids).update(
+            locked_until=now + timedelta(seconds=lock_timeout()),
+            attempts=F("attempts") + 1,
+            **changes,
+        )
+        return list(model.objects.filter(pk__in=ids).order_by("run_at", "pk"))
+
+
+def claim(batch_size=20):
+    """Lock up to ``batch_size`` ready jobs for this worker and return them."""
+    now = timezone.now()
+    ready = Job.objects.filter(
+        Q(status=Job.PENDING, run_at__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+    return lock(ready, batch_size, status=Job.RUNNING)
+
+
+def run(job):
+    try:
+        import_string(job.task)(**job.payload)
+    except Exception as error:
+        logger.exception("Job %s failed (attempt %d)", job, job.attempts)
+        retry(job, error)
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def retry(job, error):
+    job.last_error = "{}: {}".format(type(error).__name__, error)
+    job.locked_until = None
+    if job.attempts >= job.max_attempts:
+        job.status = Job.FAILED
+    else:
+        job.status = Job.PENDING
+        job.run_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+    try:
+        with transaction.atomic():
+            job.save(
+                update_fields=[
+                    "status",
+                    "run_at",
+                    "locked_until",
+                    "last_error",
+                ]
+            )
+    except IntegrityError:
+        # The same work has been queued again meanwhile; that job will
+        # do it.
+        Job.objects.filter(pk=job.pk).delete()
+
+
+def run_batch(batch_size=20):
+    """Claim and run one batch; return the number of jobs claimed."""
+    jobs = claim(batch_size)
+    for job in jobs:
+        run(job)
+    return len(jobs)
+
+
+def work(batch_size=20, poll_interval=1.0, once=False):
+    """Run jobs until interrupted, or until none are ready with ``once``."""
+    total = 0
+    while True:
+        close_old_connections()
+        claimed = run_batch(batch_size)
+        total += claimed
+        if not claimed:
+            if once:
+                return total
+            time.sleep(poll_interval)
@@ -0,0 +1,80 @@
+import socketserver
+import threading
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    # Just enough SMTP for smtplib: no extensions, no auth.
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stub ESMTP")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            command = line[:4].upper()
+            if not line or command == "QUIT":
+                self.reply("221 Bye")
+                return
+            if command in ("EHLO", "HELO", "NOOP", "RSET"):
+                recipients = []
+                self.reply("250 stub")
+            elif command == "MAIL":
+                if len(server.messages) == server.disconnect_after:
+                    return
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = line.split(":", 1)[1].strip().strip("<>")
+                if address in server.refused:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for raw in iter(self.rfile.readline, b""):
+                    if raw == b".\r\n":
+                        break
+                    data.append(raw)
+                with server.lock:
+                    server.messages.append((recipients, b"".join(data)))
+                self.reply("250 OK")
+            else:
+                self.reply("502 Not implemented")
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    An SMTP server on a free local port that accepts every message, except
+    for addresses in ``refused``, and keeps them in ``messages``. It drops
+    the connection once it holds ``disconnect_after`` messages.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.refused = set()
+        self.disconnect_after = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,128 @@
+import smtplib
+
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, send_mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import mail, queue
+from ..models import Job, QueuedEmail
+from .smtp import StubSMTPServer
+
+
+@override_settings(
+    EMAIL_BACKEND="jobs.mail.QueuedEmailBackend",
+    QUEUED_EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+    QUEUED_EMAIL_BATCH_SIZE=2,
+    QUEUED_EMAIL_MAX_ATTEMPTS=2,
+    EMAIL_HOST="127.0.0.1",
+    EMAIL_TIMEOUT=5,
+)
+class QueuedEmailTests(TestCase):
+    def setUp(self):
+        self.server = StubSMTPServer()
+        self.addCleanup(self.server.server_close)
+        port = override_settings(EMAIL_PORT=self.server.port)
+        port.enable()
+        self.addCleanup(port.disable)
+
+    def send(self, *recipients):
+        for recipient in recipients:
+            send_mail("Hello", "Lorem ipsum", "forum@doe.com", [recipient])
+
+    def test_sending_only_spools_the_message(self):
+        with self.assertNumQueries(4):
+            # The spooled message and the send job, in a savepoint.
+            self.assertEquals(
+                send_mail("Hello", "Body", "forum@doe.com", ["a@doe.com"]), 1
+            )
+        self.send("b@doe.com")
+        self.assertEquals(QueuedEmail.objects.count(), 2)
+        self.assertEquals(
+            list(Job.objects.values_list("task", "dedupe_key")),
+            [("jobs.mail.send_queued_mail", "mail")],
+        )
+        self.assertEquals(self.server.connections, 0)
+
+    def test_messages_without_recipients_are_dropped(self):
+        self.assertEquals(EmailMessage("Hello", "Body").send(), 0)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_spool_is_drained_in_batches_over_one_connection(self):
+        self.send(*["user{}@doe.com".format(i) for i in range(5)])
+        with self.server:
+            queue.work(once=True)
+        self.assertEquals(self.server.connections, 1)
+        self.assertEquals(len(self.server.messages), 5)
+        recipients, data = self.server.messages[0]
+        self.assertEquals(recipients, ["user0@doe.com"])
+        self.assertIn(b"Subject: Hello", data)
+        self.assertFalse(QueuedEmail.objects.exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_refused_messages_are_retried_later(self):
+        self.server.refused.add("nobody@doe.com")
+        self.send("nobody@doe.com", "somebody@doe.com")
+        with self.server, self.assertLogs("jobs.mail", "WARNING"):
+            self.assertEquals(mail.send_queued_mail(), 1)
+        email = QueuedEmail.objects.get()
+        self.assertEquals(email.recipients, "nobody@doe.com")
+        self.assertEquals(email.attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", email.last_error)
+        retry = Job.objects.get(dedupe_key="mail:retry")
+        self.assertAlmostEqual(
+            retry.run_at.timestamp(), email.run_at.timestamp(), delta=1
+        )
+
+    def test_messages_are_given_up_after_their_last_attempt(self):
+        self.server.refused.add("nobody@doe.com")
+        self.send("nobody@doe.com")
+        QueuedEmail.objects.update(attempts=1)
+        with self.server, self.assertLogs("jobs.mail", "WARNING") as logs:
+            mail.send_queued_mail()
+        self.assertIn("Giving up on mail to nobody@doe.com", logs.output[-1])
+        self.assertTrue(QueuedEmail.objects.get().failed)
+        self.assertFalse(Job.objects.filter(dedupe_key="mail:retry"))
+
+    def test_unreachable_server_leaves_the_spool_untouched(self):
+        self.send("somebody@doe.com")
+        self.server.server_close()
+        with self.assertRaises(OSError):
+            mail.send_queued_mail()
+        email = QueuedEmail.objects.get()
+        self.assertEquals(email.attempts, 0)
+        self.assertIsNone(email.locked_until)
+
+    def test_lost_connection_hands_the_batch_back(self):
+        self.send(*["user{}@doe.com".format(i) for i in range(4)])
+        self.server.disconnect_after = 1
+        with self.server, self.assertRaises(smtplib.SMTPServerDisconnected):
+            mail.send_queued_mail()
+        self.assertEquals(len(self.server.messages), 1)
+        self.assertEquals(
+            list(
+                QueuedEmail.objects.values_list(
+                    "recipients", "attempts", "locked_until"
+                )
+            ),
+            [
+                ("user1@doe.com", 0, None),
+                ("user2@doe.com", 0, None),
+                ("user3@doe.com", 0, None),
+            ],
+        )
+
+    def test_password_reset_does_not_wait_for_the_mail_server(self):
+        User.objects.create_user(
+            username="john", email="john@doe.com", password="123"
+        )
+        response = self.client.post(
+            reverse("account:password_reset"), {"email": "john@doe.com"}
+        )
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(self.server.connections, 0)
+        with self.server:
+            queue.work(once=True)
+        ((recipients, data),) = self.server.messages
+        self.assertEquals(recipients, ["john@doe.com"])
+        self.assertIn(b"/account/reset/", data)
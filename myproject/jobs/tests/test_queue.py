@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import queue
+from ..models import Job
+
+calls = []
+
+
+def record(value):
+    calls.append(value)
+
+
+def fail():
+    raise RuntimeError("Boom")
+
+
+@override_settings(JOBS_RETRY_DELAY=10, JOBS_MAX_RETRY_DELAY=60)
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_stores_the_task_path_and_payload(self):
+        queue.enqueue(record, {"value": 1})
+        job = Job.objects.get()
+        self.assertEquals(job.task, "jobs.tests.test_queue.record")
+        self.assertEquals(job.payload, {"value": 1})
+        self.assertEquals(job.status, Job.PENDING)
+
+    def test_pending_jobs_are_deduplicated_by_key(self):
+        queue.enqueue(record, {"value": 1}, dedupe_key="a")
+        queue.enqueue(record, {"value": 2}, dedupe_key="a")
+        queue.enqueue(record, {"value": 3}, dedupe_key="b")
+        queue.enqueue(record, {"value": 4})
+        self.assertEquals(Job.objects.count(), 3)
+
+    def test_running_job_does_not_block_a_new_one_with_its_key(self):
+        queue.enqueue(record, {"value": 1}, dedupe_key="a")
+        queue.claim()
+        queue.enqueue(record, {"value": 2}, dedupe_key="a")
+        self.assertEquals(Job.objects.count(), 2)
+
+    def test_claim_locks_a_batch_of_ready_jobs(self):
+        for value in range(3):
+            queue.enqueue(record, {"value": value})
+        queue.enqueue(record, {"value": 9}, delay=60)
+        # Select, update and fetch, inside a savepoint under TestCase.
+        with self.assertNumQueries(5):
+            jobs = queue.claim(batch_size=2)
+        self.assertEquals([job.payload["value"] for job in jobs], [0, 1])
+        self.assertTrue(all(job.status == Job.RUNNING for job in jobs))
+        self.assertTrue(all(job.attempts == 1 for job in jobs))
+        self.assertEquals(len(queue.claim()), 1)
+        self.assertEquals(queue.claim(), [])
+
+    def test_jobs_with_expired_locks_are_claimed_again(self):
+        queue.enqueue(record, {"value": 1})
+        queue.claim()
+        Job.objects.update(locked_until=timezone.now() - timedelta(1))
+        self.assertEquals(len(queue.claim()), 1)
+
+    def test_successful_jobs_are_deleted(self):
+        queue.enqueue(record, {"value": 1})
+        queue.enqueue(record, {"value": 2})
+        self.assertEquals(queue.run_batch(), 2)
+        self.assertEquals(calls, [1, 2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        queue.enqueue(fail)
+        with self.assertLogs("jobs.queue", "ERROR"):
+            queue.run_batch()
+        job = Job.objects.get()
+        self.assertEquals(job.status, Job.PENDING)
+        self.assertEquals(job.last_error, "RuntimeError: Boom")
+        self.assertAlmostEqual(
+            (job.run_at - timezone.now()).total_seconds(), 10, delta=2
+        )
+        self.assertEquals(queue.run_batch(), 0)
+
+    def test_backoff_doubles_up_to_the_maximum(self):
+        self.assertEquals(
+            [queue.backoff(attempts) for attempts in range(1, 6)],
+            [10, 20, 40, 60, 60],
+        )
+
+    def test_jobs_fail_after_their_last_attempt(self):
+        queue.enqueue(fail)
+        Job.objects.update(attempts=4)
+        with self.assertLogs("jobs.queue", "ERROR"):
+            queue.run_batch()
+        job = Job.objects.get()
+        self.assertEquals(job.status, Job.FAILED)
+        self.assertEquals(job.attempts, 5)
+        self.assertEquals(queue.claim(), [])
+
+    def test_retry_gives_way_to_a_newer_job_with_its_key(self):
+        queue.enqueue(fail, dedupe_key="a")
+        (job,) = queue.claim()
+        queue.enqueue(fail, dedupe_key="a")
+        queue.retry(job, RuntimeError("Boom"))
+        self.assertEquals(Job.objects.get().attempts, 0)
+
+
+class RunWorkersCommandTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_once_runs_every_ready_job_and_exits(self):
+        for value in range(5):
+            queue.enqueue(record, {"value": value})
+        out = StringIO()
+        call_command(
+            "run_workers", processes=0, batch_size=2, once=True, stdout=out
+        )
+        self.assertEquals(calls, [0, 1, 2, 3, 4])
+        self.assertIn("Ran 5 jobs.", out.getvalue())
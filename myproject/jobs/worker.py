@@ -0,0 +1,11 @@
+import django
+
+
+def worker_process(batch_size, poll_interval, once):
+    # Runs in a spawned process, so Django has to be set up before anything
+    # that imports models.
+    django.setup()
+
+    from .queue import work
+
+    return work(batch_size, poll_interval, once)
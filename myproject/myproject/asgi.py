@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
+import atexit
 import os
 
 from django.core.asgi import get_asgi_application
@@ -14,3 +15,22 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
 
 application = get_asgi_application()
+
+# Topic event streams are served outside Django's request cycle, which
+# cannot hold a response open without tying up a thread.
+from boards.events import EventStreamApp  # noqa: E402
+
+application = EventStreamApp(application)
+
+# Write out buffered topic views and read markers when the worker shuts
+# down.
+from boards.readmarkers import read_markers  # noqa: E402
+from boards.viewcounter import view_counter  # noqa: E402
+
+atexit.register(view_counter.flush)
+atexit.register(read_markers.flush)
+
+# Compile templates now rather than on the first requests.
+from myproject.warmup import warm_templates  # noqa: E402
+
+warm_templates()
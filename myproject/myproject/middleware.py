@@ -0,0 +1,231 @@
+import logging
+import mimetypes
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .routers import use_primary
+
+logger = logging.getLogger(__name__)
+
+
+def accepted_encodings(header):
+    """Map each content coding in an Accept-Encoding header to its q."""
+    codings = {}
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryMetrics:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if duration >= self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_sql = sql
+
+    def server_timing(self):
+        slowest = "db-slowest;dur={:.2f}".format(self.slowest_duration * 1000)
+        if settings.DEBUG and self.slowest_sql:
+            sql = " ".join(self.slowest_sql.split()).replace('"', "'")
+            slowest += ';desc="{}"'.format(sql[:200])
+        return 'db;dur={:.2f};desc="{} queries", {}'.format(
+            self.duration * 1000, self.count, slowest
+        )
+
+
+class QueryBudgetMiddleware:
+    # Counts the queries each request runs and reports them in a
+    # Server-Timing header. Views listed in QUERY_BUDGETS (by URL name) are
+    # logged when they go over their budget, or fail outright when
+    # QUERY_BUDGET_STRICT is on, as the test runner sets it. Streaming
+    # responses run queries as they are sent, after the Server-Timing
+    # header; those count towards the budget, checked once the body has
+    # been sent.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = QueryMetrics()
+        with self.counting(metrics):
+            response = self.get_response(request)
+        response["Server-Timing"] = metrics.server_timing()
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response.streaming_content, metrics
+            )
+        else:
+            self.check_budget(request, metrics)
+        return response
+
+    @staticmethod
+    def counting(metrics):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        return stack
+
+    def stream(self, request, content, metrics):
+        with self.counting(metrics):
+            yield from content
+        self.check_budget(request, metrics)
+
+    def check_budget(self, request, metrics):
+        match = request.resolver_match
+        if match is None:
+            return
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(match.view_name)
+        if budget is None or metrics.count <= budget:
+            return
+        message = (
+            "{} {} ran {} queries (budget {}); slowest {:.2f}ms: {}".format(
+                request.method,
+                request.path,
+                metrics.count,
+                budget,
+                metrics.slowest_duration * 1000,
+                metrics.slowest_sql,
+            )
+        )
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class PrimaryPinningMiddleware:
+    # Runs unsafe requests entirely against the primary and sets a short
+    # lived cookie so the same client keeps reading from the primary until
+    # the replicas have caught up with what it just wrote.
+
+    cookie_name = "pin_primary"
+    safe_methods = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "DATABASE_REPLICAS", []):
+            return self.get_response(request)
+        writing = request.method not in self.safe_methods
+        if not writing and self.cookie_name not in request.COOKIES:
+            return self.get_response(request)
+        with use_primary():
+            response = self.get_response(request)
+        if writing:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.PRIMARY_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class PrecompressedStaticFilesMiddleware:
+    # Serves files collected into STATIC_ROOT, picking the .br or .gz
+    # variant the client accepts. Fingerprinted names never change content,
+    # so they are cached for a year; anything else is revalidated.
+
+    encodings = (("br", ".br"), ("gzip", ".gz"))
+    immutable = "public, max-age=31536000, immutable"
+    revalidate = "public, max-age=60"
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.hashed = set(
+            getattr(staticfiles_storage, "hashed_files", {}).values()
+        )
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(
+            self.prefix
+        ):
+            response = self.serve(request, request.path[len(self.prefix) :])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        accepted = accepted_encodings(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        # The client's most preferred variant, and ours on a tie; q=0
+        # refuses a coding, even one "*" would accept.
+        encoding = None
+        best = 0.0
+        for candidate, suffix in self.encodings:
+            q = accepted.get(candidate, accepted.get("*", 0.0))
+            if q > best and os.path.isfile(path + suffix):
+                encoding, best = candidate, q
+        if encoding:
+            path += dict(self.encodings)[encoding]
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.META.get("HTTP_IF_MODIFIED_SINCE"),
+            stat.st_mtime,
+            stat.st_size,
+        ):
+            response = HttpResponseNotModified()
+        else:
+            content_type = mimetypes.guess_type(name)[0]
+            response = FileResponse(
+                open(path, "rb"),
+                content_type=content_type or "application/octet-stream",
+                filename=os.path.basename(name),
+            )
+            response["Last-Modified"] = http_date(stat.st_mtime)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["Vary"] = "Accept-Encoding"
+        response["Cache-Control"] = (
+            self.immutable if name in self.hashed else self.revalidate
+        )
+        return response
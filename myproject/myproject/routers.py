@@ -0,0 +1,46 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_use_primary = ContextVar("use_primary", default=False)
+
+
+@contextmanager
+def use_primary():
+    """Route reads made inside the block to the primary database."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def reading_from_replica():
+    """Whether reads made now are routed to a replica."""
+    replicas = getattr(settings, "DATABASE_REPLICAS", [])
+    return bool(replicas) and not _use_primary.get()
+
+
+class PrimaryReplicaRouter:
+    # Writes always go to "default"; reads are spread over
+    # DATABASE_REPLICAS unless the caller is pinned to the primary.
+
+    def db_for_read(self, model, **hints):
+        if not reading_from_replica():
+            return "default"
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold copies of the primary's rows.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas are copies of the primary and get its schema with it.
+        if db in getattr(settings, "DATABASE_REPLICAS", []):
+            return False
+        return None
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    # Any request over its query budget fails the test that made it, in
+    # every test; tests of the logging itself turn this off. The shared
+    # cache is kept in memory rather than next to the real one.
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        caches = dict(settings.CACHES)
+        caches["shared"] = {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shared",
+        }
+        self.test_settings = override_settings(
+            CACHES=caches, QUERY_BUDGET_STRICT=True
+        )
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
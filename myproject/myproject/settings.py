@@ -41,26 +41,41 @@ INSTALLED_APPS = [
     "boards",
     "widget_tweaks",
     "account",
+    "jobs",
 ]
 
 MIDDLEWARE = [
+    "myproject.middleware.PrecompressedStaticFilesMiddleware",
+    "myproject.middleware.QueryBudgetMiddleware",
+    "myproject.middleware.PrimaryPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "account.middleware.CachedAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "myproject.urls"
 
+template_loaders = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+if not DEBUG:
+    # Parse each template once per worker; wsgi.py and asgi.py compile them
+    # all at startup so the first requests don't pay for it.
+    template_loaders = [
+        ("django.template.loaders.cached.Loader", template_loaders)
+    ]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": template_loaders,
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -73,17 +88,87 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "myproject.wsgi.application"
 
+TEST_RUNNER = "myproject.runner.TestRunner"
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "myproject.sqlite",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Keep connections, and with them SQLite's page cache, open across
+        # requests.
+        "CONN_MAX_AGE": 600,
+        "OPTIONS": {
+            # Seconds to wait for a lock before "database is locked".
+            "timeout": 20,
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "mmap_size": 256 * 1024 * 1024,
+                "cache_size": -64 * 1024,
+                "busy_timeout": 20000,
+                "temp_store": "MEMORY",
+            },
+        },
     }
 }
 
+# Read replicas, given as a comma-separated list of database files in the
+# FORUM_DB_REPLICAS environment variable. Each becomes a "replica<N>" alias
+# that serves reads; writes, and reads from clients that have just written,
+# go to "default". Tests mirror the replicas onto "default".
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.environ.get("FORUM_DB_REPLICAS", "").split(",")), 1
+):
+    alias = "replica{}".format(number)
+    DATABASES[alias] = dict(
+        DATABASES["default"], NAME=name.strip(), TEST={"MIRROR": "default"}
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["myproject.routers.PrimaryReplicaRouter"]
+
+# Seconds a client keeps reading from the primary after a write.
+PRIMARY_PIN_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Sessions and logged-in users must look the same from every process,
+    # so they live in a cache the processes share. Files do for workers on
+    # one host; point this at memcached or Redis for several hosts.
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "FORUM_SHARED_CACHE", str(BASE_DIR / "cache")
+        ),
+    },
+}
+
+# Seconds a cached forum page or fragment is kept; writes invalidate them
+# earlier by bumping their version keys.
+FORUM_CACHE_TIMEOUT = 300
+
+
+# Sessions are read from the shared cache and written through to the
+# database.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "shared"
+
+# Cache and seconds the logged-in user is cached for between requests.
+AUTH_USER_CACHE_ALIAS = "shared"
+AUTH_USER_CACHE_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -123,6 +208,14 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 
+STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+
+if not DEBUG:
+    # collectstatic writes fingerprinted copies plus .gz/.br variants.
+    STATICFILES_STORAGE = (
+        "myproject.storage.CompressedManifestStaticFilesStorage"
+    )
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -135,4 +228,71 @@ STATICFILES_DIRS = [
 LOGOUT_REDIRECT_URL = "index"
 LOGIN_REDIRECT_URL = "index"
 LOGIN_URL = "account:login"
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# Mail is spooled to the database and sent by run_workers through
+# QUEUED_EMAIL_BACKEND, in batches of QUEUED_EMAIL_BATCH_SIZE over one
+# connection. A message is given up after QUEUED_EMAIL_MAX_ATTEMPTS tries.
+EMAIL_BACKEND = "jobs.mail.QueuedEmailBackend"
+QUEUED_EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+QUEUED_EMAIL_BATCH_SIZE = 100
+QUEUED_EMAIL_MAX_ATTEMPTS = 5
+
+# Topic views are buffered in memory and written in batches; a crash loses
+# at most VIEW_COUNTER_MAX_PENDING views.
+VIEW_COUNTER_MAX_PENDING = 1000
+VIEW_COUNTER_FLUSH_INTERVAL = 5.0
+
+# Topic read markers are buffered the same way.
+READ_MARKERS_MAX_PENDING = 1000
+READ_MARKERS_FLUSH_INTERVAL = 5.0
+
+# Seconds an idle live topic stream waits before checking the database for
+# posts made through other workers; also the reconnect delay under WSGI.
+TOPIC_EVENTS_POLL_INTERVAL = 15.0
+
+# Reply notifications for a subscriber are held this many seconds so that
+# replies arriving meanwhile go out in the same digest.
+NOTIFICATION_DIGEST_DELAY = 300
+
+# Links in notification emails point here.
+FORUM_BASE_URL = "http://localhost:8000"
+
+# Seconds a worker may hold a job before it is handed to another worker,
+# and the backoff before the first retry of a failed job (doubling on each
+# further attempt, up to the maximum).
+JOBS_LOCK_TIMEOUT = 300
+JOBS_RETRY_DELAY = 30
+JOBS_MAX_RETRY_DELAY = 3600
+
+# Boards are purged PURGE_CHUNK_SIZE rows per transaction, and a purge job
+# deletes PURGE_CHUNKS_PER_JOB chunks before queueing the rest.
+PURGE_CHUNK_SIZE = 1000
+PURGE_CHUNKS_PER_JOB = 20
+
+# Hot topic ranking: every post and view adds its weight to the topic's
+# score, halving every HOT_SCORE_HALF_LIFE seconds afterwards. Each board
+# and the /hot/ page list the HOT_TOPICS hottest topics, cached for
+# HOT_TOPICS_CACHE_TIMEOUT seconds.
+HOT_SCORE_HALF_LIFE = 12 * 3600
+HOT_SCORE_WEIGHTS = {"post": 1.0, "view": 0.05}
+HOT_TOPICS = 20
+HOT_TOPICS_CACHE_TIMEOUT = 60
+
+# Maximum number of queries a request to each view may run, including the
+# session and user lookups of a logged-in request. QueryBudgetMiddleware
+# logs requests over budget, or fails them when QUERY_BUDGET_STRICT is on,
+# as the test runner does for every test.
+QUERY_BUDGETS = {
+    "index": 3,
+    # Includes retrying the viewer's unwritten read markers.
+    "board:board_topics": 5,
+    # Includes writing the viewer's read marker and finding the last post
+    # of a cached page of a long topic.
+    "board:topic_posts": 8,
+    # Includes subscribing the author, queueing notifications and, every
+    # few minutes, reading the ranking epoch.
+    "board:reply_topic": 15,
+    "board:add_new_topic": 14,
+    "search": 5,
+    "hot": 4,
+    "account:signup": 12,
+}
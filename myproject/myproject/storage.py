@@ -0,0 +1,42 @@
+import gzip
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+COMPRESSIBLE = (".css", ".js", ".map", ".svg", ".txt", ".html", ".json")
+
+
+def compressors():
+    # gzip's mtime is pinned so that collectstatic output is reproducible.
+    yield ".gz", lambda data: gzip.compress(data, 9, mtime=0)
+    yield ".br", lambda data: brotli.compress(data)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Fingerprinted static files with ``.gz`` and ``.br`` variants written
+    next to each hashed text file, for PrecompressedStaticFilesMiddleware
+    to serve.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # Only the final names survive; CSS that refers to other files is
+        # hashed more than once along the way.
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            if hashed_name.endswith(COMPRESSIBLE):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as f:
+            data = f.read()
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
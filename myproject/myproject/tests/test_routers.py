@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import PrimaryPinningMiddleware
+from ..routers import PrimaryReplicaRouter, use_primary
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(self.router.db_for_read(User), "replica1")
+
+    def test_writes_go_to_the_primary(self):
+        self.assertEqual(self.router.db_for_write(User), "default")
+
+    def test_pinned_reads_go_to_the_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(User), "default")
+        self.assertEqual(self.router.db_for_read(User), "replica1")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_go_to_the_primary_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_migrations_never_run_on_a_replica(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "boards"))
+        self.assertIsNone(self.router.allow_migrate("default", "boards"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], PRIMARY_PIN_SECONDS=10)
+class PrimaryPinningMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = PrimaryPinningMiddleware(self.get_response)
+
+    def get_response(self, request):
+        self.read_from = PrimaryReplicaRouter().db_for_read(User)
+        return HttpResponse()
+
+    def test_post_reads_from_the_primary_and_pins_the_client(self):
+        response = self.middleware(self.factory.post("/"))
+        self.assertEqual(self.read_from, "default")
+        cookie = response.cookies[PrimaryPinningMiddleware.cookie_name]
+        self.assertEqual(cookie["max-age"], 10)
+
+    def test_get_from_a_pinned_client_reads_from_the_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[PrimaryPinningMiddleware.cookie_name] = "1"
+        response = self.middleware(request)
+        self.assertEqual(self.read_from, "default")
+        self.assertNotIn(
+            PrimaryPinningMiddleware.cookie_name, response.cookies
+        )
+
+    def test_get_reads_from_a_replica(self):
+        response = self.middleware(self.factory.get("/"))
+        self.assertEqual(self.read_from, "replica1")
+        self.assertNotIn(
+            PrimaryPinningMiddleware.cookie_name, response.cookies
+        )
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_cookie_without_replicas(self):
+        response = self.middleware(self.factory.post("/"))
+        self.assertNotIn(
+            PrimaryPinningMiddleware.cookie_name, response.cookies
+        )
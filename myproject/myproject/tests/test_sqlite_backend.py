@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import tempfile
+
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..sqlite.base import DatabaseWrapper
+
+
+class TunedSQLiteBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "db.sqlite3")
+        settings_dict = dict(connection.settings_dict, NAME=self.path)
+        settings_dict["OPTIONS"] = {
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {
+                "journal_mode": "WAL",
+                "synchronous": "NORMAL",
+                "cache_size": -2048,
+                "busy_timeout": 1234,
+            },
+        }
+        self.wrapper = DatabaseWrapper(settings_dict, alias="tuned")
+        connections["tuned"] = self.wrapper
+
+    def tearDown(self):
+        del connections["tuned"]
+        self.wrapper.close()
+        self.directory.cleanup()
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("PRAGMA {}".format(name))
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        self.assertEquals(self.pragma("journal_mode"), "wal")
+        self.assertEquals(self.pragma("synchronous"), 1)
+        self.assertEquals(self.pragma("cache_size"), -2048)
+        self.assertEquals(self.pragma("busy_timeout"), 1234)
+
+    def test_atomic_blocks_begin_immediate(self):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute("CREATE TABLE t (x INTEGER)")
+        other = sqlite3.connect(self.path, timeout=0)
+        try:
+            with CaptureQueriesContext(self.wrapper) as queries:
+                with transaction.atomic(using="tuned"):
+                    # The write lock is held before anything is written.
+                    with self.assertRaisesMessage(
+                        sqlite3.OperationalError, "database is locked"
+                    ):
+                        other.execute("INSERT INTO t VALUES (1)")
+            self.assertEquals(queries[0]["sql"], "BEGIN IMMEDIATE")
+        finally:
+            other.close()
+
+    def test_custom_options_are_not_passed_to_sqlite(self):
+        params = self.wrapper.get_connection_params()
+        self.assertNotIn("pragmas", params)
+        self.assertNotIn("transaction_mode", params)
@@ -0,0 +1,138 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import (
+    PrecompressedStaticFilesMiddleware,
+    accepted_encodings,
+)
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    # Collected once per class: brotli's best quality is slow.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.root)
+        overrides = override_settings(
+            DEBUG=False,
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                "myproject.storage.CompressedManifestStaticFilesStorage"
+            ),
+        )
+        overrides.enable()
+        cls.addClassCleanup(overrides.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        cls.css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), "rb") as f:
+            return f.read()
+
+
+class CompressedManifestStorageTests(StaticFilesTestCase):
+    def test_writes_fingerprinted_and_gzipped_files(self):
+        self.assertRegex(self.css, r"^css/bootstrap\.min\.[0-9a-f]{12}\.css$")
+        self.assertEqual(
+            gzip.decompress(self.read(self.css + ".gz")), self.read(self.css)
+        )
+
+    def test_skips_files_that_do_not_shrink(self):
+        app = staticfiles_storage.stored_name("css/app.css")
+        self.assertFalse(os.path.exists(os.path.join(self.root, app + ".gz")))
+
+    def test_skips_binary_files(self):
+        avatar = staticfiles_storage.stored_name("img/avatar.png")
+        self.assertFalse(
+            os.path.exists(os.path.join(self.root, avatar + ".gz"))
+        )
+
+    def test_writes_brotli_files(self):
+        self.assertEqual(
+            brotli.decompress(self.read(self.css + ".br")), self.read(self.css)
+        )
+
+
+class PrecompressedStaticFilesMiddlewareTests(StaticFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.middleware = PrecompressedStaticFilesMiddleware(
+            lambda request: HttpResponse("view")
+        )
+
+    def get(self, name, **headers):
+        return self.middleware(
+            self.factory.get(settings.STATIC_URL + name, **headers)
+        )
+
+    def test_serves_gzip_to_clients_that_accept_it(self):
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(
+            b"".join(response.streaming_content), self.read(self.css + ".gz")
+        )
+
+    def test_serves_brotli_when_preferred(self):
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        response = self.get(
+            self.css, HTTP_ACCEPT_ENCODING="gzip;q=1.0, br;q=0.5"
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_refused_codings_are_not_served(self):
+        for header in ("br;q=0, gzip;q=0", "*, br;q=0, gzip;q=0", "brotli"):
+            with self.subTest(header=header):
+                response = self.get(self.css, HTTP_ACCEPT_ENCODING=header)
+                self.assertFalse(response.has_header("Content-Encoding"))
+        response = self.get(self.css, HTTP_ACCEPT_ENCODING="*, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_accept_encoding_parsing(self):
+        self.assertEqual(
+            accepted_encodings(" GZIP ; q=0.8, br;Q=0,, deflate;q=x, *"),
+            {"gzip": 0.8, "br": 0.0, "deflate": 0.0, "*": 1.0},
+        )
+
+    def test_serves_identity_otherwise(self):
+        response = self.get(self.css)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(
+            b"".join(response.streaming_content), self.read(self.css)
+        )
+
+    def test_fingerprinted_files_are_immutable(self):
+        response = self.get(self.css)
+        self.assertIn("immutable", response["Cache-Control"])
+        response = self.get("css/bootstrap.min.css")
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+    def test_not_modified(self):
+        response = self.get(self.css)
+        response = self.get(
+            self.css, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_files_fall_through(self):
+        self.assertEqual(self.get("css/missing.css").content, b"view")
+        self.assertEqual(self.get("../settings.py").content, b"view")
+
+    @override_settings(DEBUG=True)
+    def test_not_used_in_debug(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PrecompressedStaticFilesMiddleware(lambda request: None)
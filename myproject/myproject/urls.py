@@ -5,6 +5,8 @@ from boards import views
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", views.index, name="index"),
+    path("search/", views.search, name="search"),
+    path("hot/", views.hot_topics, name="hot"),
     path("boards/", include("boards.urls", namespace="board")),
     path("account/", include("account.urls", namespace="account")),
 ]
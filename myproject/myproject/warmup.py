@@ -0,0 +1,43 @@
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def _template_names(loader):
+    for directory in loader.get_dirs():
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith((".html", ".txt")):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, directory).replace(os.sep, "/")
+
+
+def warm_templates():
+    """
+    Compile every template into the cached loaders and return how many
+    were loaded. Does nothing for engines without a cached loader, as in
+    DEBUG, where templates are re-read on each request anyway.
+    """
+    total = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        engine = backend.engine
+        for loader in engine.template_loaders:
+            if not isinstance(loader, CachedLoader):
+                continue
+            names = {
+                name
+                for inner in loader.loaders
+                for name in _template_names(inner)
+            }
+            for name in sorted(names):
+                try:
+                    engine.get_template(name)
+                except (TemplateDoesNotExist, TemplateSyntaxError):
+                    # Loading it again on request raises the same error.
+                    continue
+                total += 1
+    return total
@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 """
 
+import atexit
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,16 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
 
 application = get_wsgi_application()
+
+# Write out buffered topic views and read markers when the worker shuts
+# down.
+from boards.readmarkers import read_markers  # noqa: E402
+from boards.viewcounter import view_counter  # noqa: E402
+
+atexit.register(view_counter.flush)
+atexit.register(read_markers.flush)
+
+# Compile templates now rather than on the first requests.
+from myproject.warmup import warm_templates  # noqa: E402
+
+warm_templates()